@@ -0,0 +1,262 @@
+"""Benchmark seed generation across every preset with a fixed seed matrix."""
+import argparse
+import json
+import multiprocessing
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import js
+import randomizer.Fill as Fill
+import randomizer.ItemPool as ItemPool
+import randomizer.Profiler as Profiler
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+SEEDS = [11, 22, 33]
+# Profiler spans reported as the phases of Generate_Spoiler
+PHASES = ["ShuffleMisc", "ExitShuffle", "Fill", "GeneratePlaythrough", "compileHints"]
+# Timing differences smaller than this many seconds are never reported as regressions
+TIME_FLOOR = 0.5
+# Per-call timings measured instead of seed generation, which have no floor
+CALL_TIMES = {"search_time": "search", "assignment_time": "settings assignment", "coin_check_time": "worst coin usage check", "import_time": "import"}
+# Module imported by the CLI and every seed generating worker before the first seed can start
+IMPORTED_MODULE = "randomizer.Fill"
+# Run in a fresh interpreter to time importing the module
+IMPORT_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def init_worker():
+    """Silence progress messages in benchmark workers."""
+    js.postMessage = lambda message: None
+
+
+def load_preset(preset_file):
+    """Load the settings for a preset file on top of the defaults."""
+    with open("static/presets/default.json") as default_file:
+        setting_data = json.load(default_file)
+    with open("static/presets/" + preset_file) as data_file:
+        data = json.load(data_file)
+    for key in data:
+        setting_data[key] = data[key]
+    setting_data.pop("name", None)
+    setting_data.pop("description", None)
+    return setting_data
+
+
+def run_case(case):
+    """Generate one seed of the matrix and measure it."""
+    preset_file, seed = case
+    result = {"preset": preset_file, "seed": seed, "error": None}
+    setting_data = load_preset(preset_file)
+    setting_data["seed"] = seed
+    start = time.perf_counter()
+    profiler = Profiler.Start()
+    try:
+        spoiler = Spoiler(Settings(setting_data))
+        Fill.Generate_Spoiler(spoiler)
+    except Exception as ex:
+        result["error"] = type(ex).__name__
+    Profiler.Stop()
+    result["time"] = round(time.perf_counter() - start, 3)
+    result["phases"] = {phase: round(profiler.totals.get(phase, 0), 3) for phase in PHASES}
+    result["searches"] = dict(sorted(profiler.searches.items()))
+    result["retries"] = len(profiler.retries)
+    result["placements_undone"] = sum(retry["undone"] or 0 for retry in profiler.retries)
+    # Each case runs in its own process, so the peak is this seed's
+    result["peak_memory_kb"] = None
+    if resource is not None:
+        result["peak_memory_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes rather than kilobytes
+        if sys.platform == "darwin":
+            result["peak_memory_kb"] //= 1024
+    return result
+
+
+def run_search_case(case):
+    """Time reachability searches of one preset's generated world with every item owned."""
+    preset_file, seed, repeat = case
+    result = {"preset": preset_file, "seed": seed, "error": None}
+    setting_data = load_preset(preset_file)
+    setting_data["seed"] = seed
+    settings = Settings(setting_data)
+    # Searching the generated world means every location can be reached and every placed item is picked up
+    Fill.Generate_Spoiler(Spoiler(settings))
+    times = []
+    for i in range(repeat):
+        Fill.Reset()
+        start = time.perf_counter()
+        reachable = Fill.GetAccessibleLocations(settings, ItemPool.AllItems(settings))
+        times.append(time.perf_counter() - start)
+    result["locations"] = len(reachable)
+    # The fastest call is the least disturbed by everything else running on the machine
+    result["search_time"] = round(min(times), 5)
+    result["mean_search_time"] = round(sum(times) / len(times), 5)
+    return result
+
+
+def run_coin_check_case(case):
+    """Time the checks for coin locks with the worst order of buying moves made while generating one seed of the matrix."""
+    preset_file, seed = case
+    result = {"preset": preset_file, "seed": seed, "error": None}
+    setting_data = load_preset(preset_file)
+    setting_data["seed"] = seed
+    profiler = Profiler.Start()
+    try:
+        Fill.Generate_Spoiler(Spoiler(Settings(setting_data)))
+    except Exception as ex:
+        result["error"] = type(ex).__name__
+    Profiler.Stop()
+    # Each check is made against the world as the fill left it, which generating the seed again recreates exactly
+    times = [span["duration"] for span in profiler.spans if span["name"] == "VerifyWorldWithWorstCoinUsage"]
+    result["coin_checks"] = len(times)
+    result["coin_check_time"] = round(sum(times) / len(times), 5) if len(times) > 0 else 0
+    return result
+
+
+def run_import_case(repeat):
+    """Time importing the randomizer in fresh interpreters, as done by the CLI and every worker process."""
+    result = {"preset": IMPORTED_MODULE, "seed": None, "error": None}
+    times = []
+    for i in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT.format(module=IMPORTED_MODULE)], stdout=subprocess.PIPE, check=True).stdout.decode()
+        times.append(float(output))
+    result["import_time"] = round(min(times), 4)
+    result["mean_import_time"] = round(sum(times) / len(times), 4)
+    return result
+
+
+def run_assignment_case(case):
+    """Time assignments to one preset's settings, as done while filling items."""
+    preset_file, seed, repeat = case
+    result = {"preset": preset_file, "seed": seed, "error": None}
+    setting_data = load_preset(preset_file)
+    setting_data["seed"] = seed
+    settings = Settings(setting_data)
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        settings.diddy_freeing_kong = settings.diddy_freeing_kong
+        times.append(time.perf_counter() - start)
+    result["assignment_time"] = round(min(times), 7)
+    result["mean_assignment_time"] = round(sum(times) / len(times), 7)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Get a description of every way the results regressed from the baseline."""
+    regressions = []
+    baseline_cases = {(case["preset"], case["seed"]): case for case in baseline["cases"]}
+    for case in results["cases"]:
+        name = case["preset"] if case["seed"] is None else case["preset"] + " seed " + str(case["seed"])
+        base = baseline_cases.get((case["preset"], case["seed"]))
+        if base is None:
+            continue
+        if case["error"] is not None and base["error"] is None:
+            regressions.append(name + " now fails with " + case["error"])
+            continue
+        call_times = [key for key in CALL_TIMES if key in case and key in base]
+        for key in call_times:
+            if case[key] > base[key] * (1 + tolerance):
+                regressions.append(name + " " + CALL_TIMES[key] + " went from " + str(base[key]) + "s to " + str(case[key]) + "s per call")
+        if len(call_times) > 0:
+            continue
+        timings = [("total time", case["time"], base["time"])]
+        timings.extend((phase + " time", case["phases"].get(phase, 0), base["phases"].get(phase, 0)) for phase in PHASES)
+        for label, current, previous in timings:
+            if current > previous * (1 + tolerance) and current - previous > TIME_FLOOR:
+                regressions.append(name + " " + label + " went from " + str(previous) + "s to " + str(current) + "s")
+        for mode, count in case["searches"].items():
+            previous = base["searches"].get(mode, 0)
+            if count > previous:
+                regressions.append(name + " " + mode + " searches went from " + str(previous) + " to " + str(count))
+        if case["peak_memory_kb"] is not None and base["peak_memory_kb"] is not None and case["peak_memory_kb"] > base["peak_memory_kb"] * (1 + tolerance):
+            regressions.append(name + " peak memory went from " + str(base["peak_memory_kb"]) + "KB to " + str(case["peak_memory_kb"]) + "KB")
+    return regressions
+
+
+def main():
+    """Benchmark Entrypoint."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--presets", help="Preset files to benchmark, defaults to every preset", nargs="+", required=False)
+    parser.add_argument("--seeds", help="Seeds to generate for each preset", nargs="+", type=int, default=SEEDS)
+    parser.add_argument("--jobs", help="Number of seeds to generate at once, timings are most reliable with 1", type=int, default=1)
+    parser.add_argument("--output", help="File to write the results to, which can later be used as a baseline", required=False)
+    parser.add_argument("--baseline", help="Results file to compare against", required=False)
+    parser.add_argument("--tolerance", help="Fraction a time or memory measurement may grow by before it counts as a regression", type=float, default=0.2)
+    parser.add_argument("--search", help="Instead of generating seeds, time this many reachability searches with every item owned", type=int, required=False)
+    parser.add_argument("--assignments", help="Instead of generating seeds, time this many assignments to the settings", type=int, required=False)
+    parser.add_argument("--imports", help="Instead of generating seeds, time importing the randomizer this many times", type=int, required=False)
+    parser.add_argument("--coin_check", help="Instead of timing whole seeds, time the checks for coin locks with the worst order of buying moves made while generating them", action="store_true")
+    args = parser.parse_args()
+    presets = args.presets
+    if presets is None:
+        with open("static/presets/preset_files.json") as preset_files:
+            presets = json.load(preset_files).get("progression")
+    results = {"seeds": args.seeds, "cases": []}
+    # A freshly started process for each case keeps peak memory and warm caches from carrying over
+    with multiprocessing.get_context("spawn").Pool(args.jobs, initializer=init_worker, maxtasksperchild=1) as pool:
+        if args.search is not None:
+            results["search"] = args.search
+            cases = [(preset, seed, args.search) for preset in presets for seed in args.seeds]
+            for case in pool.imap(run_search_case, cases):
+                results["cases"].append(case)
+                print(case["preset"] + " seed " + str(case["seed"]) + " reached " + str(case["locations"]) + " locations in " + str(round(case["search_time"] * 1000, 2)) + "ms per search")
+        elif args.assignments is not None:
+            results["assignments"] = args.assignments
+            cases = [(preset, seed, args.assignments) for preset in presets for seed in args.seeds]
+            for case in pool.imap(run_assignment_case, cases):
+                results["cases"].append(case)
+                print(case["preset"] + " seed " + str(case["seed"]) + " took " + str(round(case["assignment_time"] * 1000000, 2)) + "us per settings assignment")
+        elif args.imports is not None:
+            results["imports"] = args.imports
+            case = run_import_case(args.imports)
+            results["cases"].append(case)
+            print(case["preset"] + " took " + str(round(case["import_time"] * 1000, 2)) + "ms to import")
+        elif args.coin_check:
+            results["coin_check"] = True
+            cases = [(preset, seed) for preset in presets for seed in args.seeds]
+            for case in pool.imap(run_coin_check_case, cases):
+                results["cases"].append(case)
+                print(
+                    case["preset"]
+                    + " seed "
+                    + str(case["seed"])
+                    + " took "
+                    + str(round(case["coin_check_time"] * 1000, 2))
+                    + "ms per worst coin usage check over "
+                    + str(case["coin_checks"])
+                    + " checks"
+                )
+        else:
+            cases = [(preset, seed) for preset in presets for seed in args.seeds]
+            for case in pool.imap(run_case, cases):
+                results["cases"].append(case)
+                status = "failed with " + case["error"] if case["error"] is not None else "done"
+                print(case["preset"] + " seed " + str(case["seed"]) + " " + status + " in " + str(case["time"]) + "s " + json.dumps(case["phases"]))
+    if args.output is not None:
+        with open(args.output, "w") as outfile:
+            json.dump(results, outfile, indent=4)
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print("Regression: " + regression)
+        if len(regressions) > 0:
+            sys.exit(1)
+        print("No regressions against " + args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,106 @@
 """CLI script for running seed generation."""
 import argparse
-import codecs
 import json
-import pickle
+import multiprocessing
+import os
 import random
 import sys
+import time
 
+import js
+import randomizer.Fill as Fill
+import randomizer.Profiler as Profiler
 from randomizer.Fill import Generate_Spoiler
+from randomizer.PatchFile import EncodePatchFile
 from randomizer.Settings import Settings
 from randomizer.SettingStrings import decrypt_setting_string
 from randomizer.Spoiler import Spoiler
 
 
-def generate(generate_settings, file_name):
+def generate(generate_settings, file_name, profile_file=None):
     """Gen a seed and write the file to an output file."""
     settings = Settings(generate_settings)
     spoiler = Spoiler(settings)
-    Generate_Spoiler(spoiler)
-    encoded = codecs.encode(pickle.dumps(spoiler), "base64").decode()
+    if profile_file is not None:
+        Profiler.Start()
+        try:
+            Generate_Spoiler(spoiler)
+        finally:
+            Profiler.Stop().Write(profile_file)
+    else:
+        Generate_Spoiler(spoiler)
+    encoded = EncodePatchFile(spoiler)
     with open(file_name, "w") as outfile:
         outfile.write(encoded)
 
 
+def init_worker():
+    """Silence progress messages in batch workers, retries are reported in the summary instead."""
+    js.postMessage = lambda message: None
+
+
+def generate_job(job):
+    """Generate one seed of a batch, returning its entry for the summary."""
+    index, seed, generate_settings, file_name = job
+    entry = {"index": index, "seed": seed, "file": file_name, "error": None}
+    start = time.perf_counter()
+    profiler = Profiler.Start()
+    try:
+        generate(dict(generate_settings, seed=seed), file_name)
+    except Exception as ex:
+        entry["file"] = None
+        entry["error"] = type(ex).__name__ + ": " + str(ex)
+    Profiler.Stop()
+    entry["time"] = round(time.perf_counter() - start, 3)
+    entry["retries"] = len(profiler.retries)
+    entry["retry_causes"] = [retry["phase"] + ": " + retry["cause"] for retry in profiler.retries]
+    return entry
+
+
+def generate_batch(generate_settings, base_seed, count, jobs, output_dir):
+    """Gen count seeds over a pool of jobs processes, writing each to output_dir as it finishes."""
+    os.makedirs(output_dir, exist_ok=True)
+    # Seeds only depend on the base seed, so a batch is the same no matter how many jobs generate it
+    rng = random.Random(base_seed)
+    seeds = [rng.randint(0, 100000000) for i in range(count)]
+    batch = [(index, seed, generate_settings, os.path.join(output_dir, f"dk64-{seed}.lanky")) for index, seed in enumerate(seeds)]
+    entries = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(jobs, initializer=init_worker) as pool:
+        for entry in pool.imap_unordered(generate_job, batch):
+            entries.append(entry)
+            status = "failed (" + entry["error"] + ")" if entry["error"] is not None else "done"
+            print(f"[{len(entries)}/{count}] Seed {entry['seed']} {status} in {entry['time']}s with {entry['retries']} retries")
+    entries.sort(key=lambda entry: entry["index"])
+    failures = len([entry for entry in entries if entry["error"] is not None])
+    summary = {
+        "base_seed": base_seed,
+        "count": count,
+        "jobs": jobs,
+        "time": round(time.perf_counter() - start, 3),
+        "failures": failures,
+        "seeds": entries,
+    }
+    with open(os.path.join(output_dir, "summary.json"), "w") as outfile:
+        json.dump(summary, outfile, indent=4)
+    return failures
+
+
 def main():
     """CLI Entrypoint for generating seeds."""
     parser = argparse.ArgumentParser()
     parser.add_argument("--settings_string", help="The settings string to use to generate a seed", required=False)
     parser.add_argument("--preset", help="Preset to use", required=False)
-    parser.add_argument("--output", help="File to name patch file", required=True)
-    parser.add_argument("--seed", help="Seed ID to use", required=False)
+    parser.add_argument("--output", help="File to name patch file, or directory to write patch files and summary.json to with --count", required=True)
+    parser.add_argument("--seed", help="Seed ID to use, or to derive every seed from with --count", type=int, required=False)
+    parser.add_argument("--count", help="Number of seeds to generate", type=int, required=False)
+    parser.add_argument("--profile", help="File to write a JSON profile of seed generation to", required=False)
+    parser.add_argument("--jobs", help="Number of seeds to generate at once with --count", type=int, default=os.cpu_count(), required=False)
+    parser.add_argument("--woth_jobs", help="Number of processes to find the Way of the Hoard with when generating a single seed", type=int, default=1, required=False)
+    parser.add_argument("--fill_jobs", help="Number of processes to run fill attempts in at once when generating a single seed", type=int, default=1, required=False)
     args = parser.parse_args()
+    Fill.WothJobs = args.woth_jobs
+    Fill.FillJobs = args.fill_jobs
     if args.settings_string is not None:
         decrypt_setting_string(args.settings_string)
         try:
@@ -53,11 +124,16 @@ def main():
                     found = True
         if found is False:
             sys.exit(2)
+    if args.count is not None:
+        base_seed = args.seed if args.seed is not None else random.randint(0, 100000000)
+        if generate_batch(setting_data, base_seed, args.count, args.jobs, args.output) > 0:
+            sys.exit(1)
+        return
     if args.seed is not None:
         setting_data["seed"] = args.seed
     else:
         setting_data["seed"] = random.randint(0, 100000000)
-    generate(setting_data, args.output)
+    generate(setting_data, args.output, args.profile)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,10 @@
 """Generate Playthrough from the logic core."""
-import codecs
 import json
-import pickle
 import random
 import traceback
 
 from randomizer.Fill import Generate_Spoiler
+from randomizer.PatchFile import EncodePatchFile
 from randomizer.Settings import Settings
 from randomizer.Spoiler import Spoiler
 
@@ -26,7 +25,7 @@ def generate_playthrough(form_string: str):
         # Doing generation
         spoiler = Spoiler(settings)
         Generate_Spoiler(spoiler)
-        return codecs.encode(pickle.dumps(spoiler), "base64").decode()
+        return EncodePatchFile(spoiler)
     except Exception as e:
         print("error: " + traceback.format_exc())
         return json.dumps({"error": str(traceback.format_exc())})
@@ -0,0 +1,142 @@
+"""Fills made of steps which can be undone and retried without starting the whole fill over."""
+import js
+import randomizer.Fill as Fill
+import randomizer.Lists.Exceptions as Ex
+import randomizer.Logic as Logic
+import randomizer.Profiler as Profiler
+from randomizer.Lists.Location import LocationList
+
+# Settings the steps of a fill choose along with their placements
+JOURNALED_SETTINGS = (
+    "diddy_freeing_kong",
+    "lanky_freeing_kong",
+    "tiny_freeing_kong",
+    "chunky_freeing_kong",
+    "kongs_for_progression",
+    "EntryGBs",
+    "BossBananas",
+    "boss_kongs",
+    "boss_maps",
+    "owned_kongs_by_level",
+    "owned_moves_by_level",
+)
+# Every this many retries the fill is reshuffled and starts over from nothing
+RESHUFFLE_EVERY = 5
+
+
+class PlacementJournal:
+    """Journal of the item placements made by each step of a fill.
+
+    A mark is taken before each step runs, recording the item in every location along with the settings the steps
+    choose. Rolling back to a mark undoes every placement made since, while keeping those of the steps before it.
+    """
+
+    def __init__(self, settings):
+        """Initialize an empty journal for the given settings."""
+        self.settings = settings
+        self.marks = {}
+
+    def Mark(self, step):
+        """Record the state before a step runs."""
+        items = {locationId: location.item for locationId, location in LocationList.items()}
+        choices = {name: Copy(getattr(self.settings, name)) for name in JOURNALED_SETTINGS if hasattr(self.settings, name)}
+        self.marks[step] = (items, choices)
+
+    def Rollback(self, step):
+        """Undo everything since the mark of the given step, returning the number of placements undone."""
+        items, choices = self.marks[step]
+        undone = 0
+        for locationId, location in LocationList.items():
+            if location.item != items[locationId]:
+                location.item = items[locationId]
+                undone += 1
+        for name, value in choices.items():
+            setattr(self.settings, name, Copy(value))
+        self.marks = {x: mark for x, mark in self.marks.items() if x <= step}
+        return undone
+
+    def Clear(self):
+        """Forget every mark, returning the number of placements which will be undone by clearing every location."""
+        self.marks = {}
+        return len([x for x in LocationList.values() if x.item is not None])
+
+
+def Copy(value):
+    """Copy lists and dictionaries so later changes don't alter a mark."""
+    if isinstance(value, (list, dict)):
+        return value.copy()
+    return value
+
+
+class FillStep:
+    """A step of a fill."""
+
+    def __init__(self, name, function, retry):
+        """Initialize with given parameters."""
+        self.name = name
+        self.function = function
+        self.retry = retry
+
+
+class BacktrackingFill:
+    """Runs the steps of a fill in order, backtracking over the most recent steps when one fails.
+
+    The first failure undoes the placements of the latest step which can be retried, up to and including the step which
+    failed, and continues from there. Each further failure before getting past that point backtracks one step further.
+    Once there are no steps left to back up to, every location is cleared and the first step runs again. Every fifth
+    retry also does so, calling reshuffle first to change settings like prices which all placements depend on.
+    """
+
+    def __init__(self, settings, maxRetries, reshuffle=None):
+        """Initialize a fill with no steps."""
+        self.settings = settings
+        self.maxRetries = maxRetries
+        self.reshuffle = reshuffle
+        self.steps = []
+        self.results = {}
+        self.journal = PlacementJournal(settings)
+        self.retries = 0
+
+    def AddStep(self, name, function, retry=True):
+        """Add a step, which raises a FillException if it fails. Steps which can't succeed by running them again (e.g. checks) shouldn't be retried."""
+        self.steps.append(FillStep(name, function, retry))
+
+    def Run(self):
+        """Run every step, returning once they have all succeeded or raising the last failure once out of retries."""
+        step = 0
+        failedAt = None
+        depth = 0
+        while step < len(self.steps):
+            self.journal.Mark(step)
+            try:
+                self.results[self.steps[step].name] = self.steps[step].function()
+            except Ex.FillException as ex:
+                if self.retries == self.maxRetries:
+                    js.postMessage("Fill failed, out of retries.")
+                    raise ex
+                self.retries += 1
+                if failedAt is None or step > failedAt:
+                    failedAt = step
+                    depth = 0
+                targets = [x for x in range(step, -1, -1) if self.steps[x].retry]
+                Fill.Reset()
+                reshuffle = self.retries % RESHUFFLE_EVERY == 0 and self.reshuffle is not None
+                if reshuffle or depth >= len(targets):
+                    undone = self.journal.Clear()
+                    Logic.ClearAllLocations()
+                    Profiler.AddRetry("Fill", ex, undone)
+                    js.postMessage("Retrying fill. Tries: " + str(self.retries))
+                    if reshuffle:
+                        self.reshuffle()
+                    step = 0
+                    failedAt = None
+                else:
+                    step = targets[depth]
+                    depth += 1
+                    undone = self.journal.Rollback(step)
+                    Profiler.AddRetry("Fill", ex, undone)
+                    js.postMessage("Retrying fill from " + self.steps[step].name + ", undoing " + str(undone) + " placements. Tries: " + str(self.retries))
+                continue
+            step += 1
+            if failedAt is not None and step > failedAt:
+                failedAt = None
@@ -0,0 +1,121 @@
+"""Verification that no order of buying moves can leave the game unbeatable by running out of coins."""
+import randomizer.Fill as Fill
+import randomizer.Logic as Logic
+from randomizer.Enums.Items import Items
+from randomizer.Enums.Kongs import GetKongs
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Enums.Types import Types
+from randomizer.Lists.Item import ItemList
+from randomizer.Lists.Location import LocationList
+from randomizer.Prices import GetMaxForKong
+
+
+class PurchaseSearch:
+    """A completed search buying the moves of a purchase order, kept so later searches can build on it."""
+
+    def __init__(self, reachable, checkpoints):
+        """Save the result of a search which just finished."""
+        self.reachable = reachable
+        self.coins = Fill.LogicVariables.Coins.copy()
+        self.kongs = Fill.LogicVariables.GetKongs()
+        self.checkpoints = checkpoints
+        self.end = Logic.SearchCheckpoint(Fill.LogicVariables, reachable, [], [], False)
+
+    def Restore(self):
+        """Put the logic variables and region access back as they were when the search finished."""
+        self.end.Resume(Fill.LogicVariables)
+
+
+class CoinLockVerifier:
+    """Buys the least helpful reachable move again and again, until every kong has enough coins for the rest or the hoard is found.
+
+    Searching with one more purchase goes exactly like the search without it until the shop is found, as shops
+    which aren't bought change nothing. So each candidate's search resumes from the start of that iteration of
+    the last search instead of starting over, and the search of the move which is bought is the next one built on.
+    """
+
+    def __init__(self, settings):
+        """Initialize with nothing bought yet."""
+        self.settings = settings
+        self.purchases = []
+        self.maxCoins = [GetMaxForKong(settings, kong) for kong in GetKongs()]
+
+    def Search(self, purchases, base=None, shop=None):
+        """Search buying the given moves, resuming from the iteration of the base search which found the shop if given."""
+        checkpoints = []
+        resumeFrom = None
+        if base is None:
+            Fill.Reset()
+        else:
+            iteration = Fill.GetCheckpointIteration(base.checkpoints, shop)
+            checkpoints = base.checkpoints[:iteration]
+            resumeFrom = base.checkpoints[iteration]
+        reachable = Fill.GetAccessibleLocations(self.settings, [], SearchMode.GetReachableWithControlledPurchases, purchases, checkpoints=checkpoints, resumeFrom=resumeFrom)
+        return PurchaseSearch(reachable, checkpoints)
+
+    def Verify(self):
+        """Check if the world is valid, buying moves in the worst order found."""
+        current = self.Search(self.purchases)
+        while True:
+            current.Restore()
+            # Subtract the price of the chosen location from maxCoinsNeeded
+            itemsToPurchase = [LocationList[x].item for x in self.purchases]
+            coinsSpent = Fill.GetMaxCoinsSpent(self.settings, itemsToPurchase)
+            coinsNeeded = [self.maxCoins[kong] - coinsSpent[kong] for kong in range(0, 5)]
+            coinsBefore = current.coins
+            # If we found enough coins that every kong can buy all their moves, world is valid!
+            if all(coinsBefore[kong] >= coinsNeeded[kong] for kong in GetKongs()):
+                Fill.Reset()
+                return True
+            # If we found the BananaHoard, world is valid!
+            if any(LocationList[x].item == Items.BananaHoard for x in current.reachable):
+                Fill.Reset()
+                return True
+            # For each accessible shop location
+            newReachableShops = [
+                x
+                for x in current.reachable
+                if LocationList[x].type == Types.Shop and LocationList[x].item is not None and LocationList[x].item != Items.NoItem and x not in self.purchases and Fill.LogicVariables.CanBuy(x)
+            ]
+            # If no accessible shop locations found, means you got coin locked and the seed is not valid
+            if len(newReachableShops) == 0:
+                print("Seed is invalid, coin locked with purchase order: " + str([LocationList[x].name + ": " + LocationList[x].item.name + ", " for x in self.purchases]))
+                Fill.Reset()
+                return False
+            reachable = set(current.reachable)
+            searches = {}
+            shopDifferentials = {}
+            shopUnlocksItems = {}
+            locationToBuy = None
+            for shopLocation in newReachableShops:
+                # Recheck accessible to see how many coins will be available afterward
+                searches[shopLocation] = self.Search(self.purchases + [shopLocation], current, shopLocation)
+                # Calculate the coin differential
+                coinDifferential = [0, 0, 0, 0, 0]
+                for kong in searches[shopLocation].kongs:
+                    coinDifferential[kong] = searches[shopLocation].coins[kong] - coinsBefore[kong]
+                shopDifferentials[shopLocation] = coinDifferential
+                shopUnlocksItems[shopLocation] = [LocationList[x].item for x in searches[shopLocation].reachable if x not in reachable and LocationList[x].item is not None]
+                # Determine if this is the new worst move
+                if locationToBuy is None:
+                    locationToBuy = shopLocation
+                    continue
+                # Coin differential must be negative for at least one kong to be considered new worst
+                if len([x for x in shopDifferentials[shopLocation] if x < 0]) == 0:
+                    continue
+                # If a move unlocks new kongs it is more useful than others, even if it has a worse coin differential
+                existingMoveKongsUnlocked = len([x for x in shopUnlocksItems[locationToBuy] if ItemList[x].type == Types.Kong])
+                currentMoveKongsUnlocked = len([x for x in shopUnlocksItems[shopLocation] if ItemList[x].type == Types.Kong])
+                if currentMoveKongsUnlocked > existingMoveKongsUnlocked:
+                    continue
+                # If a move unlocks a new boss key it is more useful than others, even if it has a worse coin differential
+                existingMoveKeysUnlocked = len([x for x in shopUnlocksItems[locationToBuy] if ItemList[x].type == Types.Key])
+                currentMoveKeysUnlocked = len([x for x in shopUnlocksItems[shopLocation] if ItemList[x].type == Types.Key])
+                if currentMoveKeysUnlocked > existingMoveKeysUnlocked:
+                    continue
+                # All else equal, pick the move with the lowest overall coin differential
+                if sum(shopDifferentials[shopLocation]) < sum(shopDifferentials[locationToBuy]):
+                    locationToBuy = shopLocation
+            # Purchase the "least helpful" move, then carry on from the search which bought it
+            self.purchases.append(locationToBuy)
+            current = searches[locationToBuy]
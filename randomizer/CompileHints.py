@@ -2,6 +2,7 @@
 import random
 from re import U
 
+import randomizer.Profiler as Profiler
 from randomizer.Enums.Events import Events
 from randomizer.Enums.HintType import HintType
 from randomizer.Enums.Items import Items
@@ -276,7 +277,7 @@ kong_placement_levels = [
 
 # Hint distribution that will be adjusted based on settings
 # These values are "if this is an option, then you must have at least X of this hint"
-hint_distribution = {
+default_hint_distribution = {
     HintType.Joke: 1,
     HintType.KRoolOrder: 2,
     HintType.HelmOrder: 2,  # must have one on the path
@@ -292,8 +293,10 @@ hint_distribution = {
 HINT_CAP = 35  # There are this many total slots for hints
 
 
+@Profiler.Timed("compileHints")
 def compileHints(spoiler: Spoiler):
     """Create a hint distribution, generate buff hints, and place them in locations."""
+    hint_distribution = default_hint_distribution.copy()
     # Determine what hint types are valid for these settings
     valid_types = [HintType.Joke]
     if spoiler.settings.krool_phase_count < 5:
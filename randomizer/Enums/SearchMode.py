@@ -12,3 +12,5 @@ class SearchMode(IntEnum):
     GetUnreachable = auto()
     GetReachableWithControlledPurchases = auto()
     CheckSpecificItemReachable = auto()
+    # Same result as GetUnreachable, from a search which only evaluates logic that hasn't been met yet
+    GetUnreachableIncremental = auto()
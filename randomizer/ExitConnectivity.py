@@ -0,0 +1,67 @@
+"""Cheap checks of whether connecting shuffled exits keeps every location reachable, before resorting to a full search."""
+import randomizer.Fill as Fill
+from randomizer.Enums.Regions import Regions
+from randomizer.Lists.Location import LocationList
+from randomizer.RegionGraph import GetRegionGraph
+
+
+class ExitConnectivity:
+    """Decides connections of shuffled exits on the region graph alone where it can, falling back to Fill.VerifyWorld.
+
+    Connecting a front exit to a back exit only adds exits to the world, apart from the assumed exits from the root to
+    the regions on the far side of each newly shuffled exit. So once a full search has found every location reachable,
+    a connection is still valid if each of those regions keeps another assumed exit from the root, as the exits taken
+    away made no difference. It is invalid if some location is no longer in any region which can be reached from the root
+    even while ignoring logic. Anything in between needs the full search.
+    """
+
+    def __init__(self, settings, world):
+        """Initialize with no verified world to build on yet."""
+        self.settings = settings
+        self.world = world
+        self.verified = False
+
+    def Verify(self, detachedRegions):
+        """Check the world is still valid after a connection which took away the assumed exits from the root to the given regions."""
+        if not self.settings.no_logic:
+            valid = self.Decide(detachedRegions)
+            if valid is not None:
+                return valid
+        valid = Fill.VerifyWorld(self.settings)
+        # A rejected connection is undone, so the world stays the one verified last
+        if valid:
+            self.verified = True
+        return valid
+
+    def Decide(self, detachedRegions):
+        """Decide whether the world is still valid without searching it, returning None if that can't be done cheaply."""
+        rootExits = [x.dest for x in self.world.Regions[Regions.IslesMain].exits if x.assumed]
+        cutOff = [x for x in detachedRegions if x not in rootExits]
+        if self.verified and len(cutOff) == 0:
+            return True
+        graph = GetRegionGraph(self.settings)
+        cutOff = [graph.index[x] for x in cutOff]
+        # Any region which could only be reached through a detached region can be reached again through it, if it can be reached
+        reached = self.Reach(graph, set(cutOff))
+        if all(x in reached for x in cutOff):
+            return None
+        # Some locations are in more than one region, so only the locations themselves tell if the world is invalid
+        locations = set()
+        for i in self.Reach(graph):
+            locations.update(location.id for location in graph.regions[i].locations)
+        if any(x not in locations for x in LocationList):
+            return False
+        return None
+
+    def Reach(self, graph, targets=None):
+        """Get the ids of the regions reachable from the root ignoring logic, stopping early once every target has been reached."""
+        reached = {graph.root}
+        queue = [graph.root]
+        for i in queue:
+            for destination in graph.Destinations(i):
+                if destination not in reached:
+                    reached.add(destination)
+                    queue.append(destination)
+                    if targets is not None and targets <= reached:
+                        return reached
+        return reached
@@ -1,12 +1,19 @@
 """Module used to distribute items randomly."""
 import json
+import multiprocessing
 import random
+import time
 
 import js
 import randomizer.ItemPool as ItemPool
 import randomizer.Lists.Exceptions as Ex
 import randomizer.Logic as Logic
+import randomizer.Profiler as Profiler
+import randomizer.RegionGraph as RegionGraph
+import randomizer.SearchGoal as SearchGoal
 import randomizer.ShuffleExits as ShuffleExits
+from randomizer.Backtracking import BacktrackingFill, PlacementJournal
+from randomizer.CoinLockVerifier import CoinLockVerifier
 from randomizer.CompileHints import compileHints
 from randomizer.Enums.Events import Events
 from randomizer.Enums.Items import Items
@@ -16,19 +23,20 @@ from randomizer.Enums.Locations import Locations
 from randomizer.Enums.MinigameType import MinigameType
 from randomizer.Enums.Regions import Regions
 from randomizer.Enums.SearchMode import SearchMode
-from randomizer.Enums.Time import Time
 from randomizer.Enums.Transitions import Transitions
 from randomizer.Enums.Types import Types
 from randomizer.Enums.Warps import Warps
+from randomizer.IncrementalSearch import IncrementalSearch
+from randomizer.ItemMatching import ItemMatching, LocationMask
 from randomizer.Lists.Item import ItemList, KongFromItem
 from randomizer.Lists.Location import LocationList
 from randomizer.Lists.MapsAndExits import Maps
 from randomizer.Lists.Minigame import BarrelMetaData, MinigameRequirements
 from randomizer.Lists.ShufflableExit import GetLevelShuffledToIndex, GetShuffledLevelIndex
-from randomizer.Lists.Warps import BananaportVanilla
-from randomizer.Logic import STARTING_SLAM, LogicVarHolder, LogicVariables
-from randomizer.LogicClasses import Sphere, TransitionFront
-from randomizer.Prices import GetMaxForKong, GetPriceOfMoveItem
+from randomizer.Logic import STARTING_SLAM, LogicVariables
+from randomizer.LogicClasses import DayAccess, Inventory, NightAccess, Sphere, TransitionFront
+from randomizer.PlacementDomain import KongMoveDomain, PlacementDomain
+from randomizer.Prices import GetPriceOfMoveItem
 from randomizer.Settings import Settings
 from randomizer.ShuffleBarrels import BarrelShuffle
 from randomizer.ShuffleBosses import ShuffleBossesBasedOnOwnedItems
@@ -36,6 +44,7 @@ from randomizer.ShuffleKasplats import InitKasplatMap, KasplatShuffle
 from randomizer.ShufflePatches import ShufflePatches
 from randomizer.ShuffleShopLocations import ShuffleShopLocations
 from randomizer.ShuffleWarps import ShuffleWarps
+from randomizer.World import WorldReset
 
 
 def GetExitLevelExit(region):
@@ -63,25 +72,58 @@ def GetExitLevelExit(region):
         return ShuffleExits.ShufflableExits[Transitions.CastleToIsles].shuffledId
 
 
-def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReachable, purchaseList=None, targetItemId=None):
-    """Search to find all reachable locations given owned items."""
+def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReachable, purchaseList=None, targetItemId=None, checkpoints=None, resumeFrom=None):
+    """Search to find all reachable locations given owned items.
+
+    Given a checkpoints list, a SearchCheckpoint is appended to it at the start of every iteration.
+    Given resumeFrom, the search continues from that checkpoint instead of starting over, with ownedItems ignored.
+    """
     # No logic? Calls to this method that are checking things just return True
     if settings.no_logic and searchType in [SearchMode.CheckAllReachable, SearchMode.CheckBeatable, SearchMode.CheckSpecificItemReachable]:
         return True
-    if purchaseList is None:
-        purchaseList = []
+    return RunSearch(settings, ownedItems, searchType, purchaseList, targetItemId, checkpoints, resumeFrom)
+
+
+def RunSearch(settings, ownedItems, searchType=SearchMode.GetReachable, purchaseList=None, targetItemId=None, checkpoints=None, resumeFrom=None):
+    """Run the search for GetAccessibleLocations."""
+    Profiler.CountSearch(searchType)
+    graph = RegionGraph.GetRegionGraph(settings)
+    goalItem = SearchGoal.GetGoalItem(searchType, targetItemId)
+    # A goal no region could lead to, even ignoring logic, can't be found from the root or any region already accessed
+    if goalItem is not None and resumeFrom is None:
+        cone = SearchGoal.GetGoalCone(graph, goalItem)
+        if not any(i in cone for i, region in enumerate(graph.regions) if region.access or i == graph.root):
+            return False
+    # Locations are kept in discovery order for deterministic results, with sets alongside for membership checks
     accessible = []
     newLocations = []
-    playthroughLocations = []
     eventAdded = True
+    if resumeFrom is not None:
+        accessible, newLocations, ownedItems, eventAdded = resumeFrom.Resume(LogicVariables)
+    Logic.Rules.StartSearch(LogicVariables)
+    if searchType == SearchMode.GetUnreachableIncremental:
+        accessibleIds = set(IncrementalSearch(settings, graph, LogicVariables).Run(ownedItems))
+        return [x for x in LocationList if x not in accessibleIds]
+    if purchaseList is None:
+        purchaseList = []
+    accessibleIds = set(accessible)
+    newLocationIds = set(newLocations)
+    playthroughLocations = []
+    regions = graph.regions
+    exitStart, exitDest, exitSlot, exitLogic = graph.exitStart, graph.exitDest, graph.exitSlot, graph.exitLogic
+    exitTimeNeeded, exitTimePassed, overrides = graph.exitTimeNeeded, graph.exitTimePassed, graph.overrides
+    deathwarpDest, deathwarpLogic = graph.deathwarpDest, graph.deathwarpLogic
     # Continue doing searches until nothing new is found
     while len(newLocations) > 0 or eventAdded:
+        if checkpoints is not None:
+            checkpoints.append(Logic.SearchCheckpoint(LogicVariables, accessible, newLocations, ownedItems, eventAdded))
         # Add items and events from the last search iteration
         sphere = Sphere()
         if playthroughLocations:
             sphere.availableGBs = playthroughLocations[-1].availableGBs
         for locationId in newLocations:
             accessible.append(locationId)
+            accessibleIds.add(locationId)
             location = LocationList[locationId]
             # If this location has an item placed, add it to owned items
             if location.item is not None:
@@ -111,6 +153,7 @@ def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReacha
         eventAdded = False
         # Reset new lists
         newLocations = []
+        newLocationIds = set()
         # Update based on new items
         LogicVariables.Update(ownedItems)
 
@@ -118,20 +161,25 @@ def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReacha
         for kong in LogicVariables.GetKongs():
             LogicVariables.SetKong(kong)
 
-            startRegion = Logic.Regions[Regions.IslesMain]
-            startRegion.id = Regions.IslesMain
+            startRegion = regions[graph.root]
+            Logic.SearchState.TouchRegion(startRegion)
             startRegion.dayAccess = True
             startRegion.nightAccess = Events.Night in LogicVariables.Events
-            regionPool = [startRegion]
-            addedRegions = [Regions.IslesMain]
+            regionPool = [graph.root]
+            addedRegions = bytearray(len(regions))
+            addedRegions[graph.root] = True
 
-            tagAccess = [(key, value) for (key, value) in Logic.Regions.items() if value.HasAccess(kong) and key not in addedRegions]
-            addedRegions.extend([x[0] for x in tagAccess])  # first value is the region key
-            regionPool.extend([x[1] for x in tagAccess])  # second value is the region itself
+            kongAccess = 1 << kong
+            tagAccess = [i for i, region in enumerate(regions) if region.access & kongAccess and i != graph.root]
+            for i in tagAccess:
+                addedRegions[i] = True
+            regionPool.extend(tagAccess)
 
             # Loop for each region until no more accessible regions found
             while len(regionPool) > 0:
-                region = regionPool.pop()
+                regionIndex = regionPool.pop()
+                region = regions[regionIndex]
+                Logic.SearchState.TouchRegion(region)
                 region.UpdateAccess(kong, LogicVariables)  # Set that this kong has access to this region
                 LogicVariables.UpdateCurrentRegionAccess(region)  # Set in logic as well
 
@@ -139,20 +187,21 @@ def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReacha
                 for event in region.events:
                     if event.name not in LogicVariables.Events and event.logic(LogicVariables):
                         eventAdded = True
-                        LogicVariables.Events.append(event.name)
+                        LogicVariables.AddEvent(event.name)
                     # Can start searching with night access
                     # Check this even if Night's already been added, because you could
                     # lose night access from start to Forest main, then regain it here
                     if event.name == Events.Night and event.logic(LogicVariables):
                         region.nightAccess = True
                 # Check accessibility for collectibles
-                if region.id in Logic.CollectibleRegions.keys():
-                    for collectible in Logic.CollectibleRegions[region.id]:
+                collectibles = Logic.CollectibleRegions.get(region.id)
+                if collectibles is not None:
+                    for collectible in collectibles:
                         if not collectible.added and collectible.kong in (kong, Kongs.any) and collectible.logic(LogicVariables) and collectible.enabled:
                             LogicVariables.AddCollectible(collectible, region.level)
                 # Check accessibility for each location in this region
                 for location in region.locations:
-                    if location.logic(LogicVariables) and location.id not in newLocations and location.id not in accessible:
+                    if location.id not in newLocationIds and location.id not in accessibleIds and location.logic(LogicVariables):
                         # If this location is a bonus barrel, must make sure its logic is met as well
                         if (location.bonusBarrel is MinigameType.BonusBarrel and settings.bonus_barrels != "skip") or (
                             location.bonusBarrel is MinigameType.HelmBarrel and settings.helm_barrels != "skip"
@@ -171,63 +220,58 @@ def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReacha
                                 LogicVariables.PurchaseShopItem(LocationList[location.id])
                         elif location.id == Locations.NintendoCoin:
                             LogicVariables.Coins[Kongs.donkey] -= 2  # Subtract 2 coins for arcade lever
+                            Logic.Rules.Changed("Coins")
                         newLocations.append(location.id)
+                        newLocationIds.add(location.id)
+                        # Items are only picked up on the next iteration, so finding the goal's location already settles the search
+                        if goalItem is not None and LocationList[location.id].item == goalItem:
+                            return True
                 # Check accessibility for each exit in this region
-                exits = region.exits.copy()
-                # If loading zones are shuffled, the "Exit Level" button in the pause menu could potentially take you somewhere new
-                if settings.shuffle_loading_zones and region.level != Levels.DKIsles and region.level != Levels.Shops:
-                    levelExit = GetExitLevelExit(region)
-                    # When shuffling levels, unplaced level entrances will have no destination yet
-                    if levelExit is not None:
-                        dest = ShuffleExits.ShufflableExits[levelExit].back.regionId
-                        exits.append(TransitionFront(dest, lambda l: True))
-                for exit in exits:
-                    destination = exit.dest
-                    # If this exit has an entrance shuffle id and the shufflable exits list has it marked as shuffled,
-                    # use the entrance it was shuffled to by getting the region of the destination exit.
-                    # If the exit is assumed from root, do not look for a shuffled exit - just explore the destination
-                    if exit.exitShuffleId is not None and not exit.assumed:
-                        shuffledExit = ShuffleExits.ShufflableExits[exit.exitShuffleId]
-                        if shuffledExit.shuffled:
-                            destination = ShuffleExits.ShufflableExits[shuffledExit.shuffledId].back.regionId
-                        elif shuffledExit.toBeShuffled and not exit.assumed:
+                for exit in range(exitStart[regionIndex], exitStart[regionIndex + 1]):
+                    destination = exitDest[exit]
+                    # If this exit has been shuffled, use the region it was shuffled to, and skip it if it's yet to be shuffled
+                    slot = exitSlot[exit]
+                    if slot >= 0:
+                        override = overrides[slot]
+                        if override >= 0:
+                            destination = override
+                        elif override == RegionGraph.Unplaced:
                             continue
-                    # If a region is accessible through this exit and has not yet been added, add it to the queue to be visited eventually
-                    if destination not in addedRegions and exit.logic(LogicVariables):
-                        # Check time of day
-                        timeAccess = True
-                        if exit.time == Time.Night and not region.nightAccess:
-                            timeAccess = False
-                        elif exit.time == Time.Day and not region.dayAccess:
-                            timeAccess = False
-                        if timeAccess:
-                            addedRegions.append(destination)
-                            newRegion = Logic.Regions[destination]
-                            newRegion.id = destination
-                            regionPool.append(newRegion)
-                    # If it's accessible, update time of day access whether already added or not
-                    # This way if a region has access from 2 different regions, one time-restricted and one not,
-                    # it will be known that it can be accessed during either time of day
-                    if exit.logic(LogicVariables):
-                        # If this region has day access and the exit isn't restricted to night-only, then the destination has day access
-                        if region.dayAccess and exit.time != Time.Night and not Logic.Regions[destination].dayAccess:
-                            Logic.Regions[destination].dayAccess = True
+                    if exitLogic[exit](LogicVariables):
+                        # If a region is accessible through this exit and has not yet been added, add it to the queue to be visited eventually
+                        timeNeeded = exitTimeNeeded[exit]
+                        if not addedRegions[destination] and (timeNeeded == 0 or region.access & timeNeeded):
+                            addedRegions[destination] = True
+                            regionPool.append(destination)
+                        # If it's accessible, update time of day access whether already added or not
+                        # This way if a region has access from 2 different regions, one time-restricted and one not,
+                        # it will be known that it can be accessed during either time of day
+                        destRegion = regions[destination]
+                        timeAdded = region.access & exitTimePassed[exit] & ~destRegion.access
+                        if timeAdded:
+                            Logic.SearchState.TouchRegion(destRegion)
+                            destRegion.access |= timeAdded
                             # Count as event added so search doesn't get stuck if region is searched,
                             # then later a new time of day access is found so it should be re-visited
                             eventAdded = True
-                        # And vice versa
-                        if region.nightAccess and exit.time != Time.Day and not Logic.Regions[destination].nightAccess:
-                            Logic.Regions[destination].nightAccess = True
-                            eventAdded = True
+                # If loading zones are shuffled, the "Exit Level" button in the pause menu could potentially take you somewhere new
+                destination = graph.LevelExitDestination(regionIndex)
+                if destination >= 0:
+                    if not addedRegions[destination]:
+                        addedRegions[destination] = True
+                        regionPool.append(destination)
+                    destRegion = regions[destination]
+                    timeAdded = region.access & (DayAccess | NightAccess) & ~destRegion.access
+                    if timeAdded:
+                        Logic.SearchState.TouchRegion(destRegion)
+                        destRegion.access |= timeAdded
+                        eventAdded = True
                 # Deathwarps currently send to the vanilla destination
-                if region.deathwarp is not None:
-                    destination = region.deathwarp.dest
-                    # If a region is accessible through this exit and has not yet been added, add it to the queue to be visited eventually
-                    if destination not in addedRegions and region.deathwarp.logic(LogicVariables):
-                        addedRegions.append(destination)
-                        newRegion = Logic.Regions[destination]
-                        newRegion.id = destination
-                        regionPool.append(newRegion)
+                destination = deathwarpDest[regionIndex]
+                # If a region is accessible through this exit and has not yet been added, add it to the queue to be visited eventually
+                if destination >= 0 and not addedRegions[destination] and deathwarpLogic[regionIndex](LogicVariables):
+                    addedRegions[destination] = True
+                    regionPool.append(destination)
 
     if searchType in (SearchMode.GetReachable, SearchMode.GetReachableWithControlledPurchases):
         return accessible
@@ -239,7 +283,7 @@ def GetAccessibleLocations(settings, ownedItems, searchType=SearchMode.GetReacha
     elif searchType == SearchMode.CheckAllReachable:
         return len(accessible) == len(LocationList)
     elif searchType == SearchMode.GetUnreachable:
-        return [x for x in LocationList if x not in accessible]
+        return [x for x in LocationList if x not in accessibleIds]
 
 
 def VerifyWorld(settings):
@@ -247,118 +291,39 @@ def VerifyWorld(settings):
     if settings.no_logic:
         return True  # Don't verify world in no logic
     ItemPool.PlaceConstants(settings)
-    unreachables = GetAccessibleLocations(settings, ItemPool.AllItems(settings), SearchMode.GetUnreachable)
+    unreachables = GetAccessibleLocations(settings, ItemPool.AllItems(settings), SearchMode.GetUnreachableIncremental)
     isValid = len(unreachables) == 0
     Reset()
     return isValid
 
 
+@Profiler.Timed("VerifyWorldWithWorstCoinUsage")
 def VerifyWorldWithWorstCoinUsage(settings):
     """Make sure the game is beatable without it being possible to run out of coins for required moves."""
     if settings.no_logic:
         return True  # Don't verify world in no logic
-    locationsToPurchase = []
-    reachable = []
-    maxCoins = [
-        GetMaxForKong(settings, Kongs.donkey),
-        GetMaxForKong(settings, Kongs.diddy),
-        GetMaxForKong(settings, Kongs.lanky),
-        GetMaxForKong(settings, Kongs.tiny),
-        GetMaxForKong(settings, Kongs.chunky),
-    ]
-    while True:
-        Reset()
-        reachable = GetAccessibleLocations(settings, [], SearchMode.GetReachableWithControlledPurchases, locationsToPurchase)
-        # Subtract the price of the chosen location from maxCoinsNeeded
-        itemsToPurchase = [LocationList[x].item for x in locationsToPurchase]
-        coinsSpent = GetMaxCoinsSpent(settings, itemsToPurchase)
-        coinsNeeded = [maxCoins[kong] - coinsSpent[kong] for kong in range(0, 5)]
-        coinsBefore = LogicVariables.Coins.copy()
-        # print("Coins owned during search: " + str(coinsBefore))
-        # print("Coins needed during search: " + str(coinsNeeded))
-        # If we found enough coins that every kong can buy all their moves, world is valid!
-        if (
-            coinsBefore[Kongs.donkey] >= coinsNeeded[Kongs.donkey]
-            and coinsBefore[Kongs.diddy] >= coinsNeeded[Kongs.diddy]
-            and coinsBefore[Kongs.lanky] >= coinsNeeded[Kongs.lanky]
-            and coinsBefore[Kongs.tiny] >= coinsNeeded[Kongs.tiny]
-            and coinsBefore[Kongs.chunky] >= coinsNeeded[Kongs.chunky]
-        ):
-            # print("Seed is valid, found enough coins with worst purchase order: " + str([LocationList[x].name + ": " + LocationList[x].item.name + ", " for x in locationsToPurchase]))
-            Reset()
-            return True
-        # If we found the BananaHoard, world is valid!
-        if len([x for x in reachable if LocationList[x].item == Items.BananaHoard]) > 0:
-            # print("Seed is valid, found banana hoard with worst purchase order: " + str([LocationList[x].name + ": " + LocationList[x].item.name + ", " for x in locationsToPurchase]))
-            Reset()
-            return True
-        # For each accessible shop location
-        newReachableShops = [
-            x
-            for x in reachable
-            if LocationList[x].type == Types.Shop and LocationList[x].item is not None and LocationList[x].item != Items.NoItem and x not in locationsToPurchase and LogicVariables.CanBuy(x)
-        ]
-        shopDifferentials = {}
-        shopUnlocksItems = {}
-        # If no accessible shop locations found, means you got coin locked and the seed is not valid
-        if len(newReachableShops) == 0:
-            print("Seed is invalid, coin locked with purchase order: " + str([LocationList[x].name + ": " + LocationList[x].item.name + ", " for x in locationsToPurchase]))
-            Reset()
-            return False
-        locationToBuy = None
-        # print("Accessible Shops: " + str([LocationList[x].name for x in newReachableShops]))
-        for shopLocation in newReachableShops:
-            # print("Check buying " + LocationList[shopLocation].item.name + " from location " + LocationList[shopLocation].name)
-            # Recheck accessible to see how many coins will be available afterward
-            tempLocationsToPurchase = locationsToPurchase.copy()
-            tempLocationsToPurchase.append(shopLocation)
-            Reset()
-            reachableAfter: list = GetAccessibleLocations(settings, [], SearchMode.GetReachableWithControlledPurchases, tempLocationsToPurchase)
-            coinsAfter = LogicVariables.Coins.copy()
-            # Calculate the coin differential
-            coinDifferential = [0, 0, 0, 0, 0]
-            for kong in LogicVariables.GetKongs():
-                coinDifferential[kong] = coinsAfter[kong] - coinsBefore[kong]
-            # print("Coin differential: " + str(coinDifferential))
-            shopDifferentials[shopLocation] = coinDifferential
-            shopUnlocksItems[shopLocation] = [LocationList[x].item for x in reachableAfter if x not in reachable and LocationList[x].item is not None]
-            # Determine if this is the new worst move
-            if locationToBuy is None:
-                locationToBuy = shopLocation
-                continue
-            # Coin differential must be negative for at least one kong to be considered new worst
-            if len([x for x in shopDifferentials[shopLocation] if x < 0]) == 0:
-                continue
-            # If a move unlocks new kongs it is more useful than others, even if it has a worse coin differential
-            existingMoveKongsUnlocked = len([x for x in shopUnlocksItems[locationToBuy] if ItemList[x].type == Types.Kong])
-            currentMoveKongsUnlocked = len([x for x in shopUnlocksItems[shopLocation] if ItemList[x].type == Types.Kong])
-            if currentMoveKongsUnlocked > existingMoveKongsUnlocked:
-                continue
-            # If a move unlocks a new boss key it is more useful than others, even if it has a worse coin differential
-            existingMoveKeysUnlocked = len([x for x in shopUnlocksItems[locationToBuy] if ItemList[x].type == Types.Key])
-            currentMoveKeysUnlocked = len([x for x in shopUnlocksItems[shopLocation] if ItemList[x].type == Types.Key])
-            if currentMoveKeysUnlocked > existingMoveKeysUnlocked:
-                continue
-            # All else equal, pick the move with the lowest overall coin differential
-            existingMoveCoinDiff = sum(list(shopDifferentials[locationToBuy]))
-            currentMoveCoinDiff = sum(list(shopDifferentials[shopLocation]))
-            if currentMoveCoinDiff < existingMoveCoinDiff:
-                locationToBuy = shopLocation
-        # Purchase the "least helpful" move & add to owned Items
-        # print("Choosing to buy " + LocationList[locationToBuy].item.name + " from " + LocationList[locationToBuy].name)
-        locationsToPurchase.append(locationToBuy)
+    return CoinLockVerifier(settings).Verify()
 
 
 def Reset():
     """Reset logic variables and region info that should be reset before a search."""
     LogicVariables.Reset()
-    Logic.ResetRegionAccess()
-    Logic.ResetCollectibleRegions()
+    Logic.SearchState.Restore()
 
 
+@Profiler.Timed("ParePlaythrough")
 def ParePlaythrough(settings, PlaythroughLocations):
-    """Pare playthrough down to only the essential elements."""
+    """Pare playthrough down to only the essential elements.
+
+    Every check removes one more item and searches for the Banana Hoard again. The last search to reach it is kept as
+    a checkpoint per iteration: a location that search never found can't matter, and otherwise the search without the
+    location's item runs exactly the same until the iteration where the location was found, so it resumes from there.
+    An emptied shop costs nothing and may be found sooner without its item, which changes nothing but when it is found.
+    """
     locationsToAddBack = []
+    Reset()
+    beatenSearch = []
+    GetAccessibleLocations(settings, [], SearchMode.CheckBeatable, checkpoints=beatenSearch)
     mostExpensiveBLocker = max([settings.blocker_0, settings.blocker_1, settings.blocker_2, settings.blocker_3, settings.blocker_4, settings.blocker_5, settings.blocker_6, settings.blocker_7])
     # Check every location in the list of spheres.
     for i in range(len(PlaythroughLocations) - 2, -1, -1):
@@ -375,8 +340,15 @@ def ParePlaythrough(settings, PlaythroughLocations):
             item = location.item
             location.item = None
             # Check if the game is still beatable
-            Reset()
-            if GetAccessibleLocations(settings, [], SearchMode.CheckBeatable):
+            foundIn = GetCheckpointIteration(beatenSearch, locationId)
+            if foundIn is None:
+                beatable = True
+            else:
+                checkpoints = []
+                beatable = GetAccessibleLocations(settings, [], SearchMode.CheckBeatable, checkpoints=checkpoints, resumeFrom=beatenSearch[foundIn])
+                if beatable:
+                    beatenSearch = beatenSearch[:foundIn] + checkpoints
+            if beatable:
                 # If the game is still beatable, this is an unnecessary location, remove it.
                 sphere.locations.remove(locationId)
                 # We delay the item to ensure future locations which may rely on this one
@@ -398,6 +370,16 @@ def ParePlaythrough(settings, PlaythroughLocations):
         LocationList[locationId].PlaceDelayedItem()
 
 
+def GetCheckpointIteration(checkpoints, locationId):
+    """Get the index of the checkpoint at the start of the search iteration which found a location, or None if it wasn't found."""
+    # Locations found in an iteration are the new locations of the next one
+    for i in range(1, len(checkpoints)):
+        if locationId in checkpoints[i].newLocations:
+            return i - 1
+    return None
+
+
+@Profiler.Timed("PareWoth")
 def PareWoth(settings, PlaythroughLocations):
     """Pare playthrough to locations which are Way of the Hoard (hard required by logic)."""
     # The functionality is similar to ParePlaythrough, but we want to see if individual locations are
@@ -407,26 +389,56 @@ def PareWoth(settings, PlaythroughLocations):
         # Don't want constant locations in woth
         for loc in [x for x in sphere.locations if not LocationList[x].constant]:
             WothLocations.append(loc)
+    # ParePlaythrough already removes unnecessary slams. Any slams that get here are required.
+    candidates = [x for x in WothLocations if LocationList[x].item != Items.ProgressiveSlam]
     # Check every item location to see if removing it by itself makes the game unbeatable
-    for i in range(len(WothLocations) - 1, -1, -1):
-        locationId = WothLocations[i]
-        location = LocationList[locationId]
-        item = location.item
-        # ParePlaythrough already removes unnecessary slams. Any slams that get here are required.
-        if item == Items.ProgressiveSlam:
-            continue
-        location.item = None
-        # Check if game is still beatable
-        Reset()
-        if GetAccessibleLocations(settings, [], SearchMode.CheckBeatable):
-            # If game is still beatable, this location is not hard required
+    # Each check puts the world back the way it found it, so they can run in any order or in separate processes
+    if CanForkWothWorkers(len(candidates)):
+        with multiprocessing.get_context("fork").Pool(min(WothJobs, len(candidates)), initializer=InitWothWorker, initargs=(settings,)) as pool:
+            stillBeatable = pool.map(IsBeatableWithoutLocation, candidates)
+    else:
+        stillBeatable = [IsBeatableWithoutLocation(locationId, settings) for locationId in candidates]
+    for locationId, beatable in zip(candidates, stillBeatable):
+        # If game is still beatable, this location is not hard required
+        if beatable:
             WothLocations.remove(locationId)
-        # Either way, add location back
-        location.PlaceItem(item)
     return WothLocations
 
 
-def RandomFill(itemsToPlace, validLocations):
+# Number of processes PareWoth may spread its beatability checks over, if processes can be forked here
+WothJobs = 1
+# Settings of the seed being pared, inherited by forked PareWoth workers
+WothSettings = None
+
+
+def CanForkWothWorkers(checkCount):
+    """Check if PareWoth should fork worker processes for the given number of checks."""
+    if WothJobs <= 1 or checkCount <= 1:
+        return False
+    # Workers of a process pool (e.g. a batch from the CLI) are not allowed to start processes of their own
+    return "fork" in multiprocessing.get_all_start_methods() and not multiprocessing.current_process().daemon
+
+
+def InitWothWorker(settings):
+    """Prepare a forked process to run PareWoth checks against its copy of the world."""
+    global WothSettings
+    WothSettings = settings
+
+
+def IsBeatableWithoutLocation(locationId, settings=None):
+    """Check if the game is still beatable without the item at the given location, then put the item back."""
+    if settings is None:
+        settings = WothSettings
+    location = LocationList[locationId]
+    item = location.item
+    location.item = None
+    Reset()
+    beatable = GetAccessibleLocations(settings, [], SearchMode.CheckBeatable)
+    location.PlaceItem(item)
+    return beatable
+
+
+def RandomFill(itemsToPlace, domain):
     """Randomly place given items in any location disregarding logic."""
     random.shuffle(itemsToPlace)
     # Get all remaining empty locations
@@ -437,7 +449,8 @@ def RandomFill(itemsToPlace, validLocations):
     # Place item in random locations
     while len(itemsToPlace) > 0:
         item = itemsToPlace.pop()
-        itemEmpty = [x for x in empty if x in GetItemValidLocations(validLocations, item)]
+        itemMask = domain.Mask(item)
+        itemEmpty = [x for x in empty if itemMask >> x & 1]
         if len(itemEmpty) == 0:
             return len(itemsToPlace)
         random.shuffle(itemEmpty)
@@ -447,7 +460,7 @@ def RandomFill(itemsToPlace, validLocations):
     return 0
 
 
-def ForwardFill(settings, itemsToPlace, validLocations, ownedItems=None):
+def ForwardFill(settings, itemsToPlace, domain, ownedItems=None):
     """Forward fill algorithm for item placement."""
     if ownedItems is None:
         ownedItems = []
@@ -456,57 +469,53 @@ def ForwardFill(settings, itemsToPlace, validLocations, ownedItems=None):
     # While there are items to place
     while len(itemsToPlace) > 0:
         # Find a random empty location which is reachable with current items
+        item = itemsToPlace[-1]
+        itemMask = domain.Mask(item)
         reachable = GetAccessibleLocations(settings, ownedItems.copy())
-        reachable = [x for x in reachable if LocationList[x].item is None and x in validLocations]
+        reachable = [x for x in reachable if LocationList[x].item is None and itemMask >> x & 1]
         if len(reachable) == 0:  # If there are no empty reachable locations, reached a dead end
             return len(itemsToPlace)
         random.shuffle(reachable)
         locationId = reachable.pop()
-        # Get a random item and place it there, also adding to owned items
-        item = itemsToPlace.pop()
+        # Place the random item there, also adding to owned items
+        itemsToPlace.pop()
         ownedItems.append(item)
         LocationList[locationId].PlaceItem(item)
     return 0
 
 
-def GetItemValidLocations(validLocations, item):
-    """Get the list of valid locations for this item."""
-    # If validLocations is a dictionary, check for this item's value
-    itemValidLocations = validLocations
-    if isinstance(validLocations, dict):
-        for itemKey in validLocations.keys():
-            if item == itemKey:
-                itemValidLocations = validLocations[itemKey]
-                break
-            # Valid locations entry wasn't found
-            itemValidLocations = list(LocationList)
-    return itemValidLocations
-
-
-def AssumedFill(settings, itemsToPlace, validLocations, ownedItems=None, isPriorityMove=False):
+def AssumedFill(settings, itemsToPlace, domain, ownedItems=None, isPriorityMove=False):
     """Assumed fill algorithm for item placement."""
     if ownedItems is None:
         ownedItems = []
     # Calculate total cost of moves
     maxCoinsSpent = GetMaxCoinsSpent(settings, itemsToPlace + ownedItems)
+    # Items still assumed to be owned, kept in step with itemsToPlace
+    ownedInventory = Inventory(itemsToPlace + ownedItems)
     # While there are items to place
     random.shuffle(itemsToPlace)
+    # Each item's valid locations are matched against the empty reachable locations after every placement
+    matching = ItemMatching([domain.Mask(item) for item in itemsToPlace])
+    slot = -1
     while len(itemsToPlace) > 0:
         # Get a random item, check which empty locations are still accessible without owning it
         item = itemsToPlace.pop(0)
+        slot += 1
+        matching.Remove(slot)
+        ownedInventory.Remove(item)
         itemShuffled = False
         owned = itemsToPlace.copy()
         owned.extend(ownedItems)
         # Check current level of each progressive move
-        slamLevel = sum(1 for x in owned if x == Items.ProgressiveSlam) + STARTING_SLAM
-        ammoBelts = sum(1 for x in owned if x == Items.ProgressiveAmmoBelt)
-        instUpgrades = sum(1 for x in owned if x == Items.ProgressiveInstrumentUpgrade)
+        slamLevel = ownedInventory.Count(Items.ProgressiveSlam) + STARTING_SLAM
+        ammoBelts = ownedInventory.Count(Items.ProgressiveAmmoBelt)
+        instUpgrades = ownedInventory.Count(Items.ProgressiveInstrumentUpgrade)
         # print("slamLevel: " + str(slamLevel) + ", ammoBelts: " + str(ammoBelts) + ", instUpgrades: " + str(instUpgrades))
-        itemValidLocations = GetItemValidLocations(validLocations, item)
+        itemValidMask = domain.Mask(item)
         # Find all valid reachable locations for this item
         Reset()
         reachable = GetAccessibleLocations(settings, owned)
-        validReachable = [x for x in reachable if LocationList[x].item is None and x in itemValidLocations]
+        validReachable = [x for x in reachable if LocationList[x].item is None and itemValidMask >> x & 1]
         # If there are no empty reachable locations, reached a dead end
         if len(validReachable) == 0:
             print("Failed placing item " + ItemList[item].name + ", no valid reachable locations without this item.")
@@ -598,16 +607,10 @@ def AssumedFill(settings, itemsToPlace, validLocations, ownedItems=None, isPrior
             owned.extend(ownedItems)
             Reset()
             reachable = GetAccessibleLocations(settings, owned)
-            valid = True
-            # For each remaining item, ensure that it has a valid location reachable after placing this item
-            for checkItem in itemsToPlace:
-                itemValid = GetItemValidLocations(validLocations, checkItem)
-                validReachable = [x for x in reachable if x in itemValid and x != locationId]
-                if len(validReachable) == 0:
-                    js.postMessage("Failed placing item " + ItemList[item].name + " in location " + LocationList[locationId].name + ", due to too few remaining locations in play")
-                    valid = False
-                    break
-                reachable.remove(validReachable[0])  # Remove one so same location can't be "used" twice
+            # Ensure every remaining item can still be given its own valid, empty location reachable after placing this item
+            valid = matching.IsFeasible(LocationMask([x for x in reachable if LocationList[x].item is None]))
+            if not valid:
+                js.postMessage("Failed placing item " + ItemList[item].name + " in location " + LocationList[locationId].name + ", due to too few remaining locations in play")
             # Attempt to verify coins
             # This check is skipped for priority items for the following reasons:
             # - We place only a handful of priority items and they must be bought anyway, so other expensive moves should be shifted instead
@@ -635,7 +638,7 @@ def AssumedFill(settings, itemsToPlace, validLocations, ownedItems=None, isPrior
             itemShuffled = True
             break
         if not itemShuffled:
-            js.postMessage("Failed placing item " + ItemList[item].name + " in any of remaining " + str(len(validLocations)) + " possible locations")
+            js.postMessage("Failed placing item " + ItemList[item].name + " in any of remaining " + str(len(domain.Locations(item))) + " possible locations")
             return len(itemsToPlace) + 1
     return 0
 
@@ -643,9 +646,10 @@ def AssumedFill(settings, itemsToPlace, validLocations, ownedItems=None, isPrior
 def GetMaxCoinsSpent(settings, ownedItems):
     """Calculate the max number of coins each kong could have spent given the ownedItems and the price settings."""
     MaxCoinsSpent = [0, 0, 0, 0, 0]
-    slamLevel = sum(1 for x in ownedItems if x == Items.ProgressiveSlam) + STARTING_SLAM
-    ammoBelts = sum(1 for x in ownedItems if x == Items.ProgressiveAmmoBelt)
-    instUpgrades = sum(1 for x in ownedItems if x == Items.ProgressiveInstrumentUpgrade)
+    ownedInventory = Inventory(ownedItems)
+    slamLevel = ownedInventory.Count(Items.ProgressiveSlam) + STARTING_SLAM
+    ammoBelts = ownedInventory.Count(Items.ProgressiveAmmoBelt)
+    instUpgrades = ownedInventory.Count(Items.ProgressiveInstrumentUpgrade)
     for ownedItem in ownedItems:
         if ItemList[ownedItem].type == Types.Shop:
             moveKong = ItemList[ownedItem].kong
@@ -672,10 +676,8 @@ def GetMaxCoinsSpent(settings, ownedItems):
 def GetItemPrerequisites(spoiler, targetItemId, ownedKongs=[]):
     """Given the target item and the current world state, find a valid, minimal, unplaced set of items required to reach the location it is in."""
     # The most likely case - if no moves are needed, get out of here quickly
-    Reset()
-    if GetAccessibleLocations(spoiler.settings, [], SearchMode.CheckSpecificItemReachable, targetItemId=targetItemId):
+    if CanReachItem(spoiler.settings, [], targetItemId):
         return []
-    requiredMoves = []
     if ownedKongs == []:
         ownedKongs = GetKongs()
     # Some locations can be accessed by multiple items, so we'll shuffle the order we check the items to randomly pick one of them first
@@ -687,18 +689,8 @@ def GetItemPrerequisites(spoiler, targetItemId, ownedKongs=[]):
     #     Either [Items.Guitar, Items.Coconut] OR [Items.Guitar, Items.Feather]
     moveList = [move for move in ItemPool.OwnedKongMoves(ownedKongs) if move != targetItemId]
     random.shuffle(moveList)
-    lastRequiredMove = None
-    for move in moveList:
-        # For each move, see if adding it to the list of required moves gives us access to the location
-        requiredMoves.append(move)
-        Reset()
-        if GetAccessibleLocations(spoiler.settings, requiredMoves.copy(), SearchMode.CheckSpecificItemReachable, targetItemId=targetItemId):
-            # If it does give us access, then we don't need any more moves
-            # Note the last required move for later
-            lastRequiredMove = move
-            break
-    # If we didn't find a required move, the item was placed improperly somehow (this shouldn't happen)
-    if lastRequiredMove is None:
+    # If even every move doesn't give us access, the item was placed improperly somehow (this shouldn't happen)
+    if not CanReachItem(spoiler.settings, moveList, targetItemId):
         # DEBUG CODE - This helps find where items are being placed
         mysteryLocation = None
         for possibleLocationThisItemGotPlaced in GetValidLocationsForMove(spoiler, targetItemId):
@@ -708,33 +700,55 @@ def GetItemPrerequisites(spoiler, targetItemId, ownedKongs=[]):
         if mysteryLocation is None:
             raise Ex.ItemPlacementException("Target item not placed??")
         raise Ex.ItemPlacementException("Item placed in an inaccessible location: " + str(mysteryLocation.name))
-    # requiredMoves now contains all items that are required, but probably a bunch of useless stuff too
+    # Owning more moves never loses access, so bisect for the shortest run of moves from the start of the list which gives us access
+    # The last move in that run is required, as the run without it doesn't give us access
+    unreachableCount = 0
+    reachableCount = len(moveList)
+    while reachableCount - unreachableCount > 1:
+        count = (unreachableCount + reachableCount) // 2
+        if CanReachItem(spoiler.settings, moveList[:count], targetItemId):
+            reachableCount = count
+        else:
+            unreachableCount = count
+    lastRequiredMove = moveList[reachableCount - 1]
+    # The moves before it probably include a bunch of useless stuff too
     # Time to cull moves until we get to only exactly what we need
-    while requiredMoves != [] and requiredMoves[0] != lastRequiredMove:
-        # Remove the first item and see if we can still access the target
-        possiblyUnnecessaryItem = requiredMoves.pop(0)
-        Reset()
-        if not GetAccessibleLocations(spoiler.settings, requiredMoves.copy(), SearchMode.CheckSpecificItemReachable, targetItemId=targetItemId):
-            # If it's no longer accessible, then re-add it to the end of the list
-            requiredMoves.append(possiblyUnnecessaryItem)
-        # Repeat until we find the last required move
-    return requiredMoves
+    requiredMoves = []
+    CullItemPrerequisites(spoiler.settings, targetItemId, requiredMoves, moveList[: reachableCount - 1], [lastRequiredMove])
+    return [lastRequiredMove] + requiredMoves
+
+
+def CanReachItem(settings, moves, targetItemId):
+    """Check if the target item can be reached owning only the given moves."""
+    Reset()
+    return GetAccessibleLocations(settings, moves.copy(), SearchMode.CheckSpecificItemReachable, targetItemId=targetItemId)
+
+
+def CullItemPrerequisites(settings, targetItemId, requiredMoves, candidateMoves, laterMoves, needed=False):
+    """Add the candidate moves to requiredMoves which the target item can't be reached without, given every move required so far and every later move.
+
+    The moves are kept as if each were removed in turn, keeping it if the target item was no longer reachable without it. But since
+    owning fewer moves never gains access, a run of moves which can all be removed at once is removed with a single search.
+    """
+    if len(candidateMoves) == 0:
+        return
+    # If the target item is still reachable without any of them, none of them are needed
+    if not needed and CanReachItem(settings, requiredMoves + laterMoves, targetItemId):
+        return
+    if len(candidateMoves) == 1:
+        requiredMoves.append(candidateMoves[0])
+        return
+    # Otherwise split them in half and check each half
+    half = len(candidateMoves) // 2
+    requiredCount = len(requiredMoves)
+    CullItemPrerequisites(settings, targetItemId, requiredMoves, candidateMoves[:half], candidateMoves[half:] + laterMoves)
+    # If none of the first half were needed, removing the second half as well is the check which just failed
+    CullItemPrerequisites(settings, targetItemId, requiredMoves, candidateMoves[half:], laterMoves, len(requiredMoves) == requiredCount)
 
 
 def GetValidLocationsForMove(spoiler, move):
     """Return the valid locations for the given move. Currently only returns shop locations for moves."""
-    validLocations = []
-    if spoiler.settings.move_rando == "cross_purchase" or move in ItemPool.DonkeyMoves:
-        validLocations.extend(ItemPool.DonkeyMoveLocations.copy())
-    if spoiler.settings.move_rando == "cross_purchase" or move in ItemPool.DiddyMoves:
-        validLocations.extend(ItemPool.DiddyMoveLocations.copy())
-    if spoiler.settings.move_rando == "cross_purchase" or move in ItemPool.TinyMoves:
-        validLocations.extend(ItemPool.TinyMoveLocations.copy())
-    if spoiler.settings.move_rando == "cross_purchase" or move in ItemPool.ChunkyMoves:
-        validLocations.extend(ItemPool.ChunkyMoveLocations.copy())
-    if spoiler.settings.move_rando == "cross_purchase" or move in ItemPool.LankyMoves:
-        validLocations.extend(ItemPool.LankyMoveLocations.copy())
-    return list(validLocations)
+    return KongMoveDomain(spoiler.settings).Locations(move)
 
 
 def PlaceItems(settings, algorithm, itemsToPlace, ownedItems=None, validLocations=None, isPriorityMove=False):
@@ -749,53 +763,56 @@ def PlaceItems(settings, algorithm, itemsToPlace, ownedItems=None, validLocation
     # If list of valid locations not provided, just use all valid locations
     if len(validLocations) == 0:
         validLocations = list(LocationList)
+    domain = PlacementDomain(validLocations)
+    itemCount = len(itemsToPlace)
+    start = time.perf_counter()
     if algorithm == "assumed":
-        return AssumedFill(settings, itemsToPlace, validLocations, ownedItems, isPriorityMove)
+        unplaced = AssumedFill(settings, itemsToPlace, domain, ownedItems, isPriorityMove)
     elif algorithm == "forward":
-        return ForwardFill(settings, itemsToPlace, validLocations, ownedItems)
+        unplaced = ForwardFill(settings, itemsToPlace, domain, ownedItems)
     elif algorithm == "random":
-        return RandomFill(itemsToPlace, validLocations)
+        unplaced = RandomFill(itemsToPlace, domain)
+    else:
+        return None
+    Profiler.AddPlacement(itemCount - unplaced, time.perf_counter() - start)
+    return unplaced
 
 
+@Profiler.Timed("Fill")
 def Fill(spoiler):
     """Fully randomizes and places all items. Currently theoretical."""
-    retries = 0
-    while True:
-        try:
-            # First place constant items
-            ItemPool.PlaceConstants(spoiler.settings)
-            # Then place priority (logically very important) items
-            highPriorityUnplaced = PlaceItems(spoiler.settings, spoiler.settings.algorithm, ItemPool.HighPriorityItems(spoiler.settings), ItemPool.HighPriorityAssumedItems(spoiler.settings))
-            if highPriorityUnplaced > 0:
-                raise Ex.ItemPlacementException(str(highPriorityUnplaced) + " unplaced high priority items.")
-            # Then place blueprints
-            Reset()
-            blueprintsUnplaced = PlaceItems(spoiler.settings, spoiler.settings.algorithm, ItemPool.Blueprints(spoiler.settings), ItemPool.BlueprintAssumedItems(spoiler.settings))
-            if blueprintsUnplaced > 0:
-                raise Ex.ItemPlacementException(str(blueprintsUnplaced) + " unplaced blueprints.")
-            # Then place the rest of items
-            Reset()
-            lowPriorityUnplaced = PlaceItems(spoiler.settings, spoiler.settings.algorithm, ItemPool.LowPriorityItems(spoiler.settings), ItemPool.ExcessItems(spoiler.settings))
-            if lowPriorityUnplaced > 0:
-                raise Ex.ItemPlacementException(str(lowPriorityUnplaced) + " unplaced low priority items.")
-            # Finally place excess items fully randomly
-            hi = ItemPool.ExcessItems(spoiler.settings)
-            excessUnplaced = PlaceItems(spoiler.settings, "random", ItemPool.ExcessItems(spoiler.settings))
-            if excessUnplaced > 0:
-                raise Ex.ItemPlacementException(str(excessUnplaced) + " unplaced excess items.")
-            # Check if game is beatable
-            Reset()
-            if not GetAccessibleLocations(spoiler.settings, [], SearchMode.CheckBeatable):
-                raise Ex.GameNotBeatableException("Game unbeatable after placing all items.")
-            return
-        except Ex.FillException as ex:
-            if retries == 4:
-                js.postMessage("Fill failed, out of retries.")
-                raise ex
-            retries += 1
-            js.postMessage("Retrying fill. Tries: " + str(retries))
-            Reset()
-            Logic.ClearAllLocations()
+    settings = spoiler.settings
+    fill = BacktrackingFill(settings, 4)
+    # First place constant items
+    fill.AddStep("constants", lambda: ItemPool.PlaceConstants(settings), retry=False)
+    # Then place priority (logically very important) items
+    fill.AddStep("high priority items", lambda: PlaceAllItems(settings, settings.algorithm, ItemPool.HighPriorityItems(settings), ItemPool.HighPriorityAssumedItems(settings), "high priority items"))
+    # Then place blueprints
+    fill.AddStep("blueprints", lambda: PlaceAllItems(settings, settings.algorithm, ItemPool.Blueprints(settings), ItemPool.BlueprintAssumedItems(settings), "blueprints", reset=True))
+    # Then place the rest of items
+    fill.AddStep("low priority items", lambda: PlaceAllItems(settings, settings.algorithm, ItemPool.LowPriorityItems(settings), ItemPool.ExcessItems(settings), "low priority items", reset=True))
+    # Finally place excess items fully randomly
+    fill.AddStep("excess items", lambda: PlaceAllItems(settings, "random", ItemPool.ExcessItems(settings), [], "excess items"))
+    # Check if game is beatable
+    fill.AddStep("beatable check", lambda: CheckFillBeatable(settings, lambda: GetAccessibleLocations(settings, [], SearchMode.CheckBeatable), reset=True), retry=False)
+    fill.Run()
+
+
+def PlaceAllItems(settings, algorithm, itemsToPlace, ownedItems, description, reset=False):
+    """Place items with the given algorithm, raising an exception if any are left unplaced."""
+    if reset:
+        Reset()
+    unplaced = PlaceItems(settings, algorithm, itemsToPlace, ownedItems)
+    if unplaced > 0:
+        raise Ex.ItemPlacementException(str(unplaced) + " unplaced " + description + ".")
+
+
+def CheckFillBeatable(settings, check, reset=False):
+    """Raise an exception if the check of the filled world fails."""
+    if reset:
+        Reset()
+    if not check():
+        raise Ex.GameNotBeatableException("Game unbeatable after placing all items.")
 
 
 def ShuffleSharedMoves(spoiler):
@@ -836,46 +853,24 @@ def ShuffleSharedMoves(spoiler):
             sharedMoveShops.append(sharedLocation)
     locationsToRemove = ItemPool.GetMoveLocationsToRemove(sharedMoveShops)
     # Now we need to set up the valid locations dictionary
-    validLocations = {}
-    kongMoveArrays = [ItemPool.DonkeyMoves, ItemPool.DiddyMoves, ItemPool.LankyMoves, ItemPool.TinyMoves, ItemPool.ChunkyMoves]
-    kongLocationArrays = [ItemPool.DonkeyMoveLocations, ItemPool.DiddyMoveLocations, ItemPool.LankyMoveLocations, ItemPool.TinyMoveLocations, ItemPool.ChunkyMoveLocations]
-    mergedLocationArrays = ItemPool.DonkeyMoveLocations.copy()
-    mergedLocationArrays.update(ItemPool.DiddyMoveLocations.copy())
-    mergedLocationArrays.update(ItemPool.LankyMoveLocations.copy())
-    mergedLocationArrays.update(ItemPool.TinyMoveLocations.copy())
-    mergedLocationArrays.update(ItemPool.ChunkyMoveLocations.copy())
-    for i in range(5):
-        for item in kongMoveArrays[i]:
-            if spoiler.settings.move_rando == "cross_purchase":
-                validLocations[item] = mergedLocationArrays - locationsToRemove
-            else:
-                validLocations[item] = kongLocationArrays[i] - locationsToRemove
+    moveDomain = KongMoveDomain(spoiler.settings)
+    validLocations = {item: moveDomain.Locations(item) - locationsToRemove for item in kongMoves}
     return (kongMoves, validLocations)
 
 
+@Profiler.Timed("Fill")
 def FillKongsAndMovesGeneric(spoiler):
     """Facilitate shuffling individual pools of items in lieu of full item rando."""
-    retries = 0
-    while True:
-        try:
-            FillKongsAndMoves(spoiler)
-            # Check if game is beatable
-            Reset()
-            if not VerifyWorldWithWorstCoinUsage(spoiler.settings):
-                raise Ex.GameNotBeatableException("Game unbeatable after placing all items.")
-            return
-        except Ex.FillException as ex:
-            if retries == 20:
-                js.postMessage("Fill failed, out of retries.")
-                raise ex
-            retries += 1
-            if retries % 5 == 0:
-                spoiler.settings.shuffle_prices()
-            js.postMessage("Retrying fill. Tries: " + str(retries))
-            Reset()
-            Logic.ClearAllLocations()
+    settings = spoiler.settings
+    fill = BacktrackingFill(settings, 20, settings.shuffle_prices)
+    fill.AddStep("kongs", lambda: PlaceKongsAndPriorityMoves(spoiler))
+    fill.AddStep("moves", lambda: PlaceMoves(spoiler, fill.results["kongs"]))
+    # Check if game is beatable
+    fill.AddStep("beatable check", lambda: CheckFillBeatable(settings, lambda: VerifyWorldWithWorstCoinUsage(settings), reset=True), retry=False)
+    fill.Run()
 
 
+@Profiler.Timed("GeneratePlaythrough")
 def GeneratePlaythrough(spoiler):
     """Generate playthrough and way of the hoard and update spoiler."""
     # Generate and display the playthrough
@@ -1011,10 +1006,9 @@ def PlaceKongs(spoiler, kongItems, kongLocations):
         spoiler.settings.chunky_freeing_kong = random.choice(GetKongs())
 
 
-def FillKongsAndMoves(spoiler):
-    """Fill kongs, then progression moves, then shared moves, then rest of moves."""
-    itemsToPlace = []
-    validLocations = {}
+@Profiler.Timed("FillKongsAndMoves")
+def PlaceKongsAndPriorityMoves(spoiler):
+    """Fill kongs, then the progression moves needed to free them, returning the moves placed."""
     preplacedPriorityMoves = []
 
     # Handle kong rando
@@ -1142,7 +1136,14 @@ def FillKongsAndMoves(spoiler):
                     levelIndex = (levelIndex % latestLogicallyAllowedLevel) + 1
                 # Undo any level blocking that may have been performed
                 BlockAccessToLevel(spoiler.settings, 100)
+    return preplacedPriorityMoves
+
 
+@Profiler.Timed("FillKongsAndMoves")
+def PlaceMoves(spoiler, preplacedPriorityMoves):
+    """Fill shared moves, then the rest of the moves not already placed as progression moves."""
+    itemsToPlace = []
+    validLocations = {}
     # Handle shared moves before other moves in move rando
     if spoiler.settings.shuffle_items == "moves":
         # Shuffle the shared move locations since they must be done first,
@@ -1159,7 +1160,8 @@ def FillKongsAndMoves(spoiler):
         raise Ex.ItemPlacementException(str(unplaced) + " unplaced items.")
 
 
-def FillKongsAndMovesForLevelOrder(spoiler):
+@Profiler.Timed("Fill")
+def FillKongsAndMovesForLevelOrder(spoiler, world):
     """Shuffle Kongs and Moves accounting for level order restrictions."""
     # All methods here follow this Kongs vs level progression rule:
     # Must be able to have 2 kongs no later than level 2
@@ -1176,40 +1178,114 @@ def FillKongsAndMovesForLevelOrder(spoiler):
     #   7. Fungi
     # ALGORITHM START
     # print("Starting Kongs: " + str([kong.name + " " for kong in spoiler.settings.starting_kong_list]))
-    retries = 0
-    while True:
-        try:
-            # Need to place constants to update boss key items after shuffling levels
-            ItemPool.PlaceConstants(spoiler.settings)
-            # Assume we can progress through the levels so long as we have enough kongs
-            WipeProgressionRequirements(spoiler.settings)
-            spoiler.settings.kongs_for_progression = True
-            # Fill the kongs and the moves
-            FillKongsAndMoves(spoiler)
-            # Update progression requirements based on what is now accessible after all shuffles are done
-            SetNewProgressionRequirements(spoiler.settings)
-            # Once progression requirements updated, no longer assume we need kongs freed for level progression
-            spoiler.settings.kongs_for_progression = False
-            # Check if game is beatable
-            if not VerifyWorldWithWorstCoinUsage(spoiler.settings):
-                raise Ex.GameNotBeatableException("Game unbeatable after placing all items.")
-            return
-        except Ex.FillException as ex:
-            Reset()
-            Logic.ClearAllLocations()
-            retries += 1
-            if retries == 20:
-                js.postMessage("Fill failed, out of retries.")
-                raise ex
-            # Every 5th fill, retry more aggressively by reshuffling level order and move prices
-            if retries % 5 == 0:
-                js.postMessage("Retrying fill really hard. Tries: " + str(retries))
-                spoiler.settings.shuffle_prices()
-                if spoiler.settings.shuffle_loading_zones == "levels":
-                    ShuffleExits.ShuffleExits(spoiler.settings)
-                    spoiler.UpdateExits()
-            else:
-                js.postMessage("Retrying fill. Tries: " + str(retries))
+    # Each attempt starts from the world as it is now, so attempts can run in any order or in separate processes
+    start = PlacementJournal(spoiler.settings)
+    start.Mark(0)
+    startRandom = random.getstate()
+    if CanForkFillWorkers():
+        # Attempts run ahead speculatively, but the earliest one to succeed is always the one used
+        with multiprocessing.get_context("fork").Pool(min(FillJobs, FillAttempts), initializer=InitFillWorker, initargs=(spoiler, world, start, startRandom), maxtasksperchild=1) as pool:
+            for attempt, ex in enumerate(pool.imap(TryFillAttempt, range(FillAttempts))):
+                if ex is None:
+                    break
+                FailFillAttempt(attempt, ex)
+        # Workers only report whether their attempt succeeded, so the winning attempt is run again here to fill this world
+        RunFillAttempt(spoiler, world, start, startRandom, attempt)
+    else:
+        for attempt in range(FillAttempts):
+            ex = TryFillAttempt(attempt, spoiler, world, start, startRandom)
+            if ex is None:
+                break
+            FailFillAttempt(attempt, ex)
+
+
+# Number of attempts at filling kongs and moves for a level order, each with its own backtracking retries
+FillAttempts = 4
+# Number of retries within each attempt
+FillAttemptRetries = 4
+# Number of processes FillKongsAndMovesForLevelOrder may run attempts in at once, if processes can be forked here
+FillJobs = 1
+# Spoiler, world, starting state and random state of the fill, inherited by forked fill attempt workers
+FillAttemptState = None
+
+
+def CanForkFillWorkers():
+    """Check if FillKongsAndMovesForLevelOrder should fork worker processes to run attempts in."""
+    # With only one attempt running at a time, workers would just add a replay of the winning attempt
+    if min(FillJobs, FillAttempts) <= 1:
+        return False
+    # Workers of a process pool (e.g. a batch from the CLI) are not allowed to start processes of their own
+    return "fork" in multiprocessing.get_all_start_methods() and not multiprocessing.current_process().daemon
+
+
+def InitFillWorker(spoiler, world, start, startRandom):
+    """Prepare a forked process to run fill attempts against its copy of the world."""
+    global FillAttemptState
+    FillAttemptState = (spoiler, world, start, startRandom)
+    # Progress of attempts which may not be used would only be noise
+    js.postMessage = lambda message: None
+
+
+def TryFillAttempt(attempt, spoiler=None, world=None, start=None, startRandom=None):
+    """Run a fill attempt, returning the exception it failed with or None if it succeeded."""
+    if spoiler is None:
+        spoiler, world, start, startRandom = FillAttemptState
+    try:
+        RunFillAttempt(spoiler, world, start, startRandom, attempt)
+    except (Ex.FillException, Ex.EntrancePlacementException) as ex:
+        return ex
+    return None
+
+
+def FailFillAttempt(attempt, ex):
+    """Report a failed fill attempt, raising its exception if it was the last one."""
+    if attempt == FillAttempts - 1:
+        js.postMessage("Fill failed, out of attempts.")
+        raise ex
+    Profiler.AddRetry("Fill", ex)
+    js.postMessage("Retrying fill really hard. Attempts: " + str(attempt + 1))
+
+
+def RunFillAttempt(spoiler, world, start, startRandom, attempt):
+    """Fill kongs and moves for a level order, starting from the world as it was before any attempt."""
+    settings = spoiler.settings
+    start.Rollback(0)
+    Reset()
+    # The first attempt carries on with the seed's own random numbers, which forked processes don't inherit by default.
+    # Every later attempt has its own sub-seed, so it makes the same choices no matter which attempts ran before it.
+    if attempt == 0:
+        random.setstate(startRandom)
+    else:
+        random.seed(settings.seed + "-fill-" + str(attempt))
+        # Later attempts also reshuffle the level order and move prices, in case those were what made the fill fail
+        settings.shuffle_prices()
+        if settings.shuffle_loading_zones == "levels":
+            ShuffleExits.ShuffleExits(settings, world)
+            spoiler.UpdateExits()
+    fill = BacktrackingFill(settings, FillAttemptRetries)
+    # Need to place constants to update boss key items after shuffling levels, and assume we can progress through the levels so long as we have enough kongs
+    fill.AddStep("progression", lambda: AssumeKongProgression(settings), retry=False)
+    # Fill the kongs and the moves
+    fill.AddStep("kongs", lambda: PlaceKongsAndPriorityMoves(spoiler))
+    fill.AddStep("moves", lambda: PlaceMoves(spoiler, fill.results["kongs"]))
+    # Update progression requirements based on what is now accessible after all shuffles are done, then check if game is beatable
+    fill.AddStep("beatable check", lambda: CheckFillBeatable(settings, lambda: SetKongProgression(settings)), retry=False)
+    fill.Run()
+
+
+def AssumeKongProgression(settings):
+    """Place constants and assume progression through the levels only needs enough kongs."""
+    ItemPool.PlaceConstants(settings)
+    WipeProgressionRequirements(settings)
+    settings.kongs_for_progression = True
+
+
+def SetKongProgression(settings):
+    """Set the progression requirements of the filled world, then verify it."""
+    SetNewProgressionRequirements(settings)
+    # Once progression requirements updated, no longer assume we need kongs freed for level progression
+    settings.kongs_for_progression = False
+    return VerifyWorldWithWorstCoinUsage(settings)
 
 
 def GetAccessibleKongLocations(levels: list, ownedKongs: list):
@@ -1326,31 +1402,33 @@ def BlockAccessToLevel(settings: Settings, level):
     ShuffleExits.UpdateLevelProgression(settings)
 
 
+@Profiler.Timed("Generate_Spoiler")
 def Generate_Spoiler(spoiler):
     """Generate a complete spoiler based on input settings."""
-    # Init logic vars with settings
+    # Start from a fresh world, with logic vars initialized from settings
+    world = WorldReset(spoiler.settings)
     global LogicVariables
-    LogicVariables = LogicVarHolder(spoiler.settings)
+    LogicVariables = world.LogicVariables
     # Initiate kasplat map with default
     InitKasplatMap(LogicVariables)
     # Handle Kong Rando + Level Rando combination separately since it is more restricted
     if spoiler.settings.kongs_for_progression:
         # Handle Level Order if randomized
         if spoiler.settings.shuffle_loading_zones == "levels":
-            ShuffleExits.ShuffleExits(spoiler.settings)
+            ShuffleExits.ShuffleExits(spoiler.settings, world)
             spoiler.UpdateExits()
         # Assume we can progress through the levels, since these will be adjusted within FillKongsAndMovesForLevelRando
         WipeProgressionRequirements(spoiler.settings)
         # Handle misc randomizations
-        ShuffleMisc(spoiler)
+        ShuffleMisc(spoiler, world)
         # Handle Item Fill
-        FillKongsAndMovesForLevelOrder(spoiler)
+        FillKongsAndMovesForLevelOrder(spoiler, world)
     else:
         # Handle misc randomizations
-        ShuffleMisc(spoiler)
+        ShuffleMisc(spoiler, world)
         # Handle Loading Zones
         if spoiler.settings.shuffle_loading_zones != "none":
-            ShuffleExits.ExitShuffle(spoiler.settings)
+            ShuffleExits.ExitShuffle(spoiler.settings, world)
             spoiler.UpdateExits()
         # Handle Item Fill
         if spoiler.settings.shuffle_items == "all":
@@ -1366,44 +1444,46 @@ def Generate_Spoiler(spoiler):
     if spoiler.settings.wrinkly_hints in ["standard", "cryptic"]:
         compileHints(spoiler)
     Reset()
-    ShuffleExits.Reset()
+    ShuffleExits.Reset(world)
     return spoiler
 
 
-def ShuffleMisc(spoiler):
+@Profiler.Timed("ShuffleMisc")
+def ShuffleMisc(spoiler, world):
     """Shuffle miscellaneous objects outside of main fill algorithm, including Kasplats, Bonus barrels, and bananaport warps."""
     # Handle kasplats
-    KasplatShuffle(spoiler, LogicVariables)
+    KasplatShuffle(spoiler, world)
     spoiler.human_kasplats = {}
     spoiler.UpdateKasplats(LogicVariables.kasplat_map)
     # Handle bonus barrels
     if spoiler.settings.bonus_barrels in ("random", "selected"):
-        BarrelShuffle(spoiler.settings)
+        BarrelShuffle(spoiler.settings, world)
         spoiler.UpdateBarrels()
     # Handle Bananaports
     if spoiler.settings.bananaport_rando:
         replacements = []
         human_replacements = {}
-        ShuffleWarps(replacements, human_replacements)
+        ShuffleWarps(world, replacements, human_replacements)
         spoiler.bananaport_replacements = replacements.copy()
         spoiler.human_warp_locations = human_replacements
     if spoiler.settings.random_patches:
         human_patches = []
-        spoiler.human_patches = ShufflePatches(spoiler, human_patches).copy()
+        spoiler.human_patches = ShufflePatches(spoiler, world, human_patches).copy()
     if spoiler.settings.shuffle_shops:
-        ShuffleShopLocations(spoiler)
+        ShuffleShopLocations(spoiler, world)
     if spoiler.settings.activate_all_bananaports in ["all", "isles"]:
-        warpMapIds = set([BananaportVanilla[warp].map_id for warp in Warps])
+        warpMapIds = set([world.BananaportVanilla[warp].map_id for warp in Warps])
         for map_id in warpMapIds:
-            mapWarps = [BananaportVanilla[warp] for warp in Warps if BananaportVanilla[warp].map_id == map_id]
+            mapWarps = [world.BananaportVanilla[warp] for warp in Warps if world.BananaportVanilla[warp].map_id == map_id]
             for warpData in mapWarps:
                 pairedWarpData = [
-                    BananaportVanilla[pair]
+                    world.BananaportVanilla[pair]
                     for pair in Warps
-                    if BananaportVanilla[pair].map_id == map_id and BananaportVanilla[pair].new_warp == warpData.new_warp and BananaportVanilla[pair].name != warpData.name
+                    if world.BananaportVanilla[pair].map_id == map_id and world.BananaportVanilla[pair].new_warp == warpData.new_warp and world.BananaportVanilla[pair].name != warpData.name
                 ][0]
                 # Add an exit to each warp's region to the paired warp's region unless it's the same region
                 if warpData.region_id != pairedWarpData.region_id and (spoiler.settings.activate_all_bananaports == "all" or (warpData.map_id == Maps.Isles)):
-                    warpRegion = Logic.Regions[warpData.region_id]
+                    warpRegion = world.Regions[warpData.region_id]
                     bananaportExit = TransitionFront(pairedWarpData.region_id, lambda l: True)
                     warpRegion.exits.append(bananaportExit)
+    RegionGraph.InvalidateRegionGraph()
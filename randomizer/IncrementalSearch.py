@@ -0,0 +1,220 @@
+"""Incremental reachability search, run by Fill.RunSearch for SearchMode.GetUnreachableIncremental."""
+import randomizer.Logic as Logic
+from randomizer.Enums.Events import Events
+from randomizer.Enums.Kongs import Kongs
+from randomizer.Enums.Locations import Locations
+from randomizer.Enums.MinigameType import MinigameType
+from randomizer.Enums.Types import Types
+from randomizer.Lists.Location import LocationList
+from randomizer.Lists.Minigame import BarrelMetaData, MinigameRequirements
+from randomizer.LogicClasses import DayAccess, NightAccess
+from randomizer.RegionGraph import Unplaced
+
+
+class IncrementalSearch:
+    """Reachability search which keeps what each kong has reached between iterations.
+
+    The full search walks every region again from the root for every owned kong in every iteration. This search
+    remembers the regions each kong has reached and which of them still have events, collectibles, locations or
+    exits whose logic wasn't met. Each iteration only visits those regions and the ones reached since, so logic
+    which has been met is never evaluated again. Only the search modes whose result doesn't depend on the order
+    locations are found in can be run this way.
+    """
+
+    def __init__(self, settings, graph, logicVariables):
+        """Initialize a search of the region graph, with nothing reached yet."""
+        self.settings = settings
+        self.graph = graph
+        self.logic = logicVariables
+        self.accessible = []
+        self.accessibleIds = set()
+        self.newLocations = []
+        self.newLocationIds = set()
+        # Regions reached, regions with logic still unmet and regions waiting for a visit, for each kong
+        self.reached = {}
+        self.pending = {}
+        self.queued = {}
+        self.changed = True
+
+    def Run(self, ownedItems):
+        """Search until nothing new is found, returning the ids of the locations found."""
+        graph = self.graph
+        logic = self.logic
+        root = graph.regions[graph.root]
+        while len(self.newLocations) > 0 or self.changed:
+            for locationId in self.newLocations:
+                self.accessible.append(locationId)
+                self.accessibleIds.add(locationId)
+                location = LocationList[locationId]
+                if location.item is not None:
+                    ownedItems.append(location.item)
+            self.newLocations = []
+            self.newLocationIds = set()
+            self.changed = False
+            logic.Update(ownedItems)
+            for kong in logic.GetKongs():
+                logic.SetKong(kong)
+                if kong not in self.reached:
+                    self.AddKong(kong)
+                Logic.SearchState.TouchRegion(root)
+                access = root.access
+                root.dayAccess = True
+                root.nightAccess = Events.Night in logic.Events
+                if root.access & ~access:
+                    self.Requeue(graph.root)
+                self.Expand(kong)
+        return self.accessible
+
+    def AddKong(self, kong):
+        """Start a kong's search from the root, and from every region it shares with the kongs searched so far through tag barrels."""
+        graph = self.graph
+        reached = bytearray(len(graph.regions))
+        self.reached[kong] = reached
+        self.pending[kong] = {}
+        self.queued[kong] = [graph.root]
+        reached[graph.root] = True
+        kongAccess = 1 << kong
+        for i, region in enumerate(graph.regions):
+            if i == graph.root:
+                continue
+            if region.access & kongAccess or (region.tagbarrel and any(others[i] for others in self.reached.values())):
+                reached[i] = True
+                self.queued[kong].append(i)
+
+    def Reach(self, kong, i, worklist):
+        """Mark a region as reached by a kong, to be visited in this iteration."""
+        if not self.reached[kong][i]:
+            self.reached[kong][i] = True
+            worklist.append(i)
+
+    def Requeue(self, i):
+        """Visit a region again with every kong which has reached it, as its time of day access changed."""
+        for kong, reached in self.reached.items():
+            if reached[i]:
+                self.queued[kong].append(i)
+        self.changed = True
+
+    def Expand(self, kong):
+        """Visit the regions a kong reached since its last pass, and the ones where some of its logic is still unmet."""
+        worklist = [i for i in self.pending[kong] if i not in self.queued[kong]] + self.queued[kong]
+        self.queued[kong] = []
+        pending = {}
+        self.pending[kong] = pending
+        visited = bytearray(len(self.graph.regions))
+        while len(worklist) > 0:
+            i = worklist.pop()
+            if visited[i]:
+                continue
+            visited[i] = True
+            if self.Visit(kong, i, worklist):
+                pending[i] = None
+
+    def Visit(self, kong, i, worklist):
+        """Evaluate the logic of a region which is still unmet for a kong, returning whether any of it still is."""
+        graph = self.graph
+        logic = self.logic
+        region = graph.regions[i]
+        Logic.SearchState.TouchRegion(region)
+        region.UpdateAccess(kong, logic)
+        logic.UpdateCurrentRegionAccess(region)
+        # Tag barrels let every owned kong into the region
+        if region.tagbarrel:
+            for other in logic.GetKongs():
+                if other != kong and other in self.reached and not self.reached[other][i]:
+                    self.reached[other][i] = True
+                    self.queued[other].append(i)
+                    self.changed = True
+        unmet = False
+        for event in region.events:
+            if event.name == Events.Night:
+                # Night can be regained in a region after the event itself was found elsewhere
+                if region.access & NightAccess:
+                    continue
+                if event.logic(logic):
+                    if Events.Night not in logic.Events:
+                        logic.AddEvent(Events.Night)
+                    region.nightAccess = True
+                    self.Requeue(i)
+                else:
+                    unmet = True
+            elif event.name not in logic.Events:
+                if event.logic(logic):
+                    logic.AddEvent(event.name)
+                    self.changed = True
+                else:
+                    unmet = True
+        collectibles = Logic.CollectibleRegions.get(region.id)
+        if collectibles is not None:
+            for collectible in collectibles:
+                if collectible.added or not collectible.enabled or collectible.kong not in (kong, Kongs.any):
+                    continue
+                if collectible.logic(logic):
+                    logic.AddCollectible(collectible, region.level)
+                else:
+                    unmet = True
+        for location in region.locations:
+            if location.id in self.accessibleIds or location.id in self.newLocationIds:
+                continue
+            if location.logic(logic) and self.LocationRequirementsMet(location):
+                self.newLocations.append(location.id)
+                self.newLocationIds.add(location.id)
+            else:
+                unmet = True
+        overrides = graph.overrides
+        for exit in range(graph.exitStart[i], graph.exitStart[i + 1]):
+            destination = graph.exitDest[exit]
+            slot = graph.exitSlot[exit]
+            if slot >= 0:
+                override = overrides[slot]
+                if override >= 0:
+                    destination = override
+                elif override == Unplaced:
+                    continue
+            if self.reached[kong][destination] and not region.access & graph.exitTimePassed[exit] & ~graph.regions[destination].access:
+                continue
+            if not graph.exitLogic[exit](logic):
+                unmet = True
+                continue
+            timeNeeded = graph.exitTimeNeeded[exit]
+            if timeNeeded == 0 or region.access & timeNeeded:
+                self.Reach(kong, destination, worklist)
+            else:
+                unmet = True
+            self.PassTime(region, destination, graph.exitTimePassed[exit])
+        # If loading zones are shuffled, the "Exit Level" button in the pause menu could potentially take you somewhere new
+        destination = graph.LevelExitDestination(i)
+        if destination >= 0:
+            self.Reach(kong, destination, worklist)
+            self.PassTime(region, destination, DayAccess | NightAccess)
+        # Deathwarps currently send to the vanilla destination
+        destination = graph.deathwarpDest[i]
+        if destination >= 0 and not self.reached[kong][destination]:
+            if graph.deathwarpLogic[i](logic):
+                self.Reach(kong, destination, worklist)
+            else:
+                unmet = True
+        return unmet
+
+    def PassTime(self, region, destination, timePassed):
+        """Pass on the times of day a region can be reached at through one of its exits."""
+        destRegion = self.graph.regions[destination]
+        timeAdded = region.access & timePassed & ~destRegion.access
+        if timeAdded:
+            Logic.SearchState.TouchRegion(destRegion)
+            destRegion.access |= timeAdded
+            self.Requeue(destination)
+
+    def LocationRequirementsMet(self, location):
+        """Check the requirements a location has on top of its logic, paying for it if it is a shop."""
+        logic = self.logic
+        if (location.bonusBarrel is MinigameType.BonusBarrel and self.settings.bonus_barrels != "skip") or (location.bonusBarrel is MinigameType.HelmBarrel and self.settings.helm_barrels != "skip"):
+            return MinigameRequirements[BarrelMetaData[location.id].minigame].logic(logic)
+        locationType = LocationList[location.id].type
+        if locationType == Types.Blueprint:
+            return logic.KasplatAccess(location.id)
+        elif locationType == Types.Shop:
+            logic.PurchaseShopItem(LocationList[location.id])
+        elif location.id == Locations.NintendoCoin:
+            logic.Coins[Kongs.donkey] -= 2  # Subtract 2 coins for arcade lever
+            Logic.Rules.Changed("Coins")
+        return True
@@ -0,0 +1,102 @@
+"""Matching of items still to be placed to the empty locations they could go in."""
+
+
+def LocationMask(locations):
+    """Get the bitset of the given location ids."""
+    mask = 0
+    for locationId in locations:
+        mask |= 1 << locationId
+    return mask
+
+
+class ItemMatching:
+    """Incremental bipartite matching between items still to be placed and distinct available locations.
+
+    Each item is a slot holding the bitset of its valid locations. A fill is only still possible if every remaining
+    slot can be given its own available location, which is found with Hopcroft-Karp augmenting path phases. The
+    matching is kept between checks, so after one placement only the slots which lost their location need a new one.
+    """
+
+    def __init__(self, masks):
+        """Initialize with the bitset of valid locations for each slot."""
+        self.masks = list(masks)
+        self.remaining = set(range(len(self.masks)))
+        self.locationOf = {}
+        self.slotAt = {}
+
+    def Remove(self, slot):
+        """Stop matching a slot, as its item has been placed."""
+        self.remaining.discard(slot)
+        self.Unmatch(slot)
+
+    def Unmatch(self, slot):
+        """Free the location matched to a slot, if there is one."""
+        location = self.locationOf.pop(slot, None)
+        if location is not None:
+            del self.slotAt[location]
+
+    def IsFeasible(self, available):
+        """Check whether every remaining slot can be matched to its own location in the available bitset."""
+        for slot in [x for x in self.locationOf if not available >> self.locationOf[x] & 1]:
+            self.Unmatch(slot)
+        free = [x for x in self.remaining if x not in self.locationOf]
+        # Quick rejection when the slots can't reach enough locations between them
+        reachable = 0
+        for slot in self.remaining:
+            reachable |= self.masks[slot]
+        if bin(reachable & available).count("1") < len(self.remaining):
+            return False
+        while len(free) > 0:
+            layers = self.BuildLayers(free, available)
+            if layers is None:
+                return False
+            used = [0]
+            for slot in free:
+                self.Augment(slot, layers, available, used)
+            free = [x for x in free if x not in self.locationOf]
+        return True
+
+    def BuildLayers(self, free, available):
+        """Get the breadth first layer of each slot reachable by alternating paths from the free slots, or None if no path ends at a free location."""
+        layers = {slot: 0 for slot in free}
+        queue = list(free)
+        seen = 0
+        shortest = None
+        for slot in queue:
+            if shortest is not None and layers[slot] >= shortest:
+                break
+            candidates = self.masks[slot] & available & ~seen
+            seen |= candidates
+            while candidates:
+                low = candidates & -candidates
+                candidates ^= low
+                other = self.slotAt.get(low.bit_length() - 1)
+                if other is None:
+                    shortest = layers[slot] + 1
+                elif other not in layers:
+                    layers[other] = layers[slot] + 1
+                    queue.append(other)
+        if shortest is None:
+            return None
+        return layers
+
+    def Augment(self, slot, layers, available, used):
+        """Find an augmenting path from a slot along the layers, rematching every slot on it."""
+        candidates = self.masks[slot] & available & ~used[0]
+        while candidates:
+            low = candidates & -candidates
+            candidates ^= low
+            location = low.bit_length() - 1
+            other = self.slotAt.get(location)
+            if other is not None and layers.get(other) != layers[slot] + 1:
+                continue
+            # Paths found in the same phase never share a location
+            used[0] |= low
+            if other is None or self.Augment(other, layers, available, used):
+                self.Unmatch(slot)
+                self.locationOf[slot] = location
+                self.slotAt[location] = slot
+                return True
+        # No path continues through this slot in this phase
+        layers[slot] = None
+        return False
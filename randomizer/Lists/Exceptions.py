@@ -95,3 +95,9 @@ class BossOutOfLocationsException(FillException):
     """Exception triggered when there are no valid levels to put a boss."""
 
     pass
+
+
+class PatchFileVersionException(Exception):
+    """Exception triggered when a patch file was written in a format this version of the randomizer can't read."""
+
+    pass
@@ -27,7 +27,9 @@ from randomizer.Enums.Time import Time
 from randomizer.Lists.Location import Location, LocationList
 from randomizer.Lists.MapsAndExits import Maps
 from randomizer.Lists.ShufflableExit import GetShuffledLevelIndex
+from randomizer.LogicClasses import DayAccess, Inventory, NightAccess
 from randomizer.Prices import CanBuy, GetPriceOfMoveItem
+from randomizer.RuleTable import RuleTable
 
 STARTING_SLAM = 1  # Currently we're assuming you always start with 1 slam
 
@@ -138,7 +140,11 @@ class LogicVarHolder:
         self.superSlam = self.settings.unlock_all_moves
         self.superDuperSlam = self.settings.unlock_all_moves
 
-        self.Blueprints = []
+        # Items counted by the last update
+        self.inventory = Inventory()
+        self.trackedItems = None
+        self.trackedCount = 0
+        self.Blueprints = set()
 
         self.Events = []
 
@@ -177,101 +183,139 @@ class LogicVarHolder:
         self.UpdateKongs()
 
     def Update(self, ownedItems):
-        """Update logic variables based on owned items."""
-        self.donkey = self.donkey or Items.Donkey in ownedItems or self.startkong == Kongs.donkey
-        self.diddy = self.diddy or Items.Diddy in ownedItems or self.startkong == Kongs.diddy
-        self.lanky = self.lanky or Items.Lanky in ownedItems or self.startkong == Kongs.lanky
-        self.tiny = self.tiny or Items.Tiny in ownedItems or self.startkong == Kongs.tiny
-        self.chunky = self.chunky or Items.Chunky in ownedItems or self.startkong == Kongs.chunky
-
-        self.vines = self.vines or Items.Vines in ownedItems
-        self.swim = self.swim or Items.Swim in ownedItems
-        self.oranges = self.oranges or Items.Oranges in ownedItems
-        self.barrels = self.barrels or Items.Barrels in ownedItems
-
-        self.progDonkey = sum(1 for x in ownedItems if x == Items.ProgressiveDonkeyPotion)
-        self.blast = self.blast or (Items.BaboonBlast in ownedItems or self.progDonkey >= 1) and self.donkey
-        self.strongKong = self.strongKong or (Items.StrongKong in ownedItems or self.progDonkey >= 2) and self.donkey
-        self.grab = self.grab or (Items.GorillaGrab in ownedItems or self.progDonkey >= 3) and self.donkey
-
-        self.progDiddy = sum(1 for x in ownedItems if x == Items.ProgressiveDiddyPotion)
-        self.charge = self.charge or (Items.ChimpyCharge in ownedItems or self.progDiddy >= 1) and self.diddy
-        self.jetpack = self.jetpack or (Items.RocketbarrelBoost in ownedItems or self.progDiddy >= 2) and self.diddy
-        self.spring = self.spring or (Items.SimianSpring in ownedItems or self.progDiddy >= 3) and self.diddy
-
-        self.progLanky = sum(1 for x in ownedItems if x == Items.ProgressiveLankyPotion)
-        self.handstand = self.handstand or (Items.Orangstand in ownedItems or self.progLanky >= 1) and self.lanky
-        self.balloon = self.balloon or (Items.BaboonBalloon in ownedItems or self.progLanky >= 2) and self.lanky
-        self.sprint = self.sprint or (Items.OrangstandSprint in ownedItems or self.progLanky >= 3) and self.lanky
-
-        self.progTiny = sum(1 for x in ownedItems if x == Items.ProgressiveTinyPotion)
-        self.mini = self.mini or (Items.MiniMonkey in ownedItems or self.progTiny >= 1) and self.tiny
-        self.twirl = self.twirl or (Items.PonyTailTwirl in ownedItems or self.progTiny >= 2) and self.tiny
-        self.monkeyport = self.monkeyport or (Items.Monkeyport in ownedItems or self.progTiny >= 3) and self.tiny
-
-        self.progChunky = sum(1 for x in ownedItems if x == Items.ProgressiveChunkyPotion)
-        self.hunkyChunky = self.hunkyChunky or (Items.HunkyChunky in ownedItems or self.progChunky >= 1) and self.chunky
-        self.punch = self.punch or (Items.PrimatePunch in ownedItems or self.progChunky >= 2) and self.chunky
-        self.gorillaGone = self.gorillaGone or (Items.GorillaGone in ownedItems or self.progChunky >= 3) and self.chunky
-
-        self.coconut = self.coconut or Items.Coconut in ownedItems and self.donkey
-        self.peanut = self.peanut or Items.Peanut in ownedItems and self.diddy
-        self.grape = self.grape or Items.Grape in ownedItems and self.lanky
-        self.feather = self.feather or Items.Feather in ownedItems and self.tiny
-        self.pineapple = self.pineapple or Items.Pineapple in ownedItems and self.chunky
-
-        self.bongos = self.bongos or Items.Bongos in ownedItems and self.donkey
-        self.guitar = self.guitar or Items.Guitar in ownedItems and self.diddy
-        self.trombone = self.trombone or Items.Trombone in ownedItems and self.lanky
-        self.saxophone = self.saxophone or Items.Saxophone in ownedItems and self.tiny
-        self.triangle = self.triangle or Items.Triangle in ownedItems and self.chunky
-
-        self.nintendoCoin = self.nintendoCoin or Items.NintendoCoin in ownedItems
-        self.rarewareCoin = self.rarewareCoin or Items.RarewareCoin in ownedItems
-
-        self.JapesKey = self.JapesKey or Items.JungleJapesKey in ownedItems
-        self.AztecKey = self.AztecKey or Items.AngryAztecKey in ownedItems
-        self.FactoryKey = self.FactoryKey or Items.FranticFactoryKey in ownedItems
-        self.GalleonKey = self.GalleonKey or Items.GloomyGalleonKey in ownedItems
-        self.ForestKey = self.ForestKey or Items.FungiForestKey in ownedItems
-        self.CavesKey = self.CavesKey or Items.CrystalCavesKey in ownedItems
-        self.CastleKey = self.CastleKey or Items.CreepyCastleKey in ownedItems
-        self.HelmKey = self.HelmKey or Items.HideoutHelmKey in ownedItems
-
-        self.HelmDonkey1 = self.HelmDonkey1 or Items.HelmDonkey1 in ownedItems
-        self.HelmDonkey2 = self.HelmDonkey2 or Items.HelmDonkey2 in ownedItems
-        self.HelmDiddy1 = self.HelmDiddy1 or Items.HelmDiddy1 in ownedItems
-        self.HelmDiddy2 = self.HelmDiddy2 or Items.HelmDiddy2 in ownedItems
-        self.HelmLanky1 = self.HelmLanky1 or Items.HelmLanky1 in ownedItems
-        self.HelmLanky2 = self.HelmLanky2 or Items.HelmLanky2 in ownedItems
-        self.HelmTiny1 = self.HelmTiny1 or Items.HelmTiny1 in ownedItems
-        self.HelmTiny2 = self.HelmTiny2 or Items.HelmTiny2 in ownedItems
-        self.HelmChunky1 = self.HelmChunky1 or Items.HelmChunky1 in ownedItems
-        self.HelmChunky2 = self.HelmChunky2 or Items.HelmChunky2 in ownedItems
-
-        self.Slam = 3 if self.settings.unlock_all_moves else sum(1 for x in ownedItems if x == Items.ProgressiveSlam) + STARTING_SLAM
-        self.AmmoBelts = 2 if self.settings.unlock_all_moves else sum(1 for x in ownedItems if x == Items.ProgressiveAmmoBelt)
-        self.InstUpgrades = 3 if self.settings.unlock_all_moves else sum(1 for x in ownedItems if x == Items.ProgressiveInstrumentUpgrade)
-
-        self.GoldenBananas = sum(1 for x in ownedItems if x == Items.GoldenBanana)
-        self.BananaFairies = sum(1 for x in ownedItems if x == Items.BananaFairy)
-        self.BananaMedals = sum(1 for x in ownedItems if x == Items.BananaMedal)
-        self.BattleCrowns = sum(1 for x in ownedItems if x == Items.BattleCrown)
-
-        self.camera = self.camera or Items.CameraAndShockwave in ownedItems
-        self.shockwave = self.shockwave or Items.CameraAndShockwave in ownedItems
-
-        self.scope = self.scope or Items.SniperSight in ownedItems
-        self.homing = self.homing or Items.HomingAmmo in ownedItems
+        """Update logic variables based on owned items.
+
+        Searches only ever append to ownedItems, so only items added since the last update are counted.
+        """
+        if ownedItems is not self.trackedItems or len(ownedItems) < self.trackedCount:
+            self.inventory = Inventory()
+            self.Blueprints = set()
+            self.trackedItems = ownedItems
+            self.trackedCount = 0
+        for item in ownedItems[self.trackedCount :]:
+            self.inventory.Add(item)
+            if item >= Items.JungleJapesDonkeyBlueprint:
+                self.Blueprints.add(item)
+        self.trackedCount = len(ownedItems)
+        owned = self.inventory
+
+        self.donkey = self.donkey or Items.Donkey in owned or self.startkong == Kongs.donkey
+        self.diddy = self.diddy or Items.Diddy in owned or self.startkong == Kongs.diddy
+        self.lanky = self.lanky or Items.Lanky in owned or self.startkong == Kongs.lanky
+        self.tiny = self.tiny or Items.Tiny in owned or self.startkong == Kongs.tiny
+        self.chunky = self.chunky or Items.Chunky in owned or self.startkong == Kongs.chunky
+
+        self.vines = self.vines or Items.Vines in owned
+        self.swim = self.swim or Items.Swim in owned
+        self.oranges = self.oranges or Items.Oranges in owned
+        self.barrels = self.barrels or Items.Barrels in owned
+
+        self.progDonkey = owned.Count(Items.ProgressiveDonkeyPotion)
+        self.blast = self.blast or (Items.BaboonBlast in owned or self.progDonkey >= 1) and self.donkey
+        self.strongKong = self.strongKong or (Items.StrongKong in owned or self.progDonkey >= 2) and self.donkey
+        self.grab = self.grab or (Items.GorillaGrab in owned or self.progDonkey >= 3) and self.donkey
+
+        self.progDiddy = owned.Count(Items.ProgressiveDiddyPotion)
+        self.charge = self.charge or (Items.ChimpyCharge in owned or self.progDiddy >= 1) and self.diddy
+        self.jetpack = self.jetpack or (Items.RocketbarrelBoost in owned or self.progDiddy >= 2) and self.diddy
+        self.spring = self.spring or (Items.SimianSpring in owned or self.progDiddy >= 3) and self.diddy
+
+        self.progLanky = owned.Count(Items.ProgressiveLankyPotion)
+        self.handstand = self.handstand or (Items.Orangstand in owned or self.progLanky >= 1) and self.lanky
+        self.balloon = self.balloon or (Items.BaboonBalloon in owned or self.progLanky >= 2) and self.lanky
+        self.sprint = self.sprint or (Items.OrangstandSprint in owned or self.progLanky >= 3) and self.lanky
+
+        self.progTiny = owned.Count(Items.ProgressiveTinyPotion)
+        self.mini = self.mini or (Items.MiniMonkey in owned or self.progTiny >= 1) and self.tiny
+        self.twirl = self.twirl or (Items.PonyTailTwirl in owned or self.progTiny >= 2) and self.tiny
+        self.monkeyport = self.monkeyport or (Items.Monkeyport in owned or self.progTiny >= 3) and self.tiny
+
+        self.progChunky = owned.Count(Items.ProgressiveChunkyPotion)
+        self.hunkyChunky = self.hunkyChunky or (Items.HunkyChunky in owned or self.progChunky >= 1) and self.chunky
+        self.punch = self.punch or (Items.PrimatePunch in owned or self.progChunky >= 2) and self.chunky
+        self.gorillaGone = self.gorillaGone or (Items.GorillaGone in owned or self.progChunky >= 3) and self.chunky
+
+        self.coconut = self.coconut or Items.Coconut in owned and self.donkey
+        self.peanut = self.peanut or Items.Peanut in owned and self.diddy
+        self.grape = self.grape or Items.Grape in owned and self.lanky
+        self.feather = self.feather or Items.Feather in owned and self.tiny
+        self.pineapple = self.pineapple or Items.Pineapple in owned and self.chunky
+
+        self.bongos = self.bongos or Items.Bongos in owned and self.donkey
+        self.guitar = self.guitar or Items.Guitar in owned and self.diddy
+        self.trombone = self.trombone or Items.Trombone in owned and self.lanky
+        self.saxophone = self.saxophone or Items.Saxophone in owned and self.tiny
+        self.triangle = self.triangle or Items.Triangle in owned and self.chunky
+
+        self.nintendoCoin = self.nintendoCoin or Items.NintendoCoin in owned
+        self.rarewareCoin = self.rarewareCoin or Items.RarewareCoin in owned
+
+        self.JapesKey = self.JapesKey or Items.JungleJapesKey in owned
+        self.AztecKey = self.AztecKey or Items.AngryAztecKey in owned
+        self.FactoryKey = self.FactoryKey or Items.FranticFactoryKey in owned
+        self.GalleonKey = self.GalleonKey or Items.GloomyGalleonKey in owned
+        self.ForestKey = self.ForestKey or Items.FungiForestKey in owned
+        self.CavesKey = self.CavesKey or Items.CrystalCavesKey in owned
+        self.CastleKey = self.CastleKey or Items.CreepyCastleKey in owned
+        self.HelmKey = self.HelmKey or Items.HideoutHelmKey in owned
+
+        self.HelmDonkey1 = self.HelmDonkey1 or Items.HelmDonkey1 in owned
+        self.HelmDonkey2 = self.HelmDonkey2 or Items.HelmDonkey2 in owned
+        self.HelmDiddy1 = self.HelmDiddy1 or Items.HelmDiddy1 in owned
+        self.HelmDiddy2 = self.HelmDiddy2 or Items.HelmDiddy2 in owned
+        self.HelmLanky1 = self.HelmLanky1 or Items.HelmLanky1 in owned
+        self.HelmLanky2 = self.HelmLanky2 or Items.HelmLanky2 in owned
+        self.HelmTiny1 = self.HelmTiny1 or Items.HelmTiny1 in owned
+        self.HelmTiny2 = self.HelmTiny2 or Items.HelmTiny2 in owned
+        self.HelmChunky1 = self.HelmChunky1 or Items.HelmChunky1 in owned
+        self.HelmChunky2 = self.HelmChunky2 or Items.HelmChunky2 in owned
+
+        self.Slam = 3 if self.settings.unlock_all_moves else owned.Count(Items.ProgressiveSlam) + STARTING_SLAM
+        self.AmmoBelts = 2 if self.settings.unlock_all_moves else owned.Count(Items.ProgressiveAmmoBelt)
+        self.InstUpgrades = 3 if self.settings.unlock_all_moves else owned.Count(Items.ProgressiveInstrumentUpgrade)
+
+        self.GoldenBananas = owned.Count(Items.GoldenBanana)
+        self.BananaFairies = owned.Count(Items.BananaFairy)
+        self.BananaMedals = owned.Count(Items.BananaMedal)
+        self.BattleCrowns = owned.Count(Items.BattleCrown)
+
+        self.camera = self.camera or Items.CameraAndShockwave in owned
+        self.shockwave = self.shockwave or Items.CameraAndShockwave in owned
+
+        self.scope = self.scope or Items.SniperSight in owned
+        self.homing = self.homing or Items.HomingAmmo in owned
 
         self.superSlam = self.Slam >= 2
         self.superDuperSlam = self.Slam >= 3
 
-        self.Blueprints = [x for x in ownedItems if x >= Items.JungleJapesDonkeyBlueprint]
+        Rules.Refresh(self)
+
+    def GetState(self):
+        """Copy every logic variable, so a search can later continue from this point."""
+        return self.CopyState(self.__dict__)
+
+    def SetState(self, state):
+        """Restore logic variables copied by GetState."""
+        self.__dict__.update(self.CopyState(state))
+
+    @staticmethod
+    def CopyState(state):
+        """Copy logic variables along with the lists searches change in place."""
+        copied = state.copy()
+        copied["Events"] = state["Events"].copy()
+        copied["Coins"] = state["Coins"].copy()
+        copied["ColoredBananas"] = [bananas.copy() for bananas in state["ColoredBananas"]]
+        # Owned items are counted again on the next update
+        copied["inventory"] = Inventory()
+        copied["Blueprints"] = set()
+        copied["trackedItems"] = None
+        copied["trackedCount"] = 0
+        return copied
 
     def AddEvent(self, event):
         """Add an event to events list so it can be checked for logically."""
         self.Events.append(event)
+        Rules.EventAdded(event)
 
     def SetKong(self, kong):
         """Set current kong for logic."""
@@ -383,13 +427,18 @@ class LogicVarHolder:
         """Check if kong at Chunky location can be freed."""
         return self.Slam and self.IsKong(self.settings.chunky_freeing_kong)
 
+    def GetKongAccess(self):
+        """Get the region access bits of every owned kong."""
+        return self.donkey | self.diddy << Kongs.diddy | self.lanky << Kongs.lanky | self.tiny << Kongs.tiny | self.chunky << Kongs.chunky
+
     def UpdateCurrentRegionAccess(self, region):
         """Set access of current region."""
-        self.donkeyAccess = region.donkeyAccess
-        self.diddyAccess = region.diddyAccess
-        self.lankyAccess = region.lankyAccess
-        self.tinyAccess = region.tinyAccess
-        self.chunkyAccess = region.chunkyAccess
+        access = region.access
+        self.donkeyAccess = access & 1 << Kongs.donkey != 0
+        self.diddyAccess = access & 1 << Kongs.diddy != 0
+        self.lankyAccess = access & 1 << Kongs.lanky != 0
+        self.tinyAccess = access & 1 << Kongs.tiny != 0
+        self.chunkyAccess = access & 1 << Kongs.chunky != 0
 
     def LevelEntered(self, level):
         """Check whether a level, or any level above it, has been entered."""
@@ -420,6 +469,7 @@ class LogicVarHolder:
                 # Normal coins, add amount for the kong
                 else:
                     self.Coins[collectible.kong] += collectible.amount
+                Rules.Changed("Coins")
             # Add bananas for correct level for this kong
             elif collectible.type == Collectibles.banana:
                 self.ColoredBananas[level][collectible.kong] += collectible.amount
@@ -429,7 +479,10 @@ class LogicVarHolder:
             # Add 10 bananas for a balloon
             elif collectible.type == Collectibles.balloon:
                 self.ColoredBananas[level][collectible.kong] += collectible.amount * 10
+            if collectible.type != Collectibles.coin:
+                Rules.Changed("ColoredBananas")
             collectible.added = True
+            SearchState.AddCollectible(collectible)
 
     def PurchaseShopItem(self, location: Location):
         """Purchase items from shops and subtract price from logical coin counts."""
@@ -444,6 +497,7 @@ class LogicVarHolder:
             # If kong specific move, just that kong paid for it
             else:
                 self.Coins[location.kong] -= price
+            Rules.Changed("Coins")
 
     @staticmethod
     def HasAccess(region, kong):
@@ -457,12 +511,12 @@ class LogicVarHolder:
     def TimeAccess(region, time):
         """Check if a certain region has the given time of day access."""
         if time == Time.Day:
-            return Regions[region].dayAccess
+            return Regions[region].access & DayAccess != 0
         elif time == Time.Night:
-            return Regions[region].nightAccess
+            return Regions[region].access & NightAccess != 0
         # Not sure when this'd be used
         else:  # if time == Time.Both
-            return Regions[region].dayAccess or Regions[region].nightAccess
+            return Regions[region].access & (DayAccess | NightAccess) != 0
 
     def KasplatAccess(self, location):
         """Use the kasplat map to check kasplat logic for blueprint locations."""
@@ -513,6 +567,75 @@ class LogicVarHolder:
         return self.HasEnoughKongs(level, forPreviousLevel=True) and self.GoldenBananas >= self.settings.EntryGBs[level]
 
 
+class SearchStateHolder:
+    """Journal of the region access and collectibles changed by searches.
+
+    Searches record what they change here, so resetting the world only undoes those changes
+    instead of walking every region and collectible.
+    """
+
+    def __init__(self, regionCount):
+        """Initialize an empty journal for regions with ids below regionCount."""
+        # Epoch in which each region's access was last saved, indexed by region id
+        self.regionEpochs = [-1] * regionCount
+        self.epoch = 0
+        self.regionLog = []
+        self.collectibleLog = []
+
+    def TouchRegion(self, region):
+        """Save a region's access before a search changes it, at most once per reset."""
+        if self.regionEpochs[region.id] != self.epoch:
+            self.regionEpochs[region.id] = self.epoch
+            self.regionLog.append((region, region.GetAccess()))
+
+    def AddCollectible(self, collectible):
+        """Record that a collectible has been added."""
+        self.collectibleLog.append(collectible)
+
+    def Restore(self):
+        """Undo every change made since the last reset."""
+        regionLog = self.regionLog
+        while len(regionLog) > 0:
+            region, access = regionLog.pop()
+            region.SetAccess(access)
+        collectibleLog = self.collectibleLog
+        while len(collectibleLog) > 0:
+            collectibleLog.pop().added = False
+        # Regions restored here must be saved again the next time they change
+        self.epoch += 1
+
+
+class SearchCheckpoint:
+    """The state of a search at the start of one of its iterations, which a later search can resume from.
+
+    Resuming replays nothing, it restores the logic variables, region access and collectibles as they were
+    and hands back copies of the search's own lists, recording the changes in the journal like a search would.
+    """
+
+    def __init__(self, logicVariables, accessible, newLocations, ownedItems, eventAdded):
+        """Save the current state of a search."""
+        self.accessible = accessible.copy()
+        self.newLocations = newLocations.copy()
+        self.ownedItems = ownedItems.copy()
+        self.eventAdded = eventAdded
+        self.logicVariables = logicVariables.GetState()
+        # Every region or collectible a search changed since the last reset is in the journal
+        self.regions = [(region, region.access) for region, access in SearchState.regionLog]
+        self.collectibles = SearchState.collectibleLog.copy()
+
+    def Resume(self, logicVariables):
+        """Restore the saved state, returning the search's accessible, new locations and owned items lists and whether an event was added."""
+        SearchState.Restore()
+        logicVariables.SetState(self.logicVariables)
+        for region, access in self.regions:
+            SearchState.TouchRegion(region)
+            region.access = access
+        for collectible in self.collectibles:
+            collectible.added = True
+            SearchState.AddCollectible(collectible)
+        return self.accessible.copy(), self.newLocations.copy(), self.ownedItems.copy(), self.eventAdded
+
+
 LogicVariables = LogicVarHolder()
 
 # Import regions from logic files
@@ -527,6 +650,8 @@ Regions.update(randomizer.LogicFiles.CrystalCaves.LogicRegions)
 Regions.update(randomizer.LogicFiles.CreepyCastle.LogicRegions)
 Regions.update(randomizer.LogicFiles.HideoutHelm.LogicRegions)
 Regions.update(randomizer.LogicFiles.Shops.LogicRegions)
+for regionId, region in Regions.items():
+    region.id = regionId
 
 # Auxillary regions for colored bananas and banana coins
 CollectibleRegions = {}
@@ -540,10 +665,35 @@ CollectibleRegions.update(randomizer.CollectibleLogicFiles.CrystalCaves.LogicReg
 CollectibleRegions.update(randomizer.CollectibleLogicFiles.CreepyCastle.LogicRegions)
 
 
+SearchState = SearchStateHolder(max(Regions) + 1)
+Rules = RuleTable(LogicVarHolder)
+
+
+def CompileRules():
+    """Compile the logic of every region and collectible so searches can reuse results whose inputs haven't changed."""
+    for region in Regions.values():
+        for location in region.locations:
+            location.logic = Rules.Compile(location.logic)
+        for event in region.events:
+            event.logic = Rules.Compile(event.logic)
+        for exit in region.exits:
+            exit.logic = Rules.Compile(exit.logic)
+        if region.deathwarp is not None:
+            region.deathwarp.logic = Rules.Compile(region.deathwarp.logic)
+    for collectibles in CollectibleRegions.values():
+        for collectible in collectibles:
+            collectible.logic = Rules.Compile(collectible.logic)
+
+
+CompileRules()
+
+
 def ResetRegionAccess():
     """Reset kong access for all regions."""
     for region in Regions.values():
         region.ResetAccess()
+    SearchState.regionLog = []
+    SearchState.epoch += 1
 
 
 def ResetCollectibleRegions():
@@ -552,6 +702,7 @@ def ResetCollectibleRegions():
         for collectible in region:
             collectible.added = False
             # collectible.enabled = collectible.vanilla
+    SearchState.collectibleLog = []
 
 
 def ClearAllLocations():
@@ -1,4 +1,5 @@
 """Contains classes used in the logic system."""
+from randomizer.Enums.Items import Items
 from randomizer.Enums.Kongs import Kongs
 from randomizer.Enums.Levels import Levels
 from randomizer.Enums.Regions import Regions
@@ -6,6 +7,42 @@ from randomizer.Enums.Time import Time
 from randomizer.Enums.Transitions import Transitions
 
 
+class Inventory:
+    """Owned items counted by item id, for constant time membership and count checks."""
+
+    def __init__(self, items=None):
+        """Initialize with given items."""
+        self.counts = [0] * (max(Items) + 1)
+        self.size = 0
+        if items is not None:
+            for item in items:
+                self.Add(item)
+
+    def Add(self, item):
+        """Add one of an item."""
+        self.counts[item] += 1
+        self.size += 1
+
+    def Remove(self, item):
+        """Remove one of an item."""
+        if self.counts[item] == 0:
+            raise ValueError(str(item) + " is not in the inventory")
+        self.counts[item] -= 1
+        self.size -= 1
+
+    def Count(self, item):
+        """Get how many of an item are owned."""
+        return self.counts[item]
+
+    def __contains__(self, item):
+        """Check if at least one of an item is owned."""
+        return self.counts[item] > 0
+
+    def __len__(self):
+        """Get the total number of items owned."""
+        return self.size
+
+
 class LocationLogic:
     """Logic for a location."""
 
@@ -45,6 +82,12 @@ class Collectible:
         self.vanilla = vanilla
 
 
+# Bits of Region.access, one per kong (1 << kong) followed by the times of day
+AllKongsAccess = (1 << Kongs.any) - 1
+DayAccess = 1 << Kongs.any
+NightAccess = DayAccess << 1
+
+
 class Region:
     """Region contains shufflable locations, events, and transitions to other regions."""
 
@@ -59,9 +102,6 @@ class Region:
         self.exits = transitionFronts  # In the context of a region, exits are how you leave the region
         self.restart = restart
 
-        self.dayAccess = False
-        self.nightAccess = False
-
         # If possible to die in this region, add an exit to where dying will take you
         # deathwarp is also set to none in regions in which a deathwarp would take you to itself
         # Or if there is loading-zone-less free access to the region it would take you to already
@@ -78,64 +118,56 @@ class Region:
         # Initially assume no access from any kong
         self.ResetAccess()
 
+    @property
+    def dayAccess(self):
+        """Whether this region can be reached during the day."""
+        return self.access & DayAccess != 0
+
+    @dayAccess.setter
+    def dayAccess(self, value):
+        self.access = self.access | DayAccess if value else self.access & ~DayAccess
+
+    @property
+    def nightAccess(self):
+        """Whether this region can be reached during the night."""
+        return self.access & NightAccess != 0
+
+    @nightAccess.setter
+    def nightAccess(self, value):
+        self.access = self.access | NightAccess if value else self.access & ~NightAccess
+
     def UpdateAccess(self, kong, logicVariables):
         """Set that given kong has access to this region."""
         # If this region contains a tag barrel, all owned kongs also have access
         if self.tagbarrel:
-            self.donkeyAccess = logicVariables.donkey
-            self.diddyAccess = logicVariables.diddy
-            self.lankyAccess = logicVariables.lanky
-            self.tinyAccess = logicVariables.tiny
-            self.chunkyAccess = logicVariables.chunky
+            self.access = (self.access & ~AllKongsAccess) | logicVariables.GetKongAccess()
         else:
-            if kong == Kongs.donkey:
-                self.donkeyAccess = True
-            elif kong == Kongs.diddy:
-                self.diddyAccess = True
-            elif kong == Kongs.lanky:
-                self.lankyAccess = True
-            elif kong == Kongs.tiny:
-                self.tinyAccess = True
-            else:
-                self.chunkyAccess = True
+            self.access |= 1 << kong
 
     def UpdateAccessFromRegion(self, region):
         """Set access to region from another region."""
-        self.donkeyAccess = self.donkeyAccess or region.donkeyAccess
-        self.diddyAccess = self.diddyAccess or region.diddyAccess
-        self.lankyAccess = self.lankyAccess or region.lankyAccess
-        self.tinyAccess = self.tinyAccess or region.tinyAccess
-        self.chunkyAccess = self.chunkyAccess or region.chunkyAccess
+        self.access |= region.access & AllKongsAccess
 
     def HasAccess(self, kong):
         """Check if given kong has access through this area.
 
         Used if a kong has access through a tag barrel only.
         """
-        if kong == Kongs.donkey:
-            return self.donkeyAccess
-        elif kong == Kongs.diddy:
-            return self.diddyAccess
-        elif kong == Kongs.lanky:
-            return self.lankyAccess
-        elif kong == Kongs.tiny:
-            return self.tinyAccess
-        elif kong == Kongs.chunky:
-            return self.chunkyAccess
-        else:  # kongs == Kongs.any, just need to check if any kong has access
-            return self.donkeyAccess or self.diddyAccess or self.lankyAccess or self.tinyAccess or self.chunkyAccess
+        if kong == Kongs.any:  # just need to check if any kong has access
+            return self.access & AllKongsAccess != 0
+        return self.access & (1 << kong) != 0
 
     def ResetAccess(self):
         """Clear access variables set during search."""
-        # Kong access
-        self.donkeyAccess = False
-        self.diddyAccess = False
-        self.lankyAccess = False
-        self.tinyAccess = False
-        self.chunkyAccess = False
-        # Time access
-        self.dayAccess = False
-        self.nightAccess = False
+        self.access = 0
+
+    def GetAccess(self):
+        """Get the access variables set during search."""
+        return self.access
+
+    def SetAccess(self, access):
+        """Restore access variables previously returned by GetAccess."""
+        self.access = access
 
     def GetDefaultDeathwarp(self):
         """Get the default deathwarp depending on the region's level."""
@@ -0,0 +1,270 @@
+"""Patch files (.lanky) passing a generated seed from the randomizer to the patcher.
+
+A patch file holds just what patching the ROM and writing the spoiler log read from the spoiler and its settings, instead of a
+pickle of all of it. It starts with a header giving its format version and the size of each of its sections, which are
+compressed separately and only decoded the first time one of their values is read. The file is base64 encoded, as the website
+passes it around as text. Patch files from before this format, which are a pickled spoiler, can still be read.
+"""
+import base64
+import json
+import pickle
+import struct
+import zlib
+from enum import Enum
+
+import randomizer.Lists.Exceptions as Ex
+from randomizer.Enums.Events import Events
+from randomizer.Enums.Items import Items
+from randomizer.Enums.Kongs import Kongs
+from randomizer.Enums.Levels import Levels
+from randomizer.Enums.Locations import Locations
+from randomizer.Enums.Minigames import Minigames
+from randomizer.Enums.Regions import Regions
+from randomizer.Enums.Transitions import Transitions
+from randomizer.Lists.MapsAndExits import Maps
+from randomizer.LogicClasses import TransitionBack
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+PatchMagic = b"LNKY"
+# Bump when the layout of patch files or what is stored in their sections changes
+PatchVersion = 2
+PatchHeader = struct.Struct("<4sHH")
+PatchSectionHeader = struct.Struct("<8sI")
+
+# Spoiler values stored in each section of a patch file
+PatchSections = {
+    "settings": ["settings"],
+    "location": ["location_data", "move_data", "shuffled_kong_placement", "shuffled_shop_locations", "shuffled_barrel_data"],
+    "exits": ["shuffled_exit_data", "shuffled_exit_instructions", "bananaport_replacements"],
+    "kasplats": ["shuffled_kasplat_map", "enemy_replacements", "dirt_patch_placement"],
+    "hints": ["hint_list"],
+    "music": ["music_bgm_data", "music_fanfare_data", "music_event_data"],
+    "log": ["playthrough", "woth", "human_kasplats", "human_warp_locations", "human_patches"],
+}
+PatchSectionOf = {value: section for section, values in PatchSections.items() for value in values}
+
+# Settings read by the patcher and the spoiler log, along with the hash of the code which generated the seed
+PatchSettings = [
+    "_Settings__hash",
+    "public_hash",
+    "seed",
+    "seed_id",
+    "seed_hash",
+    "rom_data",
+    "download_patch_file",
+    "generate_spoilerlog",
+    "activate_all_bananaports",
+    "auto_keys",
+    "bananaport_rando",
+    "blocker_text",
+    "bonus_barrel_auto_complete",
+    "bonus_barrel_rando",
+    "bonus_barrels",
+    "boss_kong_rando",
+    "boss_kongs",
+    "boss_location_rando",
+    "boss_maps",
+    "BossBananas",
+    "coin_door_open",
+    "colors",
+    "crown_door_open",
+    "crown_enemy_rando",
+    "damage_amount",
+    "decoupled_loading_zones",
+    "diddy_freeing_kong",
+    "lanky_freeing_kong",
+    "tiny_freeing_kong",
+    "chunky_freeing_kong",
+    "disable_shop_hints",
+    "disable_tag_barrels",
+    "dpad_display",
+    "enable_tag_anywhere",
+    "enemy_rando",
+    "enemy_speed_rando",
+    "EntryGBs",
+    "fast_gbs",
+    "fast_start_beginning_of_game",
+    "fast_warps",
+    "fps_display",
+    "hard_bosses",
+    "helm_barrels",
+    "helm_order",
+    "helm_setting",
+    "high_req",
+    "kasplat_location_rando",
+    "kasplat_rando",
+    "kasplat_rando_setting",
+    "kko_phase_order",
+    "klaptrap_model",
+    "klaptrap_model_index",
+    "kong_rando",
+    "krool_access",
+    "krool_key_count",
+    "krool_keys_required",
+    "krool_order",
+    "kutout_kongs",
+    "medal_requirement",
+    "minigames_list_selected",
+    "move_rando",
+    "music_bgm",
+    "music_events",
+    "music_fanfares",
+    "no_healing",
+    "no_logic",
+    "no_melons",
+    "open_levels",
+    "open_lobbies",
+    "perma_death",
+    "prices",
+    "puzzle_rando",
+    "quality_of_life",
+    "random_colors",
+    "random_medal_requirement",
+    "random_music",
+    "random_patches",
+    "random_prices",
+    "randomize_blocker_required_amounts",
+    "randomize_cb_required_amounts",
+    "randomize_pickups",
+    "shop_indicator",
+    "shorten_boss",
+    "shuffle_items",
+    "shuffle_loading_zones",
+    "shuffle_shops",
+    "starting_kong_list",
+    "starting_kongs_count",
+    "troff_text",
+    "unlock_all_moves",
+    "unlock_fairy_shockwave",
+    "warp_to_isles",
+    "wrinkly_hints",
+    "dk_colors",
+    "dk_custom_color",
+    "diddy_colors",
+    "diddy_custom_color",
+    "lanky_colors",
+    "lanky_custom_color",
+    "tiny_colors",
+    "tiny_custom_color",
+    "chunky_colors",
+    "chunky_custom_color",
+    "rambi_colors",
+    "rambi_custom_color",
+    "enguarde_colors",
+    "enguarde_custom_color",
+]
+
+# Enums and classes which values in a patch file can be, by name
+PatchTypes = {cls.__name__: cls for cls in [Events, Items, Kongs, Levels, Locations, Maps, Minigames, Regions, Transitions, TransitionBack]}
+
+
+class PatchSpoiler(Spoiler):
+    """Spoiler read from a patch file, which decodes each section the first time one of its values is read."""
+
+    def __init__(self, sections):
+        """Initialize with the compressed data of each section."""
+        self.patch_sections = sections
+
+    def __getattr__(self, name):
+        """Decode the section holding a value which hasn't been read yet."""
+        sections = self.__dict__.get("patch_sections", {})
+        section = PatchSectionOf.get(name)
+        if section in sections:
+            self.__dict__.update(DecodeSection(section, sections.pop(section)))
+            if name in self.__dict__:
+                return self.__dict__[name]
+        raise AttributeError(name)
+
+
+def EncodeValue(value):
+    """Encode a value as JSON, tagging lists and anything which isn't a JSON value with their type."""
+    if isinstance(value, Enum):
+        if PatchTypes.get(type(value).__name__) is not type(value):
+            raise TypeError("Patch files can't hold a value of type " + type(value).__name__)
+        return ["E", type(value).__name__, value.name]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return ["L"] + [EncodeValue(x) for x in value]
+    if isinstance(value, tuple):
+        return ["T"] + [EncodeValue(x) for x in value]
+    if isinstance(value, dict):
+        encoded = ["D"]
+        for key, x in value.items():
+            encoded.append(EncodeValue(key))
+            encoded.append(EncodeValue(x))
+        return encoded
+    if PatchTypes.get(type(value).__name__) is not type(value):
+        raise TypeError("Patch files can't hold a value of type " + type(value).__name__)
+    return ["O", type(value).__name__, EncodeValue(vars(value))]
+
+
+def DecodeValue(encoded):
+    """Decode a value encoded by EncodeValue."""
+    if not isinstance(encoded, list):
+        return encoded
+    tag = encoded[0]
+    if tag == "E":
+        return PatchTypes[encoded[1]][encoded[2]]
+    if tag == "L":
+        return [DecodeValue(x) for x in encoded[1:]]
+    if tag == "T":
+        return tuple(DecodeValue(x) for x in encoded[1:])
+    if tag == "D":
+        return {DecodeValue(encoded[i]): DecodeValue(encoded[i + 1]) for i in range(1, len(encoded), 2)}
+    cls = PatchTypes[encoded[1]]
+    value = cls.__new__(cls)
+    vars(value).update(DecodeValue(encoded[2]))
+    return value
+
+
+def EncodeSection(spoiler, section):
+    """Encode and compress the values of a section from a spoiler."""
+    if section == "settings":
+        settings = vars(spoiler.settings)
+        values = {name: EncodeValue(settings[name]) for name in PatchSettings if name in settings}
+    else:
+        # Some values are only set by certain settings, and are left out the same way
+        values = {name: EncodeValue(vars(spoiler)[name]) for name in PatchSections[section] if name in vars(spoiler)}
+    return zlib.compress(json.dumps(values, separators=(",", ":")).encode(), 9)
+
+
+def DecodeSection(section, data):
+    """Decompress and decode the values of a section."""
+    values = {name: DecodeValue(value) for name, value in json.loads(zlib.decompress(data).decode()).items()}
+    if section == "settings":
+        # Settings can't be changed by setattr until their hash is set
+        settings = Settings.__new__(Settings)
+        vars(settings).update(values)
+        return {"settings": settings}
+    return values
+
+
+def EncodePatchFile(spoiler):
+    """Encode a spoiler as the text of a patch file."""
+    # Sections of a spoiler read from a patch file which haven't been decoded are written back as they are
+    unread = vars(spoiler).get("patch_sections", {})
+    sections = [(section, unread[section] if section in unread else EncodeSection(spoiler, section)) for section in PatchSections]
+    data = [PatchHeader.pack(PatchMagic, PatchVersion, len(sections))]
+    data.extend(PatchSectionHeader.pack(section.encode(), len(compressed)) for section, compressed in sections)
+    data.extend(compressed for section, compressed in sections)
+    return base64.b64encode(b"".join(data)).decode()
+
+
+def DecodePatchFile(text):
+    """Decode the text of a patch file into a spoiler, reading its sections as they are used."""
+    data = base64.b64decode(text)
+    if not data.startswith(PatchMagic):
+        # Patch files from before the current format are a pickled spoiler
+        return pickle.loads(data)
+    magic, version, count = PatchHeader.unpack_from(data)
+    if version != PatchVersion:
+        raise Ex.PatchFileVersionException("Patch file has version " + str(version) + ", expected version " + str(PatchVersion))
+    offset = PatchHeader.size + count * PatchSectionHeader.size
+    sections = {}
+    for i in range(count):
+        section, length = PatchSectionHeader.unpack_from(data, PatchHeader.size + i * PatchSectionHeader.size)
+        sections[section.rstrip(b"\0").decode()] = data[offset : offset + length]
+        offset += length
+    return PatchSpoiler(sections)
@@ -1,13 +1,12 @@
 """Apply Patch data to the ROM."""
 import asyncio
-import codecs
 import json
 import math
-import pickle
 import random
 
 import js
 from randomizer.Enums.Transitions import Transitions
+from randomizer.PatchFile import DecodePatchFile, EncodePatchFile
 from randomizer.Patching.BananaPortRando import randomize_bananaport
 from randomizer.Patching.BarrelRando import randomize_barrels
 from randomizer.Patching.BossRando import randomize_bosses
@@ -40,7 +39,7 @@ def patching_response(responded_data):
     """Response data from the background task.
 
     Args:
-        responded_data (str): Pickled data (or json)
+        responded_data (str): Patch file data (or json)
     """
     loop = asyncio.get_event_loop()
 
@@ -57,17 +56,19 @@ def patching_response(responded_data):
         pass
 
     loop.run_until_complete(ProgressBar().update_progress(8, "Applying Patches"))
-    # spoiler: Spoiler = pickle.loads(codecs.decode(responded_data.encode(), "base64"))
-    spoiler = pickle.loads(codecs.decode(responded_data.encode(), "base64"))
+    spoiler = DecodePatchFile(responded_data)
     spoiler.settings.verify_hash()
     Settings({"seed": 0}).compare_hash(spoiler.settings.public_hash)
     # Make sure we re-load the seed id
     spoiler.settings.set_seed()
-    if spoiler.settings.download_patch_file:
+    download_patch_file = spoiler.settings.download_patch_file
+    if download_patch_file:
         spoiler.settings.download_patch_file = False
-
-        js.save_text_as_file(codecs.encode(pickle.dumps(spoiler), "base64").decode(), f"dk64-{spoiler.settings.seed_id}.lanky")
-    js.write_seed_history(spoiler.settings.seed_id, codecs.encode(pickle.dumps(spoiler), "base64").decode(), spoiler.settings.public_hash)
+    # Only the settings have been read so far, so the rest of the patch file is written back without decoding it
+    patch_file = EncodePatchFile(spoiler)
+    if download_patch_file:
+        js.save_text_as_file(patch_file, f"dk64-{spoiler.settings.seed_id}.lanky")
+    js.write_seed_history(spoiler.settings.seed_id, patch_file, spoiler.settings.public_hash)
     # Starting index for our settings
     sav = spoiler.settings.rom_data
 
@@ -0,0 +1,64 @@
+"""Index of the locations each item may be placed in."""
+import randomizer.ItemPool as ItemPool
+from randomizer.ItemMatching import LocationMask
+from randomizer.Lists.Location import LocationList
+
+
+class PlacementDomain:
+    """Constant time lookup of the locations an item may be placed in, as a frozenset or a bitset.
+
+    Built once per fill from either a collection of locations shared by every item, or a dictionary from items to
+    their own locations. Items missing from a dictionary may go in the default locations, which are every location
+    unless given.
+    """
+
+    def __init__(self, validLocations, default=None):
+        """Initialize the index from the valid locations given to a fill."""
+        if isinstance(validLocations, dict):
+            self.locations = {item: frozenset(locations) for item, locations in validLocations.items()}
+            self.default = frozenset(LocationList) if default is None else frozenset(default)
+        else:
+            self.locations = {}
+            self.default = frozenset(validLocations)
+        self.masks = {}
+        self.defaultMask = None
+
+    def Locations(self, item):
+        """Get the locations an item may be placed in."""
+        return self.locations.get(item, self.default)
+
+    def Mask(self, item):
+        """Get the bitset of the locations an item may be placed in."""
+        if item in self.masks:
+            return self.masks[item]
+        if item not in self.locations:
+            if self.defaultMask is None:
+                self.defaultMask = LocationMask(self.default)
+            return self.defaultMask
+        mask = LocationMask(self.locations[item])
+        self.masks[item] = mask
+        return mask
+
+    def Allows(self, item, locationId):
+        """Check if an item may be placed in a location."""
+        return self.Mask(item) >> locationId & 1 == 1
+
+
+# Domains of the kong moves, with and without cross purchasing
+KongMoveDomains = {}
+
+
+def KongMoveDomain(settings):
+    """Get the shops each move may be sold in, which are its kong's shops unless moves can be cross purchased from any kong's shops."""
+    crossPurchase = settings.move_rando == "cross_purchase"
+    if crossPurchase not in KongMoveDomains:
+        kongMoves = [ItemPool.DonkeyMoves, ItemPool.DiddyMoves, ItemPool.LankyMoves, ItemPool.TinyMoves, ItemPool.ChunkyMoves]
+        kongLocations = [ItemPool.DonkeyMoveLocations, ItemPool.DiddyMoveLocations, ItemPool.LankyMoveLocations, ItemPool.TinyMoveLocations, ItemPool.ChunkyMoveLocations]
+        anyKongLocations = frozenset().union(*kongLocations)
+        validLocations = {}
+        for moves, locations in zip(kongMoves, kongLocations):
+            for move in moves:
+                validLocations[move] = anyKongLocations if crossPurchase else locations
+        # Moves belonging to no kong have no shop unless moves are cross purchased
+        KongMoveDomains[crossPurchase] = PlacementDomain(validLocations, anyKongLocations if crossPurchase else ())
+    return KongMoveDomains[crossPurchase]
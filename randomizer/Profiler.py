@@ -0,0 +1,121 @@
+"""Opt-in profiling of seed generation."""
+import functools
+import json
+import time
+
+
+class Profiler:
+    """Collects timing spans, search counts, retry causes and item placement rates while a seed is generated."""
+
+    def __init__(self):
+        """Initialize an empty profile."""
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.openSpans = []
+        # Time in each span name, not counting time in spans nested within a span of the same name
+        self.totals = {}
+        self.searches = {}
+        self.retries = []
+        self.itemsPlaced = 0
+        self.placementTime = 0.0
+
+    def StartSpan(self, name):
+        """Start timing a span, nested within any span already open."""
+        self.openSpans.append((name, time.perf_counter()))
+
+    def EndSpan(self):
+        """Stop timing the innermost open span."""
+        name, start = self.openSpans.pop()
+        duration = time.perf_counter() - start
+        span = {"name": name, "start": round(start - self.origin, 4), "duration": round(duration, 4), "depth": len(self.openSpans)}
+        self.spans.append(span)
+        if name not in [openName for openName, openStart in self.openSpans]:
+            self.totals[name] = self.totals.get(name, 0) + duration
+
+    def CountSearch(self, searchType):
+        """Count a reachability search of the given search mode."""
+        self.searches[searchType.name] = self.searches.get(searchType.name, 0) + 1
+
+    def AddRetry(self, phase, exception, undone=None):
+        """Record a retry of a phase, the exception which caused it and how many item placements were undone for it."""
+        retry = {"phase": phase, "cause": type(exception).__name__, "message": str(exception), "undone": undone, "time": round(time.perf_counter() - self.origin, 4)}
+        self.retries.append(retry)
+
+    def AddPlacement(self, count, seconds):
+        """Record items placed by a fill algorithm and how long it took."""
+        self.itemsPlaced += count
+        self.placementTime += seconds
+
+    def Summary(self):
+        """Get the profile as a dictionary suitable for JSON."""
+        return {
+            "time": round(time.perf_counter() - self.origin, 4),
+            "totals": {name: round(total, 4) for name, total in self.totals.items()},
+            "searches": dict(sorted(self.searches.items())),
+            "retries": self.retries,
+            "items_placed": self.itemsPlaced,
+            "items_per_second": round(self.itemsPlaced / self.placementTime, 2) if self.placementTime > 0 else None,
+            "spans": self.spans,
+        }
+
+    def Write(self, file_name):
+        """Write the profile to a JSON file."""
+        with open(file_name, "w") as outfile:
+            json.dump(self.Summary(), outfile, indent=4)
+
+
+# Profiler of the seed currently being generated, if profiling is on
+ActiveProfiler = None
+
+
+def Start():
+    """Start profiling seed generation in this process."""
+    global ActiveProfiler
+    ActiveProfiler = Profiler()
+    return ActiveProfiler
+
+
+def Stop():
+    """Stop profiling, returning the finished profile."""
+    global ActiveProfiler
+    profiler = ActiveProfiler
+    ActiveProfiler = None
+    return profiler
+
+
+def Timed(name):
+    """Decorate a function to time each call as a span while profiling."""
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = ActiveProfiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            profiler.StartSpan(name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.EndSpan()
+
+        return wrapper
+
+    return decorator
+
+
+def CountSearch(searchType):
+    """Count a reachability search while profiling."""
+    if ActiveProfiler is not None:
+        ActiveProfiler.CountSearch(searchType)
+
+
+def AddRetry(phase, exception, undone=None):
+    """Record a retry while profiling."""
+    if ActiveProfiler is not None:
+        ActiveProfiler.AddRetry(phase, exception, undone)
+
+
+def AddPlacement(count, seconds):
+    """Record placed items while profiling."""
+    if ActiveProfiler is not None:
+        ActiveProfiler.AddPlacement(count, seconds)
@@ -0,0 +1,189 @@
+"""Compact graph of the regions in use, so searches follow exits by integer ids instead of resolving them region by region."""
+import randomizer.Logic as Logic
+from randomizer.Enums.Levels import Levels
+from randomizer.Enums.Regions import Regions
+from randomizer.Enums.Time import Time
+from randomizer.Enums.Transitions import Transitions
+from randomizer.Lists.ShufflableExit import ShufflableExits
+from randomizer.LogicClasses import DayAccess, NightAccess
+
+# Overrides of an exit's destination which aren't region ids
+Unshuffled = -1
+Unplaced = -2
+
+# The exit whose shuffled destination the "Exit Level" button takes you to, for each level
+LevelExits = {
+    Levels.JungleJapes: Transitions.JapesToIsles,
+    Levels.AngryAztec: Transitions.AztecToIsles,
+    Levels.FranticFactory: Transitions.FactoryToIsles,
+    Levels.GloomyGalleon: Transitions.GalleonToIsles,
+    Levels.FungiForest: Transitions.ForestToIsles,
+    Levels.CrystalCaves: Transitions.CavesToIsles,
+    Levels.CreepyCastle: Transitions.CastleToIsles,
+}
+
+# The time of day an exit needs the region it leaves from to have, and the times of day it passes on to its destination
+TimeNeeded = {Time.Both: 0, Time.Day: DayAccess, Time.Night: NightAccess}
+TimePassed = {Time.Both: DayAccess | NightAccess, Time.Day: DayAccess, Time.Night: NightAccess}
+
+
+def AssumedLogic(logic):
+    """Logic of an exit assumed from the root, which can always be taken."""
+    return True
+
+
+class RegionGraph:
+    """The exits of every region, numbered 0..N in the order of Logic.Regions and laid out in flat arrays.
+
+    The exits of region i are exitDest[exitStart[i]:exitStart[i + 1]], along with their logic and time of day in the
+    matching slices of the other exit arrays. An exit which can be shuffled refers to a slot of the override table,
+    which holds where the exit leads to now it is shuffled, or whether it is still waiting to be. The root also has an
+    exit for every shufflable exit to the region on its far side, which stands for the assumed exit while shuffling and
+    has a slot of its own saying whether that assumed exit is attached. The structure is built once for the regions in
+    use, and only the override table is brought up to date before each search.
+    """
+
+    def __init__(self):
+        """Build the graph from the regions' current exits."""
+        self.ids = list(Logic.Regions)
+        self.index = {regionId: i for i, regionId in enumerate(self.ids)}
+        self.regions = [Logic.Regions[regionId] for regionId in self.ids]
+        self.root = self.index[Regions.IslesMain]
+        self.slots = list(ShufflableExits)
+        slotIndex = {transition: slot for slot, transition in enumerate(self.slots)}
+        self.exitStart = [0]
+        self.exitDest = []
+        self.exitSlot = []
+        self.exitLogic = []
+        self.exitTimeNeeded = []
+        self.exitTimePassed = []
+        self.levelExitSlot = []
+        self.deathwarpDest = []
+        self.deathwarpLogic = []
+        for i, region in enumerate(self.regions):
+            # Exits assumed from the root come and go while shuffling, so they have exits of their own below
+            for exit in [x for x in region.exits if not x.assumed]:
+                self.exitDest.append(self.index[exit.dest])
+                self.exitSlot.append(slotIndex[exit.exitShuffleId] if exit.exitShuffleId is not None else -1)
+                self.exitLogic.append(exit.logic)
+                self.exitTimeNeeded.append(TimeNeeded[exit.time])
+                self.exitTimePassed.append(TimePassed[exit.time])
+            if i == self.root:
+                # If the exit is assumed from root, do not look for a shuffled exit - just explore the destination
+                for slot, transition in enumerate(self.slots):
+                    self.exitDest.append(self.index[ShufflableExits[transition].back.regionId])
+                    self.exitSlot.append(len(self.slots) + slot)
+                    self.exitLogic.append(AssumedLogic)
+                    self.exitTimeNeeded.append(TimeNeeded[Time.Both])
+                    self.exitTimePassed.append(TimePassed[Time.Both])
+            self.exitStart.append(len(self.exitDest))
+            # If you have option to restart, means there is no Exit Level option
+            self.levelExitSlot.append(slotIndex[LevelExits[region.level]] if region.restart is None and region.level in LevelExits else -1)
+            if region.deathwarp is not None:
+                self.deathwarpDest.append(self.index[region.deathwarp.dest])
+                self.deathwarpLogic.append(region.deathwarp.logic)
+            else:
+                self.deathwarpDest.append(-1)
+                self.deathwarpLogic.append(None)
+        # Slots past the shufflable exits are for the assumed exits from the root, which are Unplaced while detached
+        self.overrides = [Unshuffled] * len(self.slots) + [Unplaced] * len(self.slots)
+        self.slotIndex = slotIndex
+        self.levelExitDest = [-1] * len(self.slots)
+        self.levelExitsShuffled = False
+        # Regions leading to each region, and to each set of goal regions, for the exits they were found with
+        self.entrances = None
+        self.entrancesFor = None
+        self.cones = {}
+
+    def Refresh(self, settings):
+        """Bring the override table up to date with the exits shuffled so far."""
+        index = self.index
+        for slot, transition in enumerate(self.slots):
+            exit = ShufflableExits[transition]
+            if exit.shuffled:
+                self.overrides[slot] = index[ShufflableExits[exit.shuffledId].back.regionId]
+            elif exit.toBeShuffled:
+                self.overrides[slot] = Unplaced
+            else:
+                self.overrides[slot] = Unshuffled
+            # When shuffling levels, unplaced level entrances will have no destination yet
+            self.levelExitDest[slot] = index[ShufflableExits[exit.shuffledId].back.regionId] if exit.shuffledId is not None else -1
+            self.overrides[len(self.slots) + slot] = Unplaced
+        for exit in self.regions[self.root].exits:
+            if exit.assumed:
+                self.overrides[len(self.slots) + self.slotIndex[exit.exitShuffleId]] = Unshuffled
+        # If loading zones are shuffled, the "Exit Level" button in the pause menu could potentially take you somewhere new
+        self.levelExitsShuffled = bool(settings.shuffle_loading_zones)
+
+    def ExitDestination(self, exit):
+        """Get the region id an exit currently leads to, or -1 if it leads nowhere yet."""
+        slot = self.exitSlot[exit]
+        if slot < 0:
+            return self.exitDest[exit]
+        override = self.overrides[slot]
+        if override == Unshuffled:
+            return self.exitDest[exit]
+        if override == Unplaced:
+            return -1
+        return override
+
+    def LevelExitDestination(self, i):
+        """Get the region id the "Exit Level" button takes you to from region i, or -1 if it takes you nowhere new."""
+        slot = self.levelExitSlot[i]
+        if slot < 0 or not self.levelExitsShuffled:
+            return -1
+        return self.levelExitDest[slot]
+
+    def Destinations(self, i):
+        """Get every region id region i leads to by its exits, its level exit and its deathwarp, ignoring their logic."""
+        destinations = [self.ExitDestination(exit) for exit in range(self.exitStart[i], self.exitStart[i + 1])]
+        destinations.append(self.LevelExitDestination(i))
+        destinations.append(self.deathwarpDest[i])
+        return [x for x in destinations if x >= 0]
+
+    def Entrances(self):
+        """Get the ids of the regions leading to each region, ignoring logic, which are only found again once the exits have changed."""
+        exits = (tuple(self.overrides), tuple(self.levelExitDest), self.levelExitsShuffled)
+        if exits != self.entrancesFor:
+            self.entrances = [[] for region in self.regions]
+            for i in range(len(self.regions)):
+                for destination in self.Destinations(i):
+                    self.entrances[destination].append(i)
+            self.entrancesFor = exits
+            self.cones = {}
+        return self.entrances
+
+    def Cone(self, targets):
+        """Get the id of every region with a path to one of the target regions, ignoring logic."""
+        entrances = self.Entrances()
+        targets = tuple(targets)
+        if targets not in self.cones:
+            # Walk the exits backwards from the targets
+            cone = set(targets)
+            queue = list(targets)
+            for regionId in queue:
+                for entrance in entrances[regionId]:
+                    if entrance not in cone:
+                        cone.add(entrance)
+                        queue.append(entrance)
+            self.cones[targets] = cone
+        return self.cones[targets]
+
+
+# Graph of the regions in use, built again whenever a region's exits change, apart from the exits assumed from the root
+Graph = None
+
+
+def GetRegionGraph(settings):
+    """Get the graph of the regions in use with the exits shuffled so far."""
+    global Graph
+    if Graph is None:
+        Graph = RegionGraph()
+    Graph.Refresh(settings)
+    return Graph
+
+
+def InvalidateRegionGraph():
+    """Build the graph again the next time it is used, as regions or their exits have changed."""
+    global Graph
+    Graph = None
@@ -0,0 +1,208 @@
+"""Precompiled table of the logic rules from the logic files, recording which logic variables each rule reads."""
+import dis
+import types
+
+# Logic variables describing the region currently being searched, which change with every region visited
+REGION_VARIABLES = {"donkeyAccess", "diddyAccess", "lankyAccess", "tinyAccess", "chunkyAccess", "dayAccess", "nightAccess", "HasAccess", "TimeAccess"}
+
+
+class Rule:
+    """A compiled logic rule which caches its result for each kong during a search.
+
+    What the rule reads is only analyzed the first time it is evaluated during a search, as reading the code of every
+    rule up front made up most of the time taken to import the logic, and plenty of rules are never evaluated.
+    """
+
+    def __init__(self, table, function):
+        """Initialize with given parameters."""
+        self.table = table
+        self.function = function
+        self.dependencies = None
+        self.analyzed = False
+        self.cached = True
+        self.epoch = -1
+        self.results = {}
+
+    def __call__(self, logic):
+        """Evaluate the rule, reusing the last result for this kong if nothing it reads has changed."""
+        table = self.table
+        # Only cache during a search, anything else may have changed settings or placements in between
+        if logic is not table.logic or not self.cached:
+            return self.function(logic)
+        if self.epoch != table.epoch:
+            if not self.analyzed:
+                table.Analyze(self)
+                if not self.cached:
+                    return self.function(logic)
+            self.epoch = table.epoch
+            self.results = {}
+        results = self.results
+        if logic.kong in results:
+            return results[logic.kong]
+        result = self.function(logic)
+        results[logic.kong] = result
+        return result
+
+    def __deepcopy__(self, memo):
+        """Share the rule between copies of the logic data, as it belongs to the table."""
+        return self
+
+
+class RuleTable:
+    """Compiles logic rules and invalidates their cached results when the logic variables they read change.
+
+    Dependencies are found by reading the bytecode of each rule along with every logic variable method and
+    function it calls. Results are cached per kong and only within a single search (an epoch), since settings
+    and item placements can change between searches. Events are tracked individually when a rule only checks
+    for specific events, while coins and colored bananas are tracked as a whole.
+    """
+
+    def __init__(self, logicClass):
+        """Initialize an empty table for rules evaluated with instances of logicClass."""
+        self.logicClass = logicClass
+        self.rules = {}
+        # Reverse index from a logic variable (or ("Events", event) pair) to the rules reading it
+        self.dependents = {}
+        # Logic variables assigned by Update, which are compared after each update to find what changed
+        self.updatedVariables = set(instruction.argval for instruction in dis.get_instructions(logicClass.Update) if instruction.opname == "STORE_ATTR")
+        self.watchedVariables = []
+        self.values = {}
+        # Every attribute name read by a function called from a rule, by the function's code
+        self.calleeNames = {}
+        self.logic = None
+        self.epoch = 0
+
+    def Compile(self, function):
+        """Compile a logic function into a rule which is analyzed once it is first evaluated during a search, or return the function itself if caching wouldn't help."""
+        if isinstance(function, Rule):
+            return function
+        if function not in self.rules:
+            # Rules without calls are as cheap to evaluate as to look up, which the names they use are enough to tell
+            self.rules[function] = Rule(self, function) if self.MayCall(function.__code__, function.__globals__) else function
+        return self.rules[function]
+
+    def MayCall(self, code, globals):
+        """Check if code could call a logic variable method or global function, going by the names it uses without reading its bytecode."""
+        for name in code.co_names:
+            member = self.logicClass.__dict__.get(name)
+            if isinstance(member, staticmethod):
+                member = member.__func__
+            if isinstance(member, types.FunctionType) or isinstance(globals.get(name), types.FunctionType):
+                return True
+        return any(self.MayCall(constant, globals) for constant in code.co_consts if isinstance(constant, types.CodeType))
+
+    def Analyze(self, rule):
+        """Find the logic variables a rule depends on, or stop caching it if that wouldn't help."""
+        rule.analyzed = True
+        function = rule.function
+        names, callees = self.ReadCode(function.__code__, function.__globals__)
+        calleeNames = set()
+        for callee in callees:
+            # Rules call the same few logic variable methods, so what each of them reads is only worked out once
+            if callee.__code__ not in self.calleeNames:
+                self.calleeNames[callee.__code__] = self.GetNames(callee, set())
+            calleeNames.update(self.calleeNames[callee.__code__])
+        # Rules reading the current region can't be cached, and rules without calls are as cheap to evaluate as to look up
+        if len(callees) == 0 or not REGION_VARIABLES.isdisjoint(names) or not REGION_VARIABLES.isdisjoint(calleeNames):
+            rule.cached = False
+            return
+        dependencies = names | calleeNames
+        events = self.GetCheckedEvents(function.__code__)
+        if events is not None and "Events" not in calleeNames:
+            dependencies.discard("Events")
+            dependencies.update(("Events", event) for event in events)
+        rule.dependencies = frozenset(dependencies)
+        for dependency in rule.dependencies:
+            self.dependents.setdefault(dependency, []).append(rule)
+            if dependency in self.updatedVariables and dependency not in self.watchedVariables:
+                self.watchedVariables.append(dependency)
+                # Nothing read it so far this search, so changes only need spotting from its current value on
+                self.values[dependency] = self.CopyValue(getattr(self.logic, dependency, None))
+
+    def GetNames(self, function, visited):
+        """Get every attribute name read by a function and the functions it calls."""
+        if function.__code__ in visited:
+            return set()
+        visited.add(function.__code__)
+        names, callees = self.ReadCode(function.__code__, function.__globals__)
+        for callee in callees:
+            names.update(self.GetNames(callee, visited))
+        return names
+
+    def ReadCode(self, code, globals):
+        """Get the attribute names read by code along with the logic variable methods and global functions it calls."""
+        names = set()
+        callees = []
+        for instruction in dis.get_instructions(code):
+            member = None
+            if instruction.opname in ("LOAD_ATTR", "LOAD_METHOD"):
+                names.add(instruction.argval)
+                member = self.logicClass.__dict__.get(instruction.argval)
+                if isinstance(member, staticmethod):
+                    member = member.__func__
+            elif instruction.opname == "LOAD_GLOBAL":
+                member = globals.get(instruction.argval)
+            if isinstance(member, types.FunctionType):
+                callees.append(member)
+        # Comprehensions and generator expressions have their own code objects
+        for constant in code.co_consts:
+            if isinstance(constant, types.CodeType):
+                nestedNames, nestedCallees = self.ReadCode(constant, globals)
+                names.update(nestedNames)
+                callees.extend(nestedCallees)
+        return names, callees
+
+    @staticmethod
+    def GetCheckedEvents(code):
+        """Get the events a rule checks for with "Events.X in l.Events", or None if it reads the events any other way."""
+        instructions = [x for x in dis.get_instructions(code) if x.opname not in ("CACHE", "NOP")]
+        parameter = code.co_varnames[0] if code.co_argcount > 0 else None
+        events = set()
+        for i, instruction in enumerate(instructions):
+            if instruction.opname not in ("LOAD_ATTR", "LOAD_METHOD") or instruction.argval != "Events":
+                continue
+            if i < 3 or i + 1 >= len(instructions):
+                return None
+            owner, event, enum, comparison = instructions[i - 1], instructions[i - 2], instructions[i - 3], instructions[i + 1]
+            if owner.opname != "LOAD_FAST" or owner.argval != parameter:
+                return None
+            if enum.opname != "LOAD_GLOBAL" or enum.argval != "Events" or event.opname != "LOAD_ATTR":
+                return None
+            if comparison.opname != "CONTAINS_OP" and not (comparison.opname == "COMPARE_OP" and comparison.argval in ("in", "not in")):
+                return None
+            events.add(event.argval)
+        return events
+
+    def StartSearch(self, logic):
+        """Start a new search epoch, discarding every cached result."""
+        self.logic = logic
+        self.epoch += 1
+        self.values = {name: self.CopyValue(getattr(logic, name, None)) for name in self.watchedVariables}
+
+    def Refresh(self, logic):
+        """Invalidate rules reading logic variables which changed in the last update."""
+        if logic is not self.logic:
+            return
+        values = self.values
+        for name in self.watchedVariables:
+            value = getattr(logic, name, None)
+            if value != values[name]:
+                values[name] = self.CopyValue(value)
+                self.Changed(name)
+
+    def Changed(self, variable):
+        """Invalidate rules reading the given logic variable."""
+        for rule in self.dependents.get(variable, ()):
+            rule.results = {}
+
+    def EventAdded(self, event):
+        """Invalidate rules checking for the given event."""
+        self.Changed("Events")
+        self.Changed(("Events", event.name))
+
+    @staticmethod
+    def CopyValue(value):
+        """Copy mutable values so later changes can be detected."""
+        if isinstance(value, (set, list)):
+            return value.copy()
+        return value
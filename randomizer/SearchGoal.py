@@ -0,0 +1,24 @@
+"""Goals of searches which only look for a single item, and the regions which could lead to them."""
+from randomizer.Enums.Items import Items
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Lists.Location import LocationList
+
+
+def GetGoalItem(searchType, targetItemId):
+    """Get the item a search stops at as soon as it is found, or None if the search covers the whole world."""
+    if searchType == SearchMode.CheckBeatable:
+        return Items.BananaHoard
+    elif searchType == SearchMode.CheckSpecificItemReachable:
+        return targetItemId
+    return None
+
+
+def GetGoalCone(graph, goalItem):
+    """Get the id in the region graph of every region with a path to a location holding the goal item, following exits, level exits and deathwarps while ignoring their logic."""
+    # Kasplat shuffles move locations between regions after the graph is built, so the regions holding the goal are found again each time
+    goalRegions = []
+    for i, region in enumerate(graph.regions):
+        # Kasplats which were moved elsewhere leave locations behind which are no longer in the list
+        if any(location.id in LocationList and LocationList[location.id].item == goalItem for location in region.locations):
+            goalRegions.append(i)
+    return graph.Cone(goalRegions)
@@ -2,6 +2,7 @@
 import hashlib
 import inspect
 import json
+import os
 import random
 import sys
 from random import randint
@@ -14,6 +15,13 @@ import randomizer.ItemPool as ItemPool
 from randomizer.Prices import RandomizePrices, VanillaPrices
 from randomizer.ShuffleBosses import ShuffleBosses, ShuffleBossKongs, ShuffleKKOPhaseOrder, ShuffleKutoutKongs
 
+# Hash of the source code, computed once per process and again only if a hashed source file changes
+SourceHash = None
+# Size and modification time of each hashed source file when SourceHash was computed
+SourceStamps = None
+# Paths of the hashed source files, which never change once their modules are loaded
+SourceFiles = None
+
 
 class Settings:
     """Class used to store settings for seed generation."""
@@ -559,21 +567,59 @@ class Settings:
         return json.dumps(self.__dict__)
 
     @staticmethod
-    def __get_hash():
-        """Get the hash value of all of the source code loaded."""
-        hash_value = []
-        files = []
-        files.append(inspect.getsource(Settings))
-        files.append(inspect.getsource(__import__("randomizer.Spoiler")))
-        files.append(inspect.getsource(__import__("randomizer.Fill")))
-        files.append(inspect.getsource(__import__("randomizer.BackgroundRandomizer")))
+    def __get_hashed_objects():
+        """Get the loaded code covered by the hash."""
+        objects = [Settings, __import__("randomizer.Spoiler"), __import__("randomizer.Fill"), __import__("randomizer.BackgroundRandomizer")]
         try:
-            files.append(inspect.getsource(__import__("version")))
+            objects.append(__import__("version"))
         except Exception:  # Fails if running python by itself
             pass
+        return objects
+
+    @staticmethod
+    def __get_source_stamps():
+        """Get the size and modification time of every hashed source file."""
+        global SourceFiles
+        if SourceFiles is None:
+            SourceFiles = []
+            for obj in Settings.__get_hashed_objects():
+                try:
+                    file = inspect.getsourcefile(obj)
+                except Exception:
+                    continue
+                if file not in SourceFiles:
+                    SourceFiles.append(file)
+        stamps = []
+        for file in SourceFiles:
+            try:
+                stat = os.stat(file)
+                stamps.append((stat.st_size, stat.st_mtime_ns))
+            except Exception:
+                stamps.append(None)
+        return stamps
+
+    @staticmethod
+    def __get_hash():
+        """Get the hash value of all of the source code loaded.
+
+        The source is only read and hashed again if one of its files has changed since the hash was last computed.
+        """
+        global SourceHash, SourceStamps
+        stamps = Settings.__get_source_stamps()
+        if SourceHash is not None and stamps == SourceStamps:
+            return SourceHash
+        hash_value = []
+        files = []
+        for obj in Settings.__get_hashed_objects():
+            try:
+                files.append(inspect.getsource(obj))
+            except Exception:  # Fails for version if running python by itself
+                pass
         for file in sorted(files):
             hash_value.append(hashlib.md5(file.encode("utf-8")).hexdigest())
-        return "".join(hash_value)
+        SourceHash = "".join(hash_value)
+        SourceStamps = stamps
+        return SourceHash
 
     def compare_hash(self, hash):
         """Compare our hash with a passed hash value."""
@@ -4,28 +4,29 @@ import random
 import js
 import randomizer.Fill as Fill
 import randomizer.Lists.Exceptions as Ex
+import randomizer.Profiler as Profiler
 from randomizer.Enums.Minigames import Minigames
 from randomizer.Lists.MapsAndExits import Maps
-from randomizer.Lists.Minigame import BarrelMetaData, MinigameRequirements
+from randomizer.Lists.Minigame import MinigameRequirements
 from randomizer.Settings import Settings
 
 
-def Reset(barrelLocations):
+def Reset(world, barrelLocations):
     """Reset bonus barrel associations."""
     for key in barrelLocations:
-        BarrelMetaData[key].minigame = Minigames.NoGame
+        world.BarrelMetaData[key].minigame = Minigames.NoGame
 
 
-def ShuffleBarrels(settings: Settings, barrelLocations, minigamePool):
+def ShuffleBarrels(settings: Settings, world, barrelLocations, minigamePool):
     """Shuffle minigames to different barrels."""
     random.shuffle(barrelLocations)
     random.shuffle(minigamePool)
     while len(barrelLocations) > 0:
         location = barrelLocations.pop()
         # Don't bother shuffling or validating barrel locations which are skipped
-        if BarrelMetaData[location].map == Maps.HideoutHelm and settings.helm_barrels == "skip":
+        if world.BarrelMetaData[location].map == Maps.HideoutHelm and settings.helm_barrels == "skip":
             continue
-        elif BarrelMetaData[location].map != Maps.HideoutHelm and settings.bonus_barrels == "skip":
+        elif world.BarrelMetaData[location].map != Maps.HideoutHelm and settings.bonus_barrels == "skip":
             continue
         # Check each remaining minigame to see if placing it will produce a valid world
         success = False
@@ -35,9 +36,9 @@ def ShuffleBarrels(settings: Settings, barrelLocations, minigamePool):
             if MinigameRequirements[minigame].helm_enabled:
                 helm = True
         for minigame in minigamePool:
-            BarrelMetaData[location].minigame = minigame
+            world.BarrelMetaData[location].minigame = minigame
             # If there is a minigame that can be placed in Helm, skip banned minigames, otherwise continue as normal
-            if not MinigameRequirements[minigame].helm_enabled and BarrelMetaData[location].map == Maps.HideoutHelm and helm is True:
+            if not MinigameRequirements[minigame].helm_enabled and world.BarrelMetaData[location].map == Maps.HideoutHelm and helm is True:
                 continue
             # If world is still valid, keep minigame associated there
             if settings.bonus_barrels != "selected":
@@ -52,7 +53,7 @@ def ShuffleBarrels(settings: Settings, barrelLocations, minigamePool):
                     success = True
                     break
                 else:
-                    BarrelMetaData[location].minigame = Minigames.NoGame
+                    world.BarrelMetaData[location].minigame = Minigames.NoGame
             else:
                 if Fill.VerifyWorld(settings):
                     minigamePool.remove(minigame)
@@ -65,15 +66,15 @@ def ShuffleBarrels(settings: Settings, barrelLocations, minigamePool):
                     success = True
                     break
                 else:
-                    BarrelMetaData[location].minigame = Minigames.NoGame
+                    world.BarrelMetaData[location].minigame = Minigames.NoGame
         if not success:
             raise Ex.BarrelOutOfMinigames
 
 
-def BarrelShuffle(settings: Settings):
+def BarrelShuffle(settings: Settings, world):
     """Facilitate shuffling of barrels."""
     # First make master copies of locations and minigames
-    barrelLocations = list(BarrelMetaData.keys())
+    barrelLocations = list(world.BarrelMetaData.keys())
     if settings.bonus_barrels == "selected":
         minigame_dict = {
             "batty_barrel_bandit": [Minigames.BattyBarrelBanditVEasy, Minigames.BattyBarrelBanditEasy, Minigames.BattyBarrelBanditNormal, Minigames.BattyBarrelBanditHard],
@@ -115,15 +116,16 @@ def BarrelShuffle(settings: Settings):
     while True:
         try:
             # Shuffle barrels
-            Reset(barrelLocations)
-            ShuffleBarrels(settings, barrelLocations.copy(), minigamePool.copy())
+            Reset(world, barrelLocations)
+            ShuffleBarrels(settings, world, barrelLocations.copy(), minigamePool.copy())
             # Verify world by assuring all locations are still reachable
             if not Fill.VerifyWorld(settings):
                 raise Ex.BarrelPlacementException
             return
-        except Ex.BarrelPlacementException:
+        except Ex.BarrelPlacementException as ex:
             if retries == 5:
                 js.postMessage("Minigame placement failed, out of retries.")
                 raise Ex.BarrelAttemptCountExceeded
             retries += 1
+            Profiler.AddRetry("BarrelShuffle", ex)
             js.postMessage("Minigame placement failed. Retrying. Tries: " + str(retries))
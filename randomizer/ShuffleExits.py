@@ -4,12 +4,13 @@ import random
 import js
 import randomizer.Fill as Fill
 import randomizer.Lists.Exceptions as Ex
-import randomizer.Logic as Logic
+import randomizer.Profiler as Profiler
 from randomizer.Enums.Kongs import Kongs
 from randomizer.Enums.Levels import Levels
 from randomizer.Enums.Locations import Locations
 from randomizer.Enums.Regions import Regions
 from randomizer.Enums.Transitions import Transitions
+from randomizer.ExitConnectivity import ExitConnectivity
 from randomizer.Lists.ShufflableExit import ShufflableExits
 from randomizer.LogicClasses import TransitionFront
 from randomizer.Settings import Settings
@@ -29,34 +30,34 @@ LobbyEntrancePool = [
 root = Regions.IslesMain
 
 
-def GetRootExit(exitId):
+def GetRootExit(world, exitId):
     """Query the world root to return an exit with a matching exit id."""
-    return [x for x in Logic.Regions[root].exits if x.assumed and x.exitShuffleId is not None and x.exitShuffleId == exitId][0]
+    return [x for x in world.Regions[root].exits if x.assumed and x.exitShuffleId is not None and x.exitShuffleId == exitId][0]
 
 
-def RemoveRootExit(exit):
+def RemoveRootExit(world, exit):
     """Remove an exit from the world root."""
-    Logic.Regions[root].exits.remove(exit)
+    world.Regions[root].exits.remove(exit)
 
 
-def AddRootExit(exit):
+def AddRootExit(world, exit):
     """Add an exit to the world root."""
-    Logic.Regions[root].exits.append(exit)
+    world.Regions[root].exits.append(exit)
 
 
-def Reset():
+def Reset(world):
     """Reset shufflable exit properties set during shuffling."""
-    for exit in ShufflableExits.values():
+    for exit in world.ShufflableExits.values():
         exit.shuffledId = None
         exit.shuffled = False
     assumedExits = []
-    for exit in [x for x in Logic.Regions[root].exits if x.assumed]:
+    for exit in [x for x in world.Regions[root].exits if x.assumed]:
         assumedExits.append(exit)
     for exit in assumedExits:
-        RemoveRootExit(exit)
+        RemoveRootExit(world, exit)
 
 
-def AttemptConnect(settings, frontExit, frontId, backExit, backId):
+def AttemptConnect(settings, world, frontExit, frontId, backExit, backId, connectivity=None):
     """Attempt to connect two exits, checking if the world is valid if they are connected."""
     # Remove connections to world root
     frontReverse = None
@@ -64,41 +65,46 @@ def AttemptConnect(settings, frontExit, frontId, backExit, backId):
         # Prevents an error if trying to assign an entrance back to itself
         if frontExit.back.reverse == backId:
             return False
-        frontReverse = GetRootExit(frontExit.back.reverse)
-        RemoveRootExit(frontReverse)
-    backRootExit = GetRootExit(backId)
-    RemoveRootExit(backRootExit)
+        frontReverse = GetRootExit(world, frontExit.back.reverse)
+        RemoveRootExit(world, frontReverse)
+    backRootExit = GetRootExit(world, backId)
+    RemoveRootExit(world, backRootExit)
     # Add connection between selected exits
     frontExit.shuffled = True
     frontExit.shuffledId = backId
     if not settings.decoupled_loading_zones:
-        backReverse = ShufflableExits[backExit.back.reverse]
+        backReverse = world.ShufflableExits[backExit.back.reverse]
         backReverse.shuffled = True
         backReverse.shuffledId = frontExit.back.reverse
     # Attempt to verify world
-    valid = Fill.VerifyWorld(settings)
+    if connectivity is None:
+        valid = Fill.VerifyWorld(settings)
+    else:
+        detachedRegions = [backRootExit.dest] if frontReverse is None else [backRootExit.dest, frontReverse.dest]
+        valid = connectivity.Verify(detachedRegions)
     # If world is not valid, restore root connections and undo new connections
     if not valid:
-        AddRootExit(backRootExit)
+        AddRootExit(world, backRootExit)
         frontExit.shuffled = False
         frontExit.shuffledId = None
         if not settings.decoupled_loading_zones:
-            AddRootExit(frontReverse)
+            AddRootExit(world, frontReverse)
             backReverse.shuffled = False
             backReverse.shuffledId = None
     return valid
 
 
-def ShuffleExitsInPool(settings, frontpool, backpool):
+@Profiler.Timed("ShuffleExitsInPool")
+def ShuffleExitsInPool(settings, world, frontpool, backpool):
     """Shuffle exits within a specific pool."""
-    NonTagRegions = [x for x in backpool if not Logic.Regions[ShufflableExits[x].back.regionId].tagbarrel]
-    NonTagLeaves = [x for x in NonTagRegions if len(Logic.Regions[ShufflableExits[x].back.regionId].exits) == 1]
+    NonTagRegions = [x for x in backpool if not world.Regions[world.ShufflableExits[x].back.regionId].tagbarrel]
+    NonTagLeaves = [x for x in NonTagRegions if len(world.Regions[world.ShufflableExits[x].back.regionId].exits) == 1]
     random.shuffle(NonTagLeaves)
     NonTagNonLeaves = [x for x in NonTagRegions if x not in NonTagLeaves]
     random.shuffle(NonTagNonLeaves)
 
     TagRegions = [x for x in backpool if x not in NonTagRegions]
-    TagLeaves = [x for x in TagRegions if len(Logic.Regions[ShufflableExits[x].back.regionId].exits) == 1]
+    TagLeaves = [x for x in TagRegions if len(world.Regions[world.ShufflableExits[x].back.regionId].exits) == 1]
     random.shuffle(TagLeaves)
     TagNonLeaves = [x for x in TagRegions if x not in TagLeaves]
     random.shuffle(TagNonLeaves)
@@ -110,14 +116,14 @@ def ShuffleExitsInPool(settings, frontpool, backpool):
 
     # Coupled is more restrictive and need to also order the front pool to lower rate of failures
     if not settings.decoupled_loading_zones:
-        NonTagRegions = [x for x in frontpool if not Logic.Regions[ShufflableExits[x].back.regionId].tagbarrel]
-        NonTagLeaves = [x for x in NonTagRegions if len(Logic.Regions[ShufflableExits[x].back.regionId].exits) == 1]
+        NonTagRegions = [x for x in frontpool if not world.Regions[world.ShufflableExits[x].back.regionId].tagbarrel]
+        NonTagLeaves = [x for x in NonTagRegions if len(world.Regions[world.ShufflableExits[x].back.regionId].exits) == 1]
         random.shuffle(NonTagLeaves)
         NonTagNonLeaves = [x for x in NonTagRegions if x not in NonTagLeaves]
         random.shuffle(NonTagNonLeaves)
 
         TagRegions = [x for x in frontpool if x not in NonTagRegions]
-        TagLeaves = [x for x in TagRegions if len(Logic.Regions[ShufflableExits[x].back.regionId].exits) == 1]
+        TagLeaves = [x for x in TagRegions if len(world.Regions[world.ShufflableExits[x].back.regionId].exits) == 1]
         random.shuffle(TagLeaves)
         TagNonLeaves = [x for x in TagRegions if x not in TagLeaves]
         random.shuffle(TagNonLeaves)
@@ -130,16 +136,17 @@ def ShuffleExitsInPool(settings, frontpool, backpool):
         random.shuffle(frontpool)
 
     # For each back exit, select a random valid front entrance to attach to it
+    connectivity = ExitConnectivity(settings, world)
     while len(backpool) > 0:
         backId = backpool.pop(0)
-        backExit = ShufflableExits[backId]
+        backExit = world.ShufflableExits[backId]
         # Filter origins to make sure that if this target requires a certain kong's access, then the entrance will be accessible by that kong
-        origins = [x for x in frontpool if ShufflableExits[x].entryKongs.issuperset(backExit.regionKongs)]
+        origins = [x for x in frontpool if world.ShufflableExits[x].entryKongs.issuperset(backExit.regionKongs)]
         if not settings.decoupled_loading_zones and backExit.category is None:
             # In coupled, if both front & back are leaves, the result will be invalid
-            origins = [x for x in origins if ShufflableExits[ShufflableExits[x].back.reverse].category is not None]
+            origins = [x for x in origins if world.ShufflableExits[world.ShufflableExits[x].back.reverse].category is not None]
             # Also validate the entry & region kongs overlap in reverse direction
-            origins = [x for x in origins if ShufflableExits[backExit.back.reverse].entryKongs.issuperset(ShufflableExits[ShufflableExits[x].back.reverse].regionKongs)]
+            origins = [x for x in origins if world.ShufflableExits[backExit.back.reverse].entryKongs.issuperset(world.ShufflableExits[world.ShufflableExits[x].back.reverse].regionKongs)]
         elif settings.decoupled_loading_zones and backExit.back.regionId in [Regions.JapesMinecarts, Regions.ForestMinecarts]:
             # In decoupled, we still have to prevent one-way minecart exits from leading to the minecarts themselves
             if Transitions.JapesCartsToMain in origins:
@@ -151,8 +158,8 @@ def ShuffleExitsInPool(settings, frontpool, backpool):
             raise Ex.EntranceOutOfDestinations
         # Select a random origin
         for frontId in origins:
-            frontExit = ShufflableExits[frontId]
-            if AttemptConnect(settings, frontExit, frontId, backExit, backId):
+            frontExit = world.ShufflableExits[frontId]
+            if AttemptConnect(settings, world, frontExit, frontId, backExit, backId, connectivity):
                 # print("Assigned " + frontExit.name + " --> " + backExit.name)
                 frontpool.remove(frontId)
                 if not settings.decoupled_loading_zones:
@@ -169,11 +176,11 @@ def ShuffleExitsInPool(settings, frontpool, backpool):
             raise Ex.EntranceOutOfDestinations
 
 
-def AssumeExits(settings, frontpool, backpool, newpool):
+def AssumeExits(settings, world, frontpool, backpool, newpool):
     """Split exit pool into front and back pools, and assumes exits reachable from root."""
     for i in range(len(newpool)):
         exitId = newpool[i]
-        exit = ShufflableExits[exitId]
+        exit = world.ShufflableExits[exitId]
         # When coupled, only transitions which have a reverse path can be included in the pools
         if not settings.decoupled_loading_zones and exit.back.reverse is None:
             continue
@@ -186,47 +193,50 @@ def AssumeExits(settings, frontpool, backpool, newpool):
         exit.toBeShuffled = True
         # 2) Attach to root of world (DK Isles)
         newExit = TransitionFront(exit.back.regionId, lambda l: True, exitId, True)
-        AddRootExit(newExit)
+        AddRootExit(world, newExit)
 
 
-def ShuffleExits(settings: Settings):
+@Profiler.Timed("ExitShuffle")
+def ShuffleExits(settings: Settings, world):
     """Shuffle exit pools depending on settings."""
     # Set up front and back entrance pools for each setting
     # Assume all shuffled exits reachable by default
     if settings.shuffle_loading_zones == "levels":
         if settings.kongs_for_progression:
-            ShuffleLevelOrderWithRestrictions(settings)
+            ShuffleLevelOrderWithRestrictions(settings, world)
         else:
-            ShuffleLevelExits(settings)
+            ShuffleLevelExits(settings, world)
     elif settings.shuffle_loading_zones == "all":
         frontpool = []
         backpool = []
-        AssumeExits(settings, frontpool, backpool, list(ShufflableExits.keys()))
+        AssumeExits(settings, world, frontpool, backpool, list(world.ShufflableExits.keys()))
         # Shuffle each entrance pool
-        ShuffleExitsInPool(settings, frontpool, backpool)
+        ShuffleExitsInPool(settings, world, frontpool, backpool)
     # If levels rando is on, need to update Blocker and T&S requirements to match
     if settings.shuffle_loading_zones == "levels":
         UpdateLevelProgression(settings)
 
 
-def ExitShuffle(settings):
+@Profiler.Timed("ExitShuffle")
+def ExitShuffle(settings, world):
     """Facilitate shuffling of exits."""
     retries = 0
     while True:
         try:
             # Shuffle entrances based on settings
-            ShuffleExits(settings)
+            ShuffleExits(settings, world)
             # Verify world by assuring all locations are still reachable
             if not Fill.VerifyWorld(settings):
                 raise Ex.EntrancePlacementException
             return
-        except Ex.EntrancePlacementException:
+        except Ex.EntrancePlacementException as ex:
             if retries == 20:
                 js.postMessage("Entrance placement failed, out of retries.")
                 raise Ex.EntranceAttemptCountExceeded
             retries += 1
+            Profiler.AddRetry("ExitShuffle", ex)
             js.postMessage("Entrance placement failed. Retrying. Tries: " + str(retries))
-            Reset()
+            Reset(world)
 
 
 def UpdateLevelProgression(settings: Settings):
@@ -255,7 +265,7 @@ def UpdateLevelProgression(settings: Settings):
     settings.BossBananas = newBossBananas
 
 
-def ShuffleLevelExits(settings: Settings, newLevelOrder: dict = None):
+def ShuffleLevelExits(settings: Settings, world, newLevelOrder: dict = None):
     """Shuffle level exits according to new level order if provided, otherwise shuffle randomly."""
     frontpool = LobbyEntrancePool.copy()
     backpool = LobbyEntrancePool.copy()
@@ -290,16 +300,16 @@ def ShuffleLevelExits(settings: Settings, newLevelOrder: dict = None):
     # Assuming there are no inherently invalid level orders, but if there are, validation will check after this
     while len(backpool) > 0:
         backId = backpool.pop()
-        backExit = ShufflableExits[backId]
+        backExit = world.ShufflableExits[backId]
         # Select a random origin
         frontId = frontpool.pop()
-        frontExit = ShufflableExits[frontId]
+        frontExit = world.ShufflableExits[frontId]
         # Add connection between selected exits
         frontExit.shuffled = True
         frontExit.shuffledId = backId
         # print("Assigned " + frontExit.name + " --> " + backExit.name)
         # Add reverse connection
-        backReverse = ShufflableExits[backExit.back.reverse]
+        backReverse = world.ShufflableExits[backExit.back.reverse]
         backReverse.shuffled = True
         backReverse.shuffledId = frontExit.back.reverse
 
@@ -307,7 +317,7 @@ def ShuffleLevelExits(settings: Settings, newLevelOrder: dict = None):
     settings.level_order = shuffledLevelOrder
 
 
-def ShuffleLevelOrderWithRestrictions(settings: Settings):
+def ShuffleLevelOrderWithRestrictions(settings: Settings, world):
     """Determine level order given starting kong and the need to find more kongs along the way."""
     if settings.starting_kongs_count == 1:
         newLevelOrder = ShuffleLevelOrderForOneStartingKong(settings)
@@ -315,7 +325,7 @@ def ShuffleLevelOrderWithRestrictions(settings: Settings):
         newLevelOrder = ShuffleLevelOrderForMultipleStartingKongs(settings)
     if None in newLevelOrder.values():
         raise Ex.EntrancePlacementException("Invalid level order with fewer than the 7 required main levels.")
-    ShuffleLevelExits(settings, newLevelOrder)
+    ShuffleLevelExits(settings, world, newLevelOrder)
 
 
 def ShuffleLevelOrderForOneStartingKong(settings):
@@ -4,13 +4,12 @@ import random
 import js
 import randomizer.Fill as Fill
 import randomizer.Lists.Exceptions as Ex
-import randomizer.Logic as Logic
+import randomizer.Profiler as Profiler
 from randomizer.Enums.Items import Items
 from randomizer.Enums.Kongs import GetKongs, Kongs
 from randomizer.Enums.Levels import Levels
 from randomizer.Enums.Locations import Locations
 from randomizer.Enums.Types import Types
-from randomizer.Lists.KasplatLocations import KasplatLocationList
 from randomizer.Lists.Location import Location
 from randomizer.Lists.MapsAndExits import Maps
 from randomizer.LogicClasses import LocationLogic
@@ -67,9 +66,9 @@ constants = {
 }
 
 
-def FindLevel(location):
+def FindLevel(world, location):
     """Find the level given a location."""
-    for region in Logic.Regions.values():
+    for region in world.Regions.values():
         for loc in region.locations:
             if loc.id == location:
                 return region.level
@@ -95,18 +94,18 @@ def GetBlueprintLocationForKongAndLevel(level, kong):
     return Locations(baseOffset + (5 * levelOffset) + int(kong))
 
 
-def ShuffleKasplatsAndLocations(spoiler, LogicVariables):
+def ShuffleKasplatsAndLocations(spoiler, world):
     """Shuffle the location and kong assigned to each kasplat. This should replace ShuffleKasplats if all goes well."""
     # Cull all locations for vanilla kasplats so they don't get in the way or have items shuffled into them
     spoiler.shuffled_kasplat_map = {}
-    LogicVariables.kasplat_map = {}
+    world.LogicVariables.kasplat_map = {}
     for location in shufflable:
-        Logic.LocationList.pop(location, None)
+        world.LocationList.pop(location, None)
     for location in constants:
-        Logic.LocationList.pop(location, None)
+        world.LocationList.pop(location, None)
     # Fill kasplats level by level
-    for level in KasplatLocationList:
-        kasplats = KasplatLocationList[level]
+    for level in world.KasplatLocationList:
+        kasplats = world.KasplatLocationList[level]
         # Fill kasplats kong by kong
         kongs = GetKongs()
         random.shuffle(kongs)
@@ -127,31 +126,32 @@ def ShuffleKasplatsAndLocations(spoiler, LogicVariables):
                     # Assemble the Location object
                     location = Location(kasplat.name, item_id, Types.Blueprint, [kasplat.map, kong])
                     location.PlaceDefaultItem()
-                    Logic.LocationList[location_id] = location
+                    world.LocationList[location_id] = location
                     # Insert the Location into the Region
-                    kasplatRegion = Logic.Regions[kasplat.region_id]
+                    kasplatRegion = world.Regions[kasplat.region_id]
                     kasplatRegion.locations.append(LocationLogic(location_id, kasplat.additional_logic))
                     # Update logic variables for remainder of the Fill
-                    LogicVariables.kasplat_map[location_id] = kong
+                    world.LogicVariables.kasplat_map[location_id] = kong
                     spoiler.shuffled_kasplat_map[kasplat.name] = int(kong)
                     break
 
 
-def ResetShuffledKasplatLocations():
+def ResetShuffledKasplatLocations(world):
     """Reset all placed kasplat locations."""
-    for level in KasplatLocationList:
-        for kasplat in KasplatLocationList[level]:
+    for level in world.KasplatLocationList:
+        for kasplat in world.KasplatLocationList[level]:
             # If this kasplat was selected, we need to remove random kasplat locations from the kasplat's logic region
             # This may hit multiple kasplats in the same region at the same time, but that's okay
             if kasplat.selected:
                 # Also reset the state of the kasplat, by the end of the loop we'll have no kasplats selected in preparation for the next fill attempt
                 kasplat.setKasplat(state=False)
-                randomKasplatRegion = Logic.Regions[kasplat.region_id]
+                randomKasplatRegion = world.Regions[kasplat.region_id]
                 randomKasplatRegion.locations = [loc for loc in randomKasplatRegion.locations if loc.id < Locations.JapesDonkeyKasplatRando or loc.id > Locations.IslesChunkyKasplatRando]
 
 
-def ShuffleKasplats(LogicVariables):
+def ShuffleKasplats(world):
     """Shuffles the kong assigned to each kasplat."""
+    LogicVariables = world.LogicVariables
     # Make sure only 1 of each kasplat per level, set up array to track that
     level_kongs = []
     kongs = GetKongs()
@@ -161,7 +161,7 @@ def ShuffleKasplats(LogicVariables):
         level_kongs.append(kongs.copy())
     # Remove constants
     for loc, kong in constants.items():
-        level = FindLevel(loc)
+        level = FindLevel(world, loc)
         level_kongs[level].remove(kong)
     # Set up kasplat map
     LogicVariables.kasplat_map = {}
@@ -175,7 +175,7 @@ def ShuffleKasplats(LogicVariables):
     while len(shuffle_locations) > 0:
         location = shuffle_locations.pop()
         # Get this location's level and available kongs for this level
-        level = FindLevel(location)
+        level = FindLevel(world, location)
         kongs = level_kongs[level]
         random.shuffle(kongs)
         # Check each kong to see if placing it here produces a valid world
@@ -190,30 +190,31 @@ def ShuffleKasplats(LogicVariables):
             raise Ex.KasplatOutOfKongs
 
 
-def KasplatShuffle(spoiler, LogicVariables):
+def KasplatShuffle(spoiler, world):
     """Facilitate the shuffling of kasplat types."""
-    if LogicVariables.settings.kasplat_rando:
+    if world.settings.kasplat_rando:
         retries = 0
         while True:
             try:
                 # Shuffle kasplats
-                if LogicVariables.settings.kasplat_location_rando:
-                    ShuffleKasplatsAndLocations(spoiler, LogicVariables)
+                if world.settings.kasplat_location_rando:
+                    ShuffleKasplatsAndLocations(spoiler, world)
                 else:
-                    ShuffleKasplats(LogicVariables)
+                    ShuffleKasplats(world)
                 # Verify world by assuring all locations are still reachable
-                if not Fill.VerifyWorld(LogicVariables.settings):
+                if not Fill.VerifyWorld(world.settings):
                     raise Ex.KasplatPlacementException
                 return
-            except Ex.KasplatPlacementException:
+            except Ex.KasplatPlacementException as ex:
                 if retries == 5:
                     js.postMessage("Kasplat placement failed, out of retries.")
                     raise Ex.KasplatAttemptCountExceeded
                 retries += 1
+                Profiler.AddRetry("KasplatShuffle", ex)
                 js.postMessage("Kasplat placement failed. Retrying. Tries: " + str(retries))
                 # We've added logic in kasplat location rando, now we need to remove it
-                if LogicVariables.settings.kasplat_location_rando:
-                    ResetShuffledKasplatLocations()
+                if world.settings.kasplat_location_rando:
+                    ResetShuffledKasplatLocations(world)
 
 
 def InitKasplatMap(LogicVariables):
@@ -1,11 +1,11 @@
 """Shuffles the locations of shops."""
 import random
 
-import randomizer.Logic as Logic
 from randomizer.Enums.Levels import Levels
 from randomizer.Enums.Regions import Regions
 from randomizer.Lists.MapsAndExits import Maps
 from randomizer.LogicClasses import TransitionFront
+from randomizer.RegionGraph import InvalidateRegionGraph
 from randomizer.Spoiler import Spoiler
 
 
@@ -76,7 +76,7 @@ available_shops = {
 }
 
 
-def ShuffleShopLocations(spoiler: Spoiler):
+def ShuffleShopLocations(spoiler: Spoiler, world):
     """Shuffle Shop locations within their own pool inside the level."""
     # Reset
     for level in available_shops:
@@ -95,7 +95,7 @@ def ShuffleShopLocations(spoiler: Spoiler):
         for shop in shop_array:
             if not shop.locked:
                 # This is a valid shop to shuffle, so we need to remove the preexisting logical access
-                old_region = Logic.Regions[shop.containing_region]
+                old_region = world.Regions[shop.containing_region]
                 old_region.exits = [exit for exit in old_region.exits if exit.dest != shop.shop_exit]
                 shops_in_levels.append(shop)
         random.shuffle(shops_in_levels)
@@ -108,8 +108,9 @@ def ShuffleShopLocations(spoiler: Spoiler):
                 assortment_in_level[shop.shop] = shop.new_shop
                 placement_index += 1
                 # Add exit to new containing region for logical access
-                region = Logic.Regions[shop.containing_region]
+                region = world.Regions[shop.containing_region]
                 region.exits.append(TransitionFront(shop.new_shop_exit, lambda l: True))
         assortment[level] = assortment_in_level
+    InvalidateRegionGraph()
     # Write Assortment to spoiler
     spoiler.shuffled_shop_locations = assortment
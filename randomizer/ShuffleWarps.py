@@ -4,38 +4,37 @@ import random
 import js
 from randomizer.Enums.Warps import Warps
 from randomizer.Lists.MapsAndExits import Maps
-from randomizer.Lists.Warps import BananaportVanilla
 
 
-def getShuffleMaps():
+def getShuffleMaps(world):
     """Produce list of maps which contain a bananaport swap."""
     lst = []
-    for x in BananaportVanilla.values():
+    for x in world.BananaportVanilla.values():
         if x.map_id not in lst:
             lst.append(x.map_id)
     return lst
 
 
-def ShuffleWarps(bananaport_replacements, human_ports):
+def ShuffleWarps(world, bananaport_replacements, human_ports):
     """Shuffles warps between themselves."""
-    map_list = getShuffleMaps()
+    map_list = getShuffleMaps(world)
     for warp_map in map_list:
         shufflable_warps = []
         # Generate list of shufflable warp types (Warp 1, Warp 2 etc.)
-        for warp in BananaportVanilla.values():
+        for warp in world.BananaportVanilla.values():
             if warp.map_id == warp_map and not warp.locked:
                 shufflable_warps.append(warp.vanilla_warp)
         random.shuffle(shufflable_warps)
         shuffle_index = 0
         # Apply shuffle
-        for warp in BananaportVanilla.keys():
-            if BananaportVanilla[warp].map_id == warp_map and not BananaportVanilla[warp].locked:
-                BananaportVanilla[warp].setNewWarp(shufflable_warps[shuffle_index])
+        for warp in world.BananaportVanilla.keys():
+            if world.BananaportVanilla[warp].map_id == warp_map and not world.BananaportVanilla[warp].locked:
+                world.BananaportVanilla[warp].setNewWarp(shufflable_warps[shuffle_index])
                 shuffle_index += 1
         # Write to spoiler and create array of replacements
         pad_list = []
         pad_temp_list = [[], [], [], [], []]
-        for warp in BananaportVanilla.values():
+        for warp in world.BananaportVanilla.values():
             if warp.map_id == warp_map:
                 human_ports[warp.name] = "Warp " + str(warp.new_warp + 1)
                 if not warp.locked:
@@ -412,6 +412,7 @@ class Spoiler:
     def UpdateExits(self):
         """Update list of shuffled exits."""
         self.shuffled_exit_data = {}
+        self.shuffled_exit_instructions = []
         containerMaps = {}
         for key, exit in ShufflableExits.items():
             if exit.shuffled:
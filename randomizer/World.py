@@ -0,0 +1,55 @@
+"""Resetting the world structures seed generation changes, so each seed starts from the same world."""
+import copy
+
+import randomizer.Logic as Logic
+from randomizer.Lists.KasplatLocations import KasplatLocationList
+from randomizer.Lists.Location import LocationList
+from randomizer.Lists.Minigame import BarrelMetaData
+from randomizer.Lists.Patches import DirtPatchLocations
+from randomizer.Lists.ShufflableExit import ShufflableExits
+from randomizer.Lists.Warps import BananaportVanilla
+from randomizer.Lists.WrinklyHints import hints
+from randomizer.Logic import LogicVarHolder, SearchStateHolder
+from randomizer.RegionGraph import InvalidateRegionGraph
+
+# Every structure seed generation changes, in the order WorldReset unpacks them
+SharedState = (Logic.Regions, Logic.CollectibleRegions, LocationList, ShufflableExits, KasplatLocationList, BarrelMetaData, BananaportVanilla, DirtPatchLocations, hints)
+# Untouched copy of the above, taken before any seed is generated
+PristineState = copy.deepcopy(SharedState)
+
+
+class WorldReset:
+    """Resets the module-level world structures to a pristine copy and refers to them for a seed's generation.
+
+    Generating a seed rewires region exits, places items, connects exits, moves kasplats, shops and dirt patches
+    and writes hints, all in the module-level structures. Resetting them to a copy taken at import lets a process
+    generate seed after seed (e.g. as a worker in a process pool) without one seed's changes leaking into the next.
+    The attributes are the module-level structures themselves, not copies: the shufflers change them through this
+    object, while the fill, the search and the spoiler still read them by their module-level names. So only one
+    seed can be generated per process at a time.
+    """
+
+    def __init__(self, settings):
+        """Reset the world structures, search journal and logic variables for the given settings."""
+        self.settings = settings
+        for shared, pristine in zip(SharedState, copy.deepcopy(PristineState)):
+            if isinstance(shared, dict):
+                shared.clear()
+                shared.update(pristine)
+            else:
+                shared[:] = pristine
+        (
+            self.Regions,
+            self.CollectibleRegions,
+            self.LocationList,
+            self.ShufflableExits,
+            self.KasplatLocationList,
+            self.BarrelMetaData,
+            self.BananaportVanilla,
+            self.DirtPatchLocations,
+            self.Hints,
+        ) = SharedState
+        InvalidateRegionGraph()
+        self.SearchState = SearchStateHolder(len(Logic.SearchState.regionEpochs))
+        Logic.SearchState = self.SearchState
+        self.LogicVariables = LogicVarHolder(settings)
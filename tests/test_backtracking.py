@@ -0,0 +1,77 @@
+"""Tests for backtracking over the steps of a fill."""
+import json
+
+import pytest
+
+import randomizer.Fill as Fill
+from randomizer.Backtracking import BacktrackingFill
+from randomizer.Enums.Items import Items
+from randomizer.Lists import Exceptions
+from randomizer.Lists.Location import LocationList
+from randomizer.Settings import Settings
+from randomizer.World import WorldReset
+
+
+@pytest.fixture
+def settings():
+    data = json.load(open("static/presets/default.json"))
+    data["seed"] = 0
+    settings = Settings(data)
+    world = WorldReset(settings)
+    Fill.LogicVariables = world.LogicVariables
+    return settings
+
+
+def make_fill(settings, maxRetries, failures, calls):
+    # Each step places a golden banana in a location of its own for every try, failing its first failures[name] tries
+    empty = iter([x for x in LocationList if LocationList[x].item is None])
+    tries = {}
+
+    def step(name):
+        def run():
+            calls.append(name)
+            tries[name] = tries.get(name, 0) + 1
+            LocationList[next(empty)].item = Items.GoldenBanana
+            if tries[name] <= failures.get(name, 0):
+                raise Exceptions.ItemPlacementException(name + " failed")
+            return tries[name]
+
+        return run
+
+    fill = BacktrackingFill(settings, maxRetries)
+    fill.AddStep("A", step("A"))
+    fill.AddStep("B", step("B"))
+    fill.AddStep("C", step("C"), retry=False)
+    return fill
+
+
+def placed():
+    return len([x for x in LocationList.values() if x.item == Items.GoldenBanana])
+
+
+def test_retries_only_the_failed_step(settings):
+    calls = []
+    fill = make_fill(settings, 4, {"B": 1}, calls)
+    fill.Run()
+    # Restarting the whole fill would have run A again, and the failed try of B is undone
+    assert calls == ["A", "B", "B", "C"]
+    assert fill.results == {"A": 1, "B": 2, "C": 1}
+    assert placed() == 3
+
+
+def test_check_failure_backtracks_to_the_step_before(settings):
+    calls = []
+    fill = make_fill(settings, 4, {"C": 1}, calls)
+    fill.Run()
+    assert calls == ["A", "B", "C", "B", "C"]
+    assert placed() == 3
+
+
+def test_backs_up_further_then_restarts(settings):
+    calls = []
+    fill = make_fill(settings, 3, {"B": 10}, calls)
+    with pytest.raises(Exceptions.ItemPlacementException):
+        fill.Run()
+    # B again, then A and B, then everything cleared and started over until out of retries
+    assert calls == ["A", "B", "B", "A", "B", "A", "B"]
+    assert placed() == 2
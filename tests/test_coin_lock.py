@@ -0,0 +1,82 @@
+"""Tests for the check that no order of buying moves leaves a seed coin locked."""
+import json
+
+import pytest
+
+import randomizer.Fill as Fill
+from randomizer.CoinLockVerifier import CoinLockVerifier
+from randomizer.Enums.Items import Items
+from randomizer.Enums.Kongs import GetKongs
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Enums.Types import Types
+from randomizer.Lists.Item import ItemList
+from randomizer.Lists.Location import LocationList
+from randomizer.Prices import GetMaxForKong
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+def search_from_scratch(settings, purchases):
+    Fill.Reset()
+    reachable = Fill.GetAccessibleLocations(settings, [], SearchMode.GetReachableWithControlledPurchases, purchases)
+    return reachable, Fill.LogicVariables.Coins.copy(), Fill.LogicVariables.GetKongs()
+
+
+def worst_purchase_order(settings):
+    # The check made before, searching the whole world again for every shop it considers buying from
+    maxCoins = [GetMaxForKong(settings, kong) for kong in GetKongs()]
+    purchases = []
+    while True:
+        reachable, coinsBefore = search_from_scratch(settings, purchases)[:2]
+        coinsSpent = Fill.GetMaxCoinsSpent(settings, [LocationList[x].item for x in purchases])
+        if all(coinsBefore[kong] >= maxCoins[kong] - coinsSpent[kong] for kong in GetKongs()):
+            return True, purchases
+        if any(LocationList[x].item == Items.BananaHoard for x in reachable):
+            return True, purchases
+        shops = [
+            x
+            for x in reachable
+            if LocationList[x].type == Types.Shop and LocationList[x].item is not None and LocationList[x].item != Items.NoItem and x not in purchases and Fill.LogicVariables.CanBuy(x)
+        ]
+        if len(shops) == 0:
+            return False, purchases
+        differentials = {}
+        unlocks = {}
+        worst = None
+        for shop in shops:
+            reachableAfter, coinsAfter, kongsAfter = search_from_scratch(settings, purchases + [shop])
+            differentials[shop] = [coinsAfter[kong] - coinsBefore[kong] if kong in kongsAfter else 0 for kong in GetKongs()]
+            unlocks[shop] = [LocationList[x].item for x in reachableAfter if x not in reachable and LocationList[x].item is not None]
+            if worst is None:
+                worst = shop
+                continue
+            if all(x >= 0 for x in differentials[shop]):
+                continue
+            for itemType in (Types.Kong, Types.Key):
+                if len([x for x in unlocks[shop] if ItemList[x].type == itemType]) > len([x for x in unlocks[worst] if ItemList[x].type == itemType]):
+                    break
+            else:
+                if sum(differentials[shop]) < sum(differentials[worst]):
+                    worst = shop
+        purchases.append(worst)
+
+
+@pytest.mark.parametrize("preset,seed", [("default.json", 11), ("season1.json", 13)])
+def test_matches_searching_from_scratch(preset, seed, monkeypatch):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/" + preset)))
+    data["seed"] = seed
+    settings = Settings(data)
+    verdicts = []
+
+    def verify(settings):
+        verifier = CoinLockVerifier(settings)
+        valid = verifier.Verify()
+        assert (valid, verifier.purchases) == worst_purchase_order(settings)
+        Fill.Reset()
+        verdicts.append(valid)
+        return valid
+
+    monkeypatch.setattr(Fill, "VerifyWorldWithWorstCoinUsage", verify)
+    Fill.Generate_Spoiler(Spoiler(settings))
+    assert len(verdicts) > 0
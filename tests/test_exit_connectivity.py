@@ -0,0 +1,41 @@
+"""Tests for the connectivity checks deciding placements while shuffling exits."""
+import json
+
+import pytest
+
+import randomizer.Fill as Fill
+import randomizer.ShuffleExits as ShuffleExits
+from randomizer.ExitConnectivity import ExitConnectivity
+from randomizer.ShuffleKasplats import InitKasplatMap
+from randomizer.Settings import Settings
+from randomizer.World import WorldReset
+
+
+@pytest.fixture(params=["coupled_lzr_balanced.json", "decoupled_lzr_balanced.json"])
+def settings(request):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/" + request.param)))
+    data["seed"] = 1
+    return Settings(data)
+
+
+def test_decisions_match_verify_world(settings, monkeypatch):
+    world = WorldReset(settings)
+    Fill.LogicVariables = world.LogicVariables
+    InitKasplatMap(Fill.LogicVariables)
+    decisions = {True: 0, False: 0, None: 0}
+
+    def verify(self, detachedRegions):
+        # Every placement is also checked with the full search the shuffle made before
+        decided = self.Decide(detachedRegions)
+        valid = Fill.VerifyWorld(self.settings)
+        decisions[decided] += 1
+        assert decided is None or decided == valid
+        if valid:
+            self.verified = True
+        return valid
+
+    monkeypatch.setattr(ExitConnectivity, "Verify", verify)
+    ShuffleExits.ExitShuffle(settings, world)
+    assert decisions[True] > 0 and decisions[False] > 0
+    assert Fill.VerifyWorld(settings)
@@ -0,0 +1,55 @@
+"""Tests for seed generation giving the same results when work is spread over forked processes."""
+import json
+
+import randomizer.Fill as Fill
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+def load_settings(preset, seed):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/" + preset)))
+    data["seed"] = seed
+    return Settings(data)
+
+
+def test_woth_matches_in_process(monkeypatch):
+    pareWoth = Fill.PareWoth
+    results = []
+
+    def checked(settings, PlaythroughLocations):
+        monkeypatch.setattr(Fill, "WothJobs", 1)
+        expected = pareWoth(settings, PlaythroughLocations)
+        monkeypatch.setattr(Fill, "WothJobs", 2)
+        assert Fill.CanForkWothWorkers(len(expected))
+        # Each check puts the item back, so the forked run starts from the same world
+        assert pareWoth(settings, PlaythroughLocations) == expected
+        results.append(expected)
+        return expected
+
+    monkeypatch.setattr(Fill, "PareWoth", checked)
+    Fill.Generate_Spoiler(Spoiler(load_settings("season1.json", 22)))
+    assert len(results) == 1 and len(results[0]) > 1
+
+
+def generate(preset, seed):
+    spoiler = Spoiler(load_settings(preset, seed))
+    Fill.Generate_Spoiler(spoiler)
+    return spoiler.toJson()
+
+
+def test_fill_attempts_match_in_process(monkeypatch):
+    attempts = []
+    runFillAttempt = Fill.RunFillAttempt
+
+    def counted(spoiler, world, start, startRandom, attempt):
+        attempts.append(attempt)
+        return runFillAttempt(spoiler, world, start, startRandom, attempt)
+
+    monkeypatch.setattr(Fill, "RunFillAttempt", counted)
+    expected = generate("season1.json", 22)
+    assert len(attempts) > 0
+    monkeypatch.setattr(Fill, "FillJobs", 2)
+    assert Fill.CanForkFillWorkers()
+    # The winning attempt is the earliest one to succeed, whichever process ran it
+    assert generate("season1.json", 22) == expected
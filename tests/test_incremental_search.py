@@ -0,0 +1,57 @@
+"""Tests for the incremental search finding the same locations as the full search."""
+import json
+
+import pytest
+
+import randomizer.Fill as Fill
+import randomizer.ItemPool as ItemPool
+import randomizer.ShuffleExits as ShuffleExits
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Settings import Settings
+from randomizer.ShuffleKasplats import InitKasplatMap
+from randomizer.Spoiler import Spoiler
+from randomizer.World import WorldReset
+
+
+def load_settings(preset, seed):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/" + preset)))
+    data["seed"] = seed
+    return Settings(data)
+
+
+def unreachable(settings, ownedItems, searchType):
+    Fill.Reset()
+    result = Fill.GetAccessibleLocations(settings, ownedItems.copy(), searchType)
+    Fill.Reset()
+    return sorted(result)
+
+
+@pytest.mark.parametrize("preset", ["coupled_lzr_balanced.json", "decoupled_lzr_balanced.json"])
+def test_matches_full_search_while_shuffling_exits(preset, monkeypatch):
+    settings = load_settings(preset, 1)
+    world = WorldReset(settings)
+    Fill.LogicVariables = world.LogicVariables
+    InitKasplatMap(Fill.LogicVariables)
+    checks = []
+
+    def verify(settings):
+        # Every world the shuffle checks is searched both ways
+        ItemPool.PlaceConstants(settings)
+        expected = unreachable(settings, ItemPool.AllItems(settings), SearchMode.GetUnreachable)
+        assert unreachable(settings, ItemPool.AllItems(settings), SearchMode.GetUnreachableIncremental) == expected
+        checks.append(len(expected) == 0)
+        return len(expected) == 0
+
+    monkeypatch.setattr(Fill, "VerifyWorld", verify)
+    ShuffleExits.ExitShuffle(settings, world)
+    assert True in checks and False in checks
+
+
+def test_matches_full_search_collecting_items():
+    settings = load_settings("season1.json", 22)
+    spoiler = Spoiler(settings)
+    Fill.Generate_Spoiler(spoiler)
+    # Owning nothing, items are only picked up as their locations are found
+    for ownedItems in ([], ItemPool.AllItems(settings)):
+        assert unreachable(settings, ownedItems, SearchMode.GetUnreachableIncremental) == unreachable(settings, ownedItems, SearchMode.GetUnreachable)
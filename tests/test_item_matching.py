@@ -0,0 +1,64 @@
+"""Tests for the matching AssumedFill checks its placements with."""
+import itertools
+import random
+
+from randomizer.ItemMatching import ItemMatching, LocationMask
+
+
+def brute_force_feasible(masks, slots, available):
+    locations = [x for x in range(available.bit_length()) if available >> x & 1]
+    if len(locations) < len(slots):
+        return False
+    for assignment in itertools.permutations(locations, len(slots)):
+        if all(masks[slot] >> location & 1 for slot, location in zip(slots, assignment)):
+            return True
+    return False
+
+
+def greedy_feasible(masks, slots, available):
+    # The check AssumedFill made before, claiming the first location of each item in turn
+    for slot in slots:
+        candidates = masks[slot] & available
+        if candidates == 0:
+            return False
+        available &= ~(candidates & -candidates)
+    return True
+
+
+def test_matches_brute_force():
+    rng = random.Random(42)
+    for case in range(200):
+        locationCount = rng.randint(3, 7)
+        masks = [LocationMask(rng.sample(range(locationCount), rng.randint(1, locationCount))) for i in range(rng.randint(1, 5))]
+        matching = ItemMatching(masks)
+        remaining = list(range(len(masks)))
+        available = (1 << locationCount) - 1
+        # Like AssumedFill, items are placed one at a time while locations are filled or become unreachable
+        while len(remaining) > 0:
+            feasible = matching.IsFeasible(available)
+            assert feasible == brute_force_feasible(masks, remaining, available), case
+            # Claiming locations greedily never finds room the matching can't
+            assert feasible or not greedy_feasible(masks, remaining, available), case
+            matching.Remove(remaining.pop(0))
+            available &= ~(1 << rng.randrange(locationCount))
+
+
+def test_accepts_what_a_greedy_claim_rejects():
+    # Giving the first item its first location would leave the second item with nowhere to go
+    masks = [LocationMask([0, 1]), LocationMask([0])]
+    matching = ItemMatching(masks)
+    assert matching.IsFeasible(LocationMask([0, 1]))
+    assert not matching.IsFeasible(LocationMask([1]))
+    matching.Remove(1)
+    assert matching.IsFeasible(LocationMask([1]))
+
+
+def test_rejects_what_only_filled_locations_could_hold():
+    # The check AssumedFill made before claimed from every reachable location, including ones already holding an item
+    masks = [LocationMask([0, 1]), LocationMask([1])]
+    matching = ItemMatching(masks)
+    filled = LocationMask([1])
+    reachable = LocationMask([0, 1])
+    assert greedy_feasible(masks, [1], reachable)
+    matching.Remove(0)
+    assert not matching.IsFeasible(reachable & ~filled)
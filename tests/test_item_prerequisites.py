@@ -0,0 +1,76 @@
+"""Tests for finding the moves an item placed during the fill needs."""
+import json
+import random
+
+import randomizer.Fill as Fill
+import randomizer.ItemPool as ItemPool
+from randomizer.Enums.Kongs import GetKongs
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+def cull_one_at_a_time(canReach, moves, lastRequiredMove):
+    # The cull made before, removing the first move and adding it back to the end if it was needed
+    requiredMoves = moves + [lastRequiredMove]
+    while requiredMoves[0] != lastRequiredMove:
+        move = requiredMoves.pop(0)
+        if not canReach(requiredMoves):
+            requiredMoves.append(move)
+    return requiredMoves
+
+
+def prerequisites_one_at_a_time(settings, targetItemId, ownedKongs):
+    # GetItemPrerequisites as it was before, adding moves one at a time until the item is reached
+    if Fill.CanReachItem(settings, [], targetItemId):
+        return []
+    moveList = [move for move in ItemPool.OwnedKongMoves(ownedKongs or GetKongs()) if move != targetItemId]
+    random.shuffle(moveList)
+    requiredMoves = []
+    for move in moveList:
+        requiredMoves.append(move)
+        Fill.Reset()
+        if Fill.GetAccessibleLocations(settings, requiredMoves.copy(), SearchMode.CheckSpecificItemReachable, targetItemId=targetItemId):
+            break
+    return cull_one_at_a_time(lambda moves: Fill.CanReachItem(settings, moves, targetItemId), requiredMoves[:-1], requiredMoves[-1])
+
+
+def test_cull_matches_one_at_a_time(monkeypatch):
+    rng = random.Random(42)
+    for case in range(200):
+        moveCount = rng.randint(1, 12)
+        # The target is reachable with any one of a few sets of moves, always including the last move
+        needs = [set(rng.sample(range(moveCount - 1), rng.randint(0, min(3, moveCount - 1)))) for i in range(rng.randint(1, 3))]
+
+        def canReach(moves):
+            return moveCount - 1 in moves and any(need <= set(moves) for need in needs)
+
+        monkeypatch.setattr(Fill, "CanReachItem", lambda settings, moves, targetItemId: canReach(moves))
+        requiredMoves = []
+        Fill.CullItemPrerequisites(None, None, requiredMoves, list(range(moveCount - 1)), [moveCount - 1])
+        assert [moveCount - 1] + requiredMoves == cull_one_at_a_time(canReach, list(range(moveCount - 1)), moveCount - 1), case
+
+
+def test_matches_one_at_a_time_during_fill(monkeypatch):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/season1.json")))
+    data["seed"] = 22
+    settings = Settings(data)
+    found = []
+    getItemPrerequisites = Fill.GetItemPrerequisites
+
+    def checked(spoiler, targetItemId, ownedKongs=[]):
+        state = random.getstate()
+        expected = prerequisites_one_at_a_time(spoiler.settings, targetItemId, ownedKongs)
+        expectedState = random.getstate()
+        random.setstate(state)
+        requiredMoves = getItemPrerequisites(spoiler, targetItemId, ownedKongs)
+        # Both shuffle the moves the same way, so the fill carries on as it did before
+        assert requiredMoves == expected
+        assert random.getstate() == expectedState
+        found.append(requiredMoves)
+        return requiredMoves
+
+    monkeypatch.setattr(Fill, "GetItemPrerequisites", checked)
+    Fill.Generate_Spoiler(Spoiler(settings))
+    assert any(len(x) > 1 for x in found)
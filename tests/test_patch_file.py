@@ -0,0 +1,85 @@
+"""Tests for patch files holding everything the patcher reads from a generated seed."""
+import base64
+import codecs
+import glob
+import inspect
+import json
+import pickle
+import re
+
+import pytest
+
+from randomizer.Fill import Generate_Spoiler
+from randomizer.Lists import Exceptions
+from randomizer.PatchFile import DecodePatchFile, EncodePatchFile, PatchHeader, PatchMagic, PatchSections, PatchSettings, PatchVersion
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+@pytest.fixture(scope="module")
+def spoiler():
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/season1.json")))
+    data["seed"] = 22
+    spoiler = Spoiler(Settings(data))
+    Generate_Spoiler(spoiler)
+    return spoiler
+
+
+def settings_read(source):
+    # Settings read as settings.X, with those read by methods called on the settings
+    names = set()
+    for name in re.findall(r"\bsettings\.([A-Za-z_]\w*)", source):
+        if name.startswith("__"):
+            name = "_Settings" + name
+        member = getattr(Settings, name, None)
+        if callable(member):
+            names.update(settings_read(inspect.getsource(member).replace("self.", "settings.")))
+        else:
+            names.add(name)
+    return names
+
+
+def test_patch_settings_cover_what_the_patcher_reads():
+    # The patcher needs the browser to run, so what it reads is found from its source instead
+    source = "".join(open(path).read() for path in glob.glob("randomizer/Patching/*.py"))
+    read = settings_read(source)
+    assert "seed" in read and len(read) > 50
+    assert read - set(PatchSettings) == set()
+
+
+def test_round_trip(spoiler):
+    loaded = DecodePatchFile(EncodePatchFile(spoiler))
+    assert loaded.move_data == spoiler.move_data
+    assert loaded.location_data == spoiler.location_data
+    assert loaded.toJson() == spoiler.toJson()
+    assert all(getattr(loaded.settings, x) == getattr(spoiler.settings, x) for x in PatchSettings if x in vars(spoiler.settings))
+
+
+def test_sections_are_decoded_as_they_are_read(spoiler):
+    loaded = DecodePatchFile(EncodePatchFile(spoiler))
+    assert set(loaded.patch_sections) == set(PatchSections)
+    assert loaded.music_bgm_data == spoiler.music_bgm_data
+    assert set(loaded.patch_sections) == set(PatchSections) - {"music"}
+    assert "music_fanfare_data" in vars(loaded) and "location_data" not in vars(loaded)
+    # Sections never read are written back without being decoded
+    assert EncodePatchFile(loaded) == EncodePatchFile(spoiler)
+    assert set(loaded.patch_sections) == set(PatchSections) - {"music"}
+    with pytest.raises(AttributeError):
+        loaded.not_in_a_section
+
+
+def test_other_versions_are_rejected(spoiler):
+    data = base64.b64decode(EncodePatchFile(spoiler))
+    magic, version, count = PatchHeader.unpack_from(data)
+    assert (magic, version) == (PatchMagic, PatchVersion)
+    changed = PatchHeader.pack(magic, PatchVersion + 1, count) + data[PatchHeader.size :]
+    with pytest.raises(Exceptions.PatchFileVersionException):
+        DecodePatchFile(base64.b64encode(changed).decode())
+
+
+def test_pickled_spoilers_are_still_read(spoiler):
+    # Patch files from before the current format are a pickled spoiler
+    legacy = DecodePatchFile(codecs.encode(pickle.dumps(spoiler), "base64").decode())
+    assert type(legacy) is Spoiler
+    assert legacy.toJson() == spoiler.toJson()
@@ -0,0 +1,68 @@
+"""Tests for the placement domain giving each item the same locations the fill looked up before."""
+import random
+
+import pytest
+
+import randomizer.ItemPool as ItemPool
+from randomizer.Enums.Items import Items
+from randomizer.Lists.Location import LocationList
+from randomizer.PlacementDomain import KongMoveDomain, PlacementDomain
+
+
+def item_valid_locations(validLocations, item):
+    # GetItemValidLocations as it was before, scanning a dictionary's keys for the item
+    itemValidLocations = validLocations
+    if isinstance(validLocations, dict):
+        for itemKey in validLocations.keys():
+            if item == itemKey:
+                itemValidLocations = validLocations[itemKey]
+                break
+            itemValidLocations = list(LocationList)
+    return itemValidLocations
+
+
+def valid_locations_for_move(settings, move):
+    # GetValidLocationsForMove as it was before, adding the shops of every kong the move could be bought from
+    validLocations = []
+    kongs = [
+        (ItemPool.DonkeyMoves, ItemPool.DonkeyMoveLocations),
+        (ItemPool.DiddyMoves, ItemPool.DiddyMoveLocations),
+        (ItemPool.TinyMoves, ItemPool.TinyMoveLocations),
+        (ItemPool.ChunkyMoves, ItemPool.ChunkyMoveLocations),
+        (ItemPool.LankyMoves, ItemPool.LankyMoveLocations),
+    ]
+    for moves, locations in kongs:
+        if settings.move_rando == "cross_purchase" or move in moves:
+            validLocations.extend(locations)
+    return validLocations
+
+
+class MoveSettings:
+    def __init__(self, move_rando):
+        self.move_rando = move_rando
+
+
+def assert_domain_matches(domain, expected):
+    for item in Items:
+        locations = set(expected(item))
+        assert domain.Locations(item) == locations, item
+        mask = domain.Mask(item)
+        assert {x for x in LocationList if mask >> x & 1} == locations, item
+        assert all(domain.Allows(item, x) == (x in locations) for x in LocationList), item
+
+
+def test_matches_location_list():
+    validLocations = random.Random(0).sample(list(LocationList), 100)
+    assert_domain_matches(PlacementDomain(validLocations), lambda item: item_valid_locations(validLocations, item))
+
+
+def test_matches_location_dictionary():
+    rng = random.Random(0)
+    validLocations = {item: rng.sample(list(LocationList), rng.randint(0, 20)) for item in rng.sample(list(Items), 30)}
+    assert_domain_matches(PlacementDomain(validLocations), lambda item: item_valid_locations(validLocations, item))
+
+
+@pytest.mark.parametrize("move_rando", ["on", "cross_purchase"])
+def test_kong_moves_match_their_shops(move_rando):
+    settings = MoveSettings(move_rando)
+    assert_domain_matches(KongMoveDomain(settings), lambda item: valid_locations_for_move(settings, item))
@@ -0,0 +1,77 @@
+"""Tests for the kong and time of day access bits regions keep during a search."""
+import randomizer.Logic as Logic
+from randomizer.Enums.Kongs import Kongs
+from randomizer.Enums.Levels import Levels
+from randomizer.Enums.Regions import Regions
+from randomizer.Enums.Time import Time
+from randomizer.LogicClasses import DayAccess, NightAccess, Region
+
+
+class Owned:
+    # The kongs a search owns, as UpdateAccess reads them from the logic variables
+    def __init__(self, kongs):
+        self.kongs = kongs
+
+    def GetKongAccess(self):
+        return sum(1 << kong for kong in self.kongs)
+
+
+def region(tagbarrel=False):
+    return Region("Test Region", Levels.DKIsles, tagbarrel, None, [], [], [])
+
+
+def test_times_of_day_are_set_and_cleared_independently():
+    test = region()
+    assert test.access == 0 and not test.dayAccess and not test.nightAccess
+    test.dayAccess = True
+    test.nightAccess = True
+    assert test.access == DayAccess | NightAccess
+    test.dayAccess = False
+    assert not test.dayAccess and test.nightAccess
+    test.nightAccess = True
+    assert test.access == NightAccess
+    test.nightAccess = False
+    assert test.access == 0
+
+
+def test_kong_access_leaves_the_time_of_day_alone():
+    test = region()
+    test.nightAccess = True
+    for kong in (Kongs.diddy, Kongs.chunky):
+        test.UpdateAccess(kong, None)
+    assert test.access == 1 << Kongs.diddy | 1 << Kongs.chunky | NightAccess
+    assert test.HasAccess(Kongs.diddy) and test.HasAccess(Kongs.any) and not test.HasAccess(Kongs.lanky)
+    assert test.nightAccess and not test.dayAccess
+    # Reaching another region only passes on kongs
+    other = region()
+    other.UpdateAccessFromRegion(test)
+    assert other.access == 1 << Kongs.diddy | 1 << Kongs.chunky
+    assert not other.dayAccess and not other.nightAccess
+
+
+def test_tag_barrels_give_every_owned_kong_access():
+    test = region(tagbarrel=True)
+    test.dayAccess = True
+    test.UpdateAccess(Kongs.donkey, Owned([Kongs.donkey, Kongs.tiny]))
+    assert test.access == 1 << Kongs.donkey | 1 << Kongs.tiny | DayAccess
+    test.UpdateAccess(Kongs.lanky, Owned([Kongs.lanky]))
+    assert test.access == 1 << Kongs.lanky | DayAccess
+
+
+def test_access_is_read_back_by_the_logic(monkeypatch):
+    test = region()
+    test.UpdateAccess(Kongs.tiny, None)
+    test.nightAccess = True
+    monkeypatch.setitem(Logic.Regions, Regions.IslesMain, test)
+    assert Logic.LogicVarHolder.TimeAccess(Regions.IslesMain, Time.Night)
+    assert not Logic.LogicVarHolder.TimeAccess(Regions.IslesMain, Time.Day)
+    assert Logic.LogicVarHolder.TimeAccess(Regions.IslesMain, Time.Both)
+    assert Logic.LogicVarHolder.HasAccess(Regions.IslesMain, Kongs.tiny)
+    logic = Logic.LogicVarHolder()
+    logic.UpdateCurrentRegionAccess(test)
+    assert (logic.donkeyAccess, logic.diddyAccess, logic.lankyAccess, logic.tinyAccess, logic.chunkyAccess) == (False, False, False, True, False)
+    # Saved access restores both kinds of bits
+    saved = test.GetAccess()
+    test.ResetAccess()
+    test.SetAccess(saved)
+    assert test.HasAccess(Kongs.tiny) and test.nightAccess
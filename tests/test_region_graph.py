@@ -0,0 +1,53 @@
+"""Tests for the region graph following the exits shuffled and assumed so far."""
+import json
+import random
+
+import randomizer.Fill as Fill
+import randomizer.ItemPool as ItemPool
+import randomizer.RegionGraph as RegionGraph
+import randomizer.ShuffleExits as ShuffleExits
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Settings import Settings
+from randomizer.ShuffleKasplats import InitKasplatMap
+from randomizer.World import WorldReset
+
+
+def unreachable(settings):
+    Fill.Reset()
+    result = Fill.GetAccessibleLocations(settings, ItemPool.AllItems(settings), SearchMode.GetUnreachable)
+    Fill.Reset()
+    return result
+
+
+def test_root_exits_match_a_rebuilt_graph():
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/coupled_lzr_balanced.json")))
+    data["seed"] = 1
+    settings = Settings(data)
+    world = WorldReset(settings)
+    Fill.LogicVariables = world.LogicVariables
+    InitKasplatMap(Fill.LogicVariables)
+    ItemPool.PlaceConstants(settings)
+    # Detach every exit and assume it from the root, as the exit shuffle does before placing any
+    ShuffleExits.AssumeExits(settings, world, [], [], list(world.ShufflableExits))
+    graph = RegionGraph.GetRegionGraph(settings)
+    assumed = [x for x in world.Regions[ShuffleExits.root].exits if x.assumed]
+    rng = random.Random(0)
+    results = set()
+    for i in range(12):
+        # Detach some of the exits assumed from the root and attach the rest again
+        for exit in assumed:
+            if exit in world.Regions[ShuffleExits.root].exits:
+                ShuffleExits.RemoveRootExit(world, exit)
+        for exit in rng.sample(assumed, rng.randint(0, len(assumed))):
+            ShuffleExits.AddRootExit(world, exit)
+        result = unreachable(settings)
+        # The same graph toggles the root's exits in its override table, instead of being built again
+        assert RegionGraph.Graph is graph
+        RegionGraph.InvalidateRegionGraph()
+        assert unreachable(settings) == result
+        rebuilt = RegionGraph.Graph
+        assert all(sorted(rebuilt.Destinations(x)) == sorted(graph.Destinations(x)) for x in range(len(graph.regions)))
+        RegionGraph.Graph = graph
+        results.add(len(result))
+    assert len(results) > 1
@@ -0,0 +1,180 @@
+"""Tests for the rule table caching logic rule results between changes to what they read."""
+import json
+import random
+
+import randomizer.Fill as Fill
+import randomizer.ItemPool as ItemPool
+from randomizer.Enums.Events import Events
+from randomizer.Logic import CollectibleRegions, LogicVarHolder, Regions
+from randomizer.RuleTable import Rule, RuleTable
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+class Logic:
+    def __init__(self):
+        self.kong = 0
+        self.Events = []
+        self.Coins = [0, 0]
+        self.Update([])
+
+    def Update(self, owned):
+        self.climbing = "climbing" in owned
+        self.vines = "vines" in owned
+        self.donkeyAccess = False
+
+    def CanClimb(self):
+        self.calls += 1
+        return self.climbing
+
+    def CanSwing(self):
+        self.calls += 1
+        return self.vines and self.donkeyAccess
+
+
+def start(table, owned=[]):
+    logic = Logic()
+    logic.Update(owned)
+    logic.calls = 0
+    table.StartSearch(logic)
+    return logic
+
+
+def test_rules_without_calls_stay_functions():
+    table = RuleTable(Logic)
+    rule = table.Compile(lambda l: l.climbing)
+    assert not isinstance(rule, Rule)
+    assert isinstance(table.Compile(lambda l: l.CanClimb()), Rule)
+
+
+def test_results_are_cached_per_kong_until_a_variable_read_changes():
+    table = RuleTable(Logic)
+    rule = table.Compile(lambda l: l.CanClimb() and l.Coins[l.kong] >= 5)
+    logic = start(table)
+    assert not rule(logic) and not rule(logic)
+    assert logic.calls == 1
+    logic.kong = 1
+    rule(logic)
+    assert logic.calls == 2
+    # Variables set by Update are compared on every update
+    logic.Update(["climbing"])
+    table.Refresh(logic)
+    assert not rule(logic)
+    assert logic.calls == 3
+    logic.Coins[1] = 5
+    assert not rule(logic)
+    # Anything else has to be reported when it changes
+    table.Changed("Coins")
+    assert rule(logic)
+    assert logic.calls == 4
+    assert {"climbing", "Coins", "kong"} <= rule.dependencies
+
+
+def test_results_are_not_kept_between_searches_or_outside_them():
+    table = RuleTable(Logic)
+    rule = table.Compile(lambda l: l.CanClimb())
+    logic = start(table)
+    assert not rule(logic)
+    logic.climbing = True
+    assert not rule(logic)
+    assert rule(start(table, ["climbing"]))
+    other = Logic()
+    other.calls = 0
+    rule(other)
+    rule(other)
+    assert other.calls == 2
+
+
+def test_only_the_events_checked_invalidate_a_rule():
+    table = RuleTable(Logic)
+    rule = table.Compile(lambda l: Events.JapesFreeKongOpenGates in l.Events and l.CanClimb())
+    logic = start(table, ["climbing"])
+    assert not rule(logic)
+    logic.Events.append(Events.Night)
+    table.EventAdded(Events.Night)
+    assert not rule(logic)
+    assert logic.calls == 0
+    logic.Events.append(Events.JapesFreeKongOpenGates)
+    table.EventAdded(Events.JapesFreeKongOpenGates)
+    assert rule(logic)
+    assert ("Events", "JapesFreeKongOpenGates") in rule.dependencies and "Events" not in rule.dependencies
+
+
+def test_rules_reading_the_current_region_are_not_cached():
+    table = RuleTable(Logic)
+    rule = table.Compile(lambda l: l.CanSwing())
+    logic = start(table, ["vines"])
+    assert not rule(logic)
+    logic.donkeyAccess = True
+    assert rule(logic)
+    assert not rule.cached
+
+
+def load_settings(preset, seed):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/" + preset)))
+    data["seed"] = seed
+    return Settings(data)
+
+
+def logic_rules():
+    # Every rule from the logic files, as written before being compiled
+    rules = []
+    for region in Regions.values():
+        rules.extend(x.logic for x in region.locations + region.events + region.exits)
+        if region.deathwarp is not None:
+            rules.append(region.deathwarp.logic)
+    for collectibles in CollectibleRegions.values():
+        rules.extend(x.logic for x in collectibles)
+    return [x.function if isinstance(x, Rule) else x for x in rules]
+
+
+def test_logic_rules_only_compile_when_they_call_something():
+    # MayCall goes by names alone, so it has to agree with the calls found in the bytecode of this Python version
+    table = RuleTable(LogicVarHolder)
+    for function in logic_rules():
+        names, callees = table.ReadCode(function.__code__, function.__globals__)
+        assert table.MayCall(function.__code__, function.__globals__) == (len(callees) > 0), function
+
+
+def test_logic_rules_check_only_the_events_found():
+    settings = load_settings("season1.json", 22)
+    logic = LogicVarHolder(settings)
+    logic.Update(ItemPool.AllItems(settings))
+    table = RuleTable(LogicVarHolder)
+    rng = random.Random(0)
+    checking = 0
+    for function in logic_rules():
+        # Every rule in the logic files checks for events the way the bytecode is read for
+        events = table.GetCheckedEvents(function.__code__)
+        assert events is not None, function
+        names, callees = table.ReadCode(function.__code__, function.__globals__)
+        if any("Events" in table.GetNames(callee, set()) for callee in callees):
+            continue
+        checking += len(events) > 0
+        checked = [Events[x] for x in events]
+        # Events the rule doesn't check for never change its result
+        for i in range(5):
+            owned = rng.sample(list(Events), rng.randint(0, len(Events)))
+            for kong in range(5):
+                logic.kong = kong
+                logic.Events = owned
+                expected = bool(function(logic))
+                logic.Events = [x for x in owned if x in checked]
+                assert bool(function(logic)) == expected, function
+    assert checking > 100
+
+
+def test_cached_results_match_the_logic_rules(monkeypatch):
+    call = Rule.__call__
+    checked = []
+
+    def evaluate(rule, logic):
+        result = call(rule, logic)
+        assert bool(result) == bool(rule.function(logic))
+        checked.append(rule)
+        return result
+
+    monkeypatch.setattr(Rule, "__call__", evaluate)
+    Fill.Generate_Spoiler(Spoiler(load_settings("season1.json", 22)))
+    assert len(checked) > 0
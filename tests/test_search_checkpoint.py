@@ -0,0 +1,60 @@
+"""Tests for searches resumed from a checkpoint ending the same way as searches started over."""
+import json
+import random
+
+import randomizer.Fill as Fill
+from randomizer.Enums.SearchMode import SearchMode
+from randomizer.Enums.Types import Types
+from randomizer.Lists.Location import LocationList
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+def search(settings, resumeFrom=None, checkpoints=None, searchType=SearchMode.GetReachable):
+    Fill.Reset()
+    result = Fill.GetAccessibleLocations(settings, [], searchType, checkpoints=checkpoints, resumeFrom=resumeFrom)
+    logic = Fill.LogicVariables
+    return result, logic.Events.copy(), logic.Coins.copy(), logic.GoldenBananas, logic.GetKongs()
+
+
+def check_resumed_searches(settings):
+    checkpoints = []
+    fresh = search(settings, checkpoints=checkpoints)
+    assert len(checkpoints) > 5
+    for checkpoint in checkpoints:
+        assert search(settings, resumeFrom=checkpoint) == fresh
+    # Without one of the items found, the search runs the same until the iteration which found its location
+    rng = random.Random(0)
+    for locationId in rng.sample([x for x in fresh[0] if LocationList[x].item is not None], 30):
+        location = LocationList[locationId]
+        item = location.item
+        location.item = None
+        resumeFrom = checkpoints[Fill.GetCheckpointIteration(checkpoints, locationId)]
+        expected = search(settings)
+        resumed = search(settings, resumeFrom=resumeFrom)
+        # An emptied shop costs nothing, so it can be bought sooner, which only changes when that location is found
+        assert sorted(resumed[0]) == sorted(expected[0]) and resumed[1:] == expected[1:]
+        if location.type != Types.Shop:
+            assert resumed == expected
+        # ParePlaythrough only needs to know whether the game is still beatable
+        assert search(settings, resumeFrom=resumeFrom, searchType=SearchMode.CheckBeatable)[0] == search(settings, searchType=SearchMode.CheckBeatable)[0]
+        location.PlaceItem(item)
+
+
+def test_resume_matches_fresh_search(monkeypatch):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/season1.json")))
+    data["seed"] = 22
+    settings = Settings(data)
+    parePlaythrough = Fill.ParePlaythrough
+    checked = []
+
+    def pare(settings, PlaythroughLocations):
+        # The world is filled and beatable when the playthrough is pared
+        check_resumed_searches(settings)
+        checked.append(settings)
+        parePlaythrough(settings, PlaythroughLocations)
+
+    monkeypatch.setattr(Fill, "ParePlaythrough", pare)
+    Fill.Generate_Spoiler(Spoiler(settings))
+    assert len(checked) == 1
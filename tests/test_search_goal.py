@@ -0,0 +1,54 @@
+"""Tests for searches with a goal skipping the regions which can't lead to it."""
+import json
+
+import randomizer.Fill as Fill
+import randomizer.RegionGraph as RegionGraph
+import randomizer.SearchGoal as SearchGoal
+from randomizer.Settings import Settings
+from randomizer.Spoiler import Spoiler
+
+
+def load_settings(preset, seed):
+    data = json.load(open("static/presets/default.json"))
+    data.update(json.load(open("static/presets/" + preset)))
+    data["seed"] = seed
+    return Settings(data)
+
+
+def test_beatable_matches_search_without_cone(monkeypatch):
+    getGoalCone = SearchGoal.GetGoalCone
+    isBeatableWithoutLocation = Fill.IsBeatableWithoutLocation
+    verdicts = []
+
+    def checked(locationId, settings=None):
+        beatable = isBeatableWithoutLocation(locationId, settings)
+        # Every region could lead to the goal, so the search always runs
+        monkeypatch.setattr(SearchGoal, "GetGoalCone", lambda graph, goalItem: set(range(len(graph.regions))))
+        assert isBeatableWithoutLocation(locationId, settings) == beatable
+        monkeypatch.setattr(SearchGoal, "GetGoalCone", getGoalCone)
+        verdicts.append(beatable)
+        return beatable
+
+    monkeypatch.setattr(Fill, "IsBeatableWithoutLocation", checked)
+    Fill.Generate_Spoiler(Spoiler(load_settings("season1.json", 22)))
+    assert True in verdicts and False in verdicts
+
+
+def test_entrances_follow_the_exits_shuffled(monkeypatch):
+    settings = load_settings("coupled_lzr_balanced.json", 1)
+    graphs = []
+    verifyWorld = Fill.VerifyWorld
+
+    def verify(settings):
+        # The cached entrances always match a graph built from scratch for the same exits
+        graph = RegionGraph.GetRegionGraph(settings)
+        entrances = graph.Entrances()
+        fresh = RegionGraph.RegionGraph()
+        fresh.Refresh(settings)
+        assert entrances == fresh.Entrances()
+        graphs.append(graph.entrancesFor)
+        return verifyWorld(settings)
+
+    monkeypatch.setattr(Fill, "VerifyWorld", verify)
+    Fill.Generate_Spoiler(Spoiler(settings))
+    assert len(set(graphs)) > 1